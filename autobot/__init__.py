@@ -51,14 +51,18 @@ __revision__ = '$Revision$'
 __all__ = ["bots",
            "botparser",
            "bottester",
+           "cgrouptools",
            "colors",
            "dbexpression",
            "dbparser",
            "dbtools",
+           "jobtools",
            "logutils",
            "namespace",
            "parsetools",
            "sqltools",
+           "stattools",
+           "streamtools",
            "systools",
            "tbparser",
            "timetools",
@@ -45,6 +45,44 @@ import dbexpression             # evaluation of database exprsesions
 import dbtools                  # database specification files
 import namespace                # single and multi key attributes
 import sqltools                 # sqlite3 database access
+import streamtools              # memory-mapped files
+
+
+# -----------------------------------------------------------------------------
+# BotRun
+#
+# Holds the namespaces of a single run, ie., the execution of a solver over a
+# particular test case or the parsing of a single text file (see the
+# documentation of BotAction in bots.py).
+#
+# Since every run gets its own instance, different runs can be safely processed
+# at the same time. The only exception is the user namespace, which is shared
+# among all runs and it is thus given to the constructor
+# -----------------------------------------------------------------------------
+class BotRun (object):
+    """
+    Holds the namespaces of a single run, ie., the execution of a solver over a
+    particular test case or the parsing of a single text file (see the
+    documentation of BotAction in bots.py).
+
+    Since every run gets its own instance, different runs can be safely
+    processed at the same time. The only exception is the user namespace, which
+    is shared among all runs and it is thus given to the constructor
+    """
+
+    def __init__ (self, user):
+        """
+        creates empty namespaces for a new run which shares the given user
+        namespace with all the others
+        """
+
+        self.namespace = namespace.Namespace ()         # sysvar, mainvar
+        self.data      = namespace.Namespace ()         # datavar, filevar
+        self.param     = namespace.Namespace ()         # param, dirvar (to be used in BotTester)
+        self.user      = user                           # user space
+        self.regexp    = namespace.Namespace ()         # regexp
+        self.snippet   = namespace.Namespace ()         # snippets of python code
+        self.matches   = dict ()                        # matches of regexps (see DBSpec.findall)
 
 
 # -----------------------------------------------------------------------------
@@ -80,6 +118,12 @@ class BotParser (object):
     # format data.Cost and data.'CPU time'
     statregexp = r" >[\t ]*(?P<varname>[a-zA-Z ]+):[ ]+(?P<value>([0-9]+\.[0-9]+|[0-9]+))"
 
+    # database transactions
+    # -----------------------------------------------------------------------------
+    # the same connection to the database is used for all runs (as long as its
+    # name does not change) and changes are committed every batch_size runs
+    batch_size = 100
+
     # logging services
     # -----------------------------------------------------------------------------
     _loglevel = logging.INFO            # default logging level
@@ -184,34 +228,33 @@ class BotParser (object):
     # ----------+-----------------
     #
     # These associations are implemented in the evaluation of dbexpressions
+    #
+    # All namespaces but the user namespace hold data that depends upon a
+    # particular run and thus, they are created anew for every run as an
+    # instance of BotRun (see below). The user namespace, instead, is shared
+    # among all runs
     # -----------------------------------------------------------------------------
-    _namespace = namespace.Namespace ()         # sysvar, mainvar
-    _data      = namespace.Namespace ()         # datavar, filevar
-    _param     = namespace.Namespace ()         # param, dirvar (to be used in BotTester)
     _user      = namespace.Namespace ()         # user space
-    _regexp    = namespace.Namespace ()         # regexp
-    _snippet   = namespace.Namespace ()         # snippets of python code
 
 
     # -----------------------------------------------------------------------------
     # _sub
     #
-    # substitute in string the ocurrence of every keyword in the namespace used
-    # in this instance of BotParser (BotParser._namespace) with its value if it
-    # appears preceded by '$' in string and it is a str. Similar to
-    # Template.substitute but it also allows the substitution of strings which
-    # do not follow the convention of python variable names
+    # substitute in string the ocurrence of every keyword in the given namespace
+    # with its value if it appears preceded by '$' in string and it is a
+    # str. Similar to Template.substitute but it also allows the substitution of
+    # strings which do not follow the convention of python variable names
     #
     # Of course, other namespaces can be used but _sub is used only to compute
     # the name of the output file so that only static information is used
     # -----------------------------------------------------------------------------
-    def _sub (self, string):
+    def _sub (self, string, nspace):
         """
-        substitute in string the ocurrence of every keyword in the namespace
-        used in this instance of BotParser (BotParser._namespace) with its value
-        if it appears preceded by '$' in string and it is a str. Similar to
-        Template.substitute but it also allows the substitution of strings which
-        do not follow the convention of python variable names
+        substitute in string the ocurrence of every keyword in the given
+        namespace with its value if it appears preceded by '$' in string and it
+        is a str. Similar to Template.substitute but it also allows the
+        substitution of strings which do not follow the convention of python
+        variable names
 
         Of course, other namespaces can be used but _sub is used only to compute
         the name of the output file so that only static information is used
@@ -221,22 +264,48 @@ class BotParser (object):
 
         # now, substitute every ocurrence of every single attribute in
         # namespace with its value only in case the value is a string
-        for ikey in [jkey for jkey in BotParser._namespace
-                     if not isinstance (BotParser._namespace [jkey], dict)]:
+        for ikey in [jkey for jkey in nspace
+                     if not isinstance (nspace [jkey], dict)]:
 
             # perform the substitution enforcing the type of value to be str
-            result = re.sub ('\$' + ikey, str (BotParser._namespace [ikey]), result)
+            result = re.sub ('\$' + ikey, str (nspace [ikey]), result)
 
         # and return the result now return result
         return result
 
 
+    # -----------------------------------------------------------------------------
+    # _uses
+    #
+    # returns true if the given variable of the given type of namespace (or any
+    # variable of it if none is given) has to be computed, i.e., if it is used
+    # in the database specification. Since prologue and epilogue actions might
+    # access any variable, everything has to be computed if any is given. If
+    # contexts is false, variables used only to apply regexps to them are not
+    # considered
+    # -----------------------------------------------------------------------------
+    def _uses (self, nst, variable=None, contexts=True):
+        """
+        returns true if the given variable of the given type of namespace (or
+        any variable of it if none is given) has to be computed, i.e., if it is
+        used in the database specification. Since prologue and epilogue actions
+        might access any variable, everything has to be computed if any is
+        given. If contexts is false, variables used only to apply regexps to
+        them are not considered
+        """
+
+        if self._prologue or self._epilogue:
+            return True
+
+        return self._dbspec.depends (nst, variable, contexts)
+
+
     # -----------------------------------------------------------------------------
     # check_flags
     #
     # check the parameters given
     # -----------------------------------------------------------------------------
-    def check_flags (self, txtfile, dbfile, directory):
+    def check_flags (self, txtfile, dbfile, directory, dbprofile):
 
         """
         check the parameters given
@@ -260,13 +329,18 @@ class BotParser (object):
 """)
             raise ValueError (" The database specification file is not accessible")
 
+        # and the storage profile of the database shall be known
+        if (dbprofile not in sqltools.profiles):
+            self._logger.critical (" Unknown storage profile '%s'" % dbprofile)
+            raise ValueError (" Unknown storage profile")
+
 
     # -----------------------------------------------------------------------------
     # show_switches
     #
     # show a somehow beautified view of the current params
     # -----------------------------------------------------------------------------
-    def show_switches (self, txtfile, dbfile, directory):
+    def show_switches (self, txtfile, dbfile, directory, dbprofile):
         """
         show a somehow beautified view of the current params
         """
@@ -278,7 +352,8 @@ class BotParser (object):
   * Database             : %s
 
   * Directory            : %s
- -----------------------------------------------------------------------------""" % (__revision__[1:-1], __date__[1:-1], __version__, txtfile, dbfile, directory))
+  * Storage profile      : %s
+ -----------------------------------------------------------------------------""" % (__revision__[1:-1], __date__[1:-1], __version__, txtfile, dbfile, directory, dbprofile))
 
 
     # -----------------------------------------------------------------------------
@@ -402,15 +477,21 @@ class BotParser (object):
     # looks for all matches of all regular expressions defined in the database
     # specification in the given text file. The results of all matches are
     # written to the regexp namespace. Also, the data namespace is populated
-    # with the results of the matches of the default regexp
+    # with the results of the matches of the default regexp. If the contents of
+    # the text file were already read, they can be given in text
     #
     # Also, the textfile is backed up to the resultsdir
     # -----------------------------------------------------------------------------
-    def parse_single_file(self, txtfile):
+    def parse_single_file(self, txtfile, run, text=None):
         """looks for all matches of all regular expressions defined in the database
         specification in the given text file. The results of all matches are
         written to the regexp namespace. Also, the data namespace is populated
-        with the results of the matches of the default regexp
+        with the results of the matches of the default regexp. All namespaces
+        are taken from the given run (an instance of BotRun). If the contents
+        of the text file were already read, they can be given in text
+
+        All regexps applied to the text file are matched only once (see
+        DBSpec.scan) and their matches are cached in the given run
 
         Also, the textfile is backed up to the resultsdir
         """
@@ -432,7 +513,7 @@ class BotParser (object):
                 return
 
             # now, in case it is static, it is evaluated never more than once
-            if snippetname in BotParser._snippet:
+            if snippetname in run.snippet:
                 return
 
             # otherwise, to evaluate this snippet create an expression with
@@ -444,12 +525,13 @@ class BotParser (object):
 
             # and request its evaluation
             expression.eval_snippet(dbspec=self._dbspec,
-                                    sys=BotParser._namespace,
-                                    data=BotParser._data,
-                                    param=None,
-                                    regexp=BotParser._regexp,
-                                    snippet=BotParser._snippet,
-                                    user=BotParser._user)
+                                    sys=run.namespace,
+                                    data=run.data,
+                                    param=run.param,
+                                    regexp=run.regexp,
+                                    snippet=run.snippet,
+                                    user=run.user,
+                                    matches=run.matches)
 
         def _eval_filevar(variable):
             """creates a dbexpression that consists of a filevar and requests its
@@ -461,24 +543,74 @@ class BotParser (object):
             dbexpression.DBExpression(dbparser.FILENST,
                                       variable,
                                       self._logger,
-                                      self._logfilter).eval_filevar(data=BotParser._data)
+                                      self._logfilter).eval_filevar(data=run.data)
 
-        # default regexp
+        # default regexp and regexps
         # ---------------------------------------------------------------------
-        # read all contents of the input file - yep, this might take a lot
-        # of memory but the alternative, to process each line separately
-        # would not allow to match various lines simultaneously
-
-        # open the file in read mode
-        with open(txtfile, "r") as stream:
+        # all regexps applied directly to this text are matched only once,
+        # here, along with the default regexp. These are the regexps whose
+        # context starts with a sys variable whose value is this text (e.g.,
+        # sys.stdout/figures.country) and those used without context if this
+        # is the current stream (sys.stdout)
+        heads = self._dbspec.get_heads()
+        names = set()
+        current = False
+        if text is not None:
+            for (head, inames) in heads.items():
+                if head:
+                    (prefix, variable) = string.split(head, '.')
+                    if (string.upper(prefix) in [dbparser.SYSNST, dbparser.MAINNST] and
+                        variable in run.namespace and run.namespace[variable] is text):
+                        names |= inames
+            current = 'stdout' in run.namespace and run.namespace.stdout is text
+            if current:
+                names |= heads.get(None, set())
+        names = sorted(names)
+
+        # the default regexp is matched only if the data namespace is used.
+        # If neither the default regexp nor any other has to be matched, the
+        # text file is not even accessed
+        patterns = []
+        if self._uses(dbparser.DATANST):
+            patterns = [re.compile(BotParser.statregexp)]
+
+        if names or patterns:
+
+            # if the contents of the input file were not given, they are not
+            # used anywhere else, so that they are just mapped in memory and
+            # scanned here without copying the whole file. Note that regexps
+            # can still match various lines simultaneously
+            if text is None:
+                text = streamtools.MappedFile(txtfile)
+            matches = self._dbspec.scan(text, names, run.matches, patterns)
 
             # for all matches of the default regexp in the current text file
-            for imatch in re.finditer(BotParser.statregexp, stream.read()):
+            # (if it was matched)
+            for imatch in [jmatch for jmatches in matches[len(names):]
+                           for jmatch in jmatches]:
 
-                # and store every match in the data namespace
-                BotParser._data[imatch.group('varname').rstrip(' ')] = \
+                # store every match in the data namespace
+                run.data[imatch.group('varname').rstrip(' ')] = \
                     imatch.group('value')
 
+            # and the matches of the regexps used without context in the regexp
+            # namespace. They are indexed by the names of their groups
+            if current:
+                for iname in heads.get(None, set()):
+                    pattern = self._dbspec.get_pattern(iname)
+                    groups = sorted(pattern.groupindex, key=pattern.groupindex.get)
+                    if groups:
+                        run.regexp.setkeynames(iname, *groups)
+                        run.regexp.setattr(iname,
+                                           key=dict(zip(groups, groups)),
+                                           value=[tuple(imatch.group(igroup) for igroup in groups)
+                                                  for imatch in matches[names.index(iname)]])
+
+            # the memory map (if any) is not necessary anymore, since only
+            # the values of the groups of its regexps are cached
+            if isinstance(text, streamtools.MappedFile):
+                text.close()
+
         # for all database tables (ie, implicitly ignoring snippets) within the
         # current database specification
         for itable in [itable for itable in self._dbspec
@@ -514,6 +646,11 @@ class BotParser (object):
                                                        self._logger,
                                                        self._logfilter)
 
+                # regexps used without context are applied to the current
+                # stream, which is already available
+                if not expression.has_context():
+                    continue
+
                 # retrieve the first context
                 head = expression.get_context()[0]
 
@@ -539,6 +676,8 @@ class BotParser (object):
     #
     # if prologue/epilogue actions are specified then its __call__ method is
     # invoked before/after parsing every text file.
+    #
+    # It returns the namespaces of the last run as an instance of BotRun
     # -----------------------------------------------------------------------------
     def parse_all_files(self, txtfiles, resultsdir):
         """
@@ -547,6 +686,8 @@ class BotParser (object):
 
         if prologue/epilogue actions are specified then its __call__ method is
         invoked before/after parsing every text file.
+
+        It returns the namespaces of the last run as an instance of BotRun
         """
 
         # before parsing all the text files, initialize the current file to the
@@ -559,155 +700,183 @@ class BotParser (object):
         # keep track of the file id as an integer
         idx = 0
 
-        # now, process every text file
-        for itxtfile in txtfiles:
-
-            # namespaces
-            # -------------------------------------------------------------------------
-            # initialize the contents of the namespaces that hold variables
-            # whose value is dependent upon the contents of the current file
-            BotParser._namespace.clear()
-            BotParser._data.clear()
-            BotParser._regexp.clear()
-            BotParser._snippet.clear()
-
-            # - main (sys) namespace
-            # -------------------------------------------------------------------------
-            # initialize the main namespace with the parameters passed to the
-            # main script (ie., the parsebot), mainvars. These are given in
-            # self._argnamespace. Since the argparser automatically casts type
-            # according to their type field, they are all converted into
-            # strings here to allow a uniform treatment
-            if self._argnamespace:
-                for index, value in self._argnamespace.__dict__.items():
-                    BotParser._namespace[index] = str(value)
-
-            # also, with the contents of this file
-            with open(itxtfile, "r") as stream:
-                BotParser._namespace.stdout = stream.read()
-            stream.close()
-
-            # and also with the following sys variables
-            #
-            #   index         - index of this file in the range [0, ...)
-            #   filename      - name of this text file
-            #   date          - current date
-            #   time          - current time
-            #   startfullparsedatetime - when the whole parsing started in
-            #                            date/time format
-            #   startfullparsetime - when the whole parsing started in secs
-            #                        from Epoch
-            #
-            # Note that other fields are added below to register the right
-            # timings when every parsing started/ended
-            BotParser._namespace.index = idx
-            BotParser._namespace.name = os.path.basename(itxtfile)
-            BotParser._namespace.date = datetime.datetime.now().strftime("%Y-%m-%d")
-            BotParser._namespace.time = datetime.datetime.now().strftime("%H:%M:%S")
-            BotParser._namespace.startfullparsedatetime = datetime.datetime.now()
-            BotParser._namespace.startfullparsetime = time.time()
-
-            self._logger.info(" Starting the automated parsing of file '%s'" % itxtfile)
-
-            # parsing
-            # -------------------------------------------------------------------------
-            # execute the prologue in case any was given (note that the run
-            # time is computed right now) and register also the exact time when
-            # the processing of this file started (including the prologue)
-            if self._prologue:
-                action = self._prologue(textfile=itxtfile,
-                                        dbfile=self._dbfile,
-                                        directory=self._directory,
-                                        startfullparsetime=BotParser._namespace.startfullparsetime,
-                                        namespace=BotParser._namespace,
-                                        data=BotParser._data,
-                                        user=BotParser._user)
-                action(self._logger)
-
-            # now, invoke the automated parsing of this particular text file
-            # after recording the exact timings before and after (ie, this do
-            # not take the time of the prologue/epilogue into account)
-            BotParser._namespace.startparsedatetime = datetime.datetime.now()
-            BotParser._namespace.startparsetime = time.time()
-
-            self.parse_single_file(itxtfile)
-
-            BotParser._namespace.endparsedatetime = datetime.datetime.now()
-            BotParser._namespace.endparsetime = time.time()
-
-            # now, before processing the next text file, invoke the epilogue in
-            # case any was given
-            if self._epilogue:
-                action = self._epilogue(textfile=itxtfile,
-                                        dbfile=self._dbfile,
-                                        directory=self._directory,
-                                        startparsetime = BotParser._namespace.startparsetime,
-                                        endparsetime = BotParser._namespace.endparsetime,
-                                        namespace=BotParser._namespace,
-                                        data=BotParser._data,
-                                        user=BotParser._user)
-                action(self._logger)
-
-            # and register the exact time when the whole parsing of this file
-            # ended including processing the epilogue both in seconds from Epoc
-            # (endruntime) and in date/time format (enddatetime)
-            BotParser._namespace.endfullparsetime = time.time()
-            BotParser._namespace.endfullparsedatetime = datetime.datetime.now()
-
-            # results/
-            # -------------------------------------------------------------------------
-            # once this file has been processed, copy it (as opposed to move
-            # it) to the results directory after applying the substitution
-            # specified in the output directive.
-            self.copy_file(itxtfile, resultsdir, self._sub(self._output), move=False)
-
-            # in case compression was requested, make sure to remove the
-            # compressed file which has been copied with copy_file
-            if self._compress:
-                os.remove(itxtfile + '.bz2')
-
-            # database
-            # -------------------------------------------------------------------------
-            # now, write data to the database. Note that we do this after
-            # invoking the epilogue so that the user gets a finer control on
-            # the data that is about to be inserted into the database
-
-            # First, compute the name of the database
-            dbname = self._sub(self._dbname)
-
-            # create a new SQLITE3 database connection
-            dbhandler = sqltools.dbaccess(dbname)
-
-            # in case we get a different database
-            if dbname != currdbname:
-
-                # create the tables
+        # in case no text file is given, the namespaces of the last run are
+        # just empty
+        run = BotRun(BotParser._user)
+
+        # the same database writer is used for all files as long as the name
+        # of the database does not change. It writes data in a separate thread
+        # so that parsing is not delayed by the database and it is closed
+        # (hence committing all pending changes) no matter how the parsing ends
+        dbhandler = None
+        try:
+
+            # now, process every text file
+            for itxtfile in txtfiles:
+
+                # namespaces
+                # -------------------------------------------------------------------------
+                # create the namespaces that hold variables whose value is
+                # dependent upon the contents of the current file
+                run = BotRun(BotParser._user)
+
+                # - main (sys) namespace
+                # -------------------------------------------------------------------------
+                # initialize the main namespace with the parameters passed to the
+                # main script (ie., the parsebot), mainvars. These are given in
+                # self._argnamespace. Since the argparser automatically casts type
+                # according to their type field, they are all converted into
+                # strings here to allow a uniform treatment
+                if self._argnamespace:
+                    for index, value in self._argnamespace.__dict__.items():
+                        run.namespace[index] = str(value)
+
+                # also, with the contents of this file (if they are used). If
+                # they are used only to apply regexps to them, they are just
+                # mapped in memory (see parse_single_file)
+                stdout = None
+                if self._uses(dbparser.SYSNST, 'stdout', contexts=False):
+                    with open(itxtfile, "r") as stream:
+                        stdout = stream.read()
+                    run.namespace.stdout = stdout
+                elif self._uses(dbparser.SYSNST, 'stdout'):
+                    stdout = streamtools.MappedFile(itxtfile)
+                    run.namespace.stdout = stdout
+
+                # and also with the following sys variables
+                #
+                #   index         - index of this file in the range [0, ...)
+                #   filename      - name of this text file
+                #   date          - current date
+                #   time          - current time
+                #   startfullparsedatetime - when the whole parsing started in
+                #                            date/time format
+                #   startfullparsetime - when the whole parsing started in secs
+                #                        from Epoch
+                #
+                # Note that other fields are added below to register the right
+                # timings when every parsing started/ended
+                run.namespace.index = idx
+                run.namespace.name = os.path.basename(itxtfile)
+                run.namespace.date = datetime.datetime.now().strftime("%Y-%m-%d")
+                run.namespace.time = datetime.datetime.now().strftime("%H:%M:%S")
+                run.namespace.startfullparsedatetime = datetime.datetime.now()
+                run.namespace.startfullparsetime = time.time()
+
+                self._logger.info(" Starting the automated parsing of file '%s'" % itxtfile)
+
+                # parsing
+                # -------------------------------------------------------------------------
+                # execute the prologue in case any was given (note that the run
+                # time is computed right now) and register also the exact time when
+                # the processing of this file started (including the prologue)
+                if self._prologue:
+                    action = self._prologue(textfile=itxtfile,
+                                            dbfile=self._dbfile,
+                                            directory=self._directory,
+                                            startfullparsetime=run.namespace.startfullparsetime,
+                                            namespace=run.namespace,
+                                            data=run.data,
+                                            user=run.user)
+                    action(self._logger)
+
+                # now, invoke the automated parsing of this particular text file
+                # after recording the exact timings before and after (ie, this do
+                # not take the time of the prologue/epilogue into account)
+                run.namespace.startparsedatetime = datetime.datetime.now()
+                run.namespace.startparsetime = time.time()
+
+                self.parse_single_file(itxtfile, run, stdout)
+
+                run.namespace.endparsedatetime = datetime.datetime.now()
+                run.namespace.endparsetime = time.time()
+
+                # now, before processing the next text file, invoke the epilogue in
+                # case any was given
+                if self._epilogue:
+                    action = self._epilogue(textfile=itxtfile,
+                                            dbfile=self._dbfile,
+                                            directory=self._directory,
+                                            startparsetime = run.namespace.startparsetime,
+                                            endparsetime = run.namespace.endparsetime,
+                                            namespace=run.namespace,
+                                            data=run.data,
+                                            user=run.user)
+                    action(self._logger)
+
+                # and register the exact time when the whole parsing of this file
+                # ended including processing the epilogue both in seconds from Epoc
+                # (endruntime) and in date/time format (enddatetime)
+                run.namespace.endfullparsetime = time.time()
+                run.namespace.endfullparsedatetime = datetime.datetime.now()
+
+                # results/
+                # -------------------------------------------------------------------------
+                # once this file has been processed, copy it (as opposed to move
+                # it) to the results directory after applying the substitution
+                # specified in the output directive.
+                self.copy_file(itxtfile, resultsdir, self._sub(self._output, run.namespace), move=False)
+
+                # in case compression was requested, make sure to remove the
+                # compressed file which has been copied with copy_file
+                if self._compress:
+                    os.remove(itxtfile + '.bz2')
+
+                # database
+                # -------------------------------------------------------------------------
+                # now, write data to the database. Note that we do this after
+                # invoking the epilogue so that the user gets a finer control on
+                # the data that is about to be inserted into the database
+
+                # First, compute the name of the database
+                dbname = self._sub(self._dbname, run.namespace)
+
+                # in case we get a different database
+                if dbname != currdbname:
+
+                    # close the current connection, if any, and create a new
+                    # SQLITE3 database writer
+                    if dbhandler:
+                        dbhandler.close()
+                    dbhandler = sqltools.dbwriter(dbname, self._dbprofile)
+
+                    # create the tables
+                    for itable in self._dbspec.get_db():
+                        dbhandler.create_table(itable)
+
+                    # and remember the name of the current database
+                    currdbname = dbname
+
+                # now, populate the datatase
+                self._logger.debug(" Inserting data into '%s'" % currdbname)
                 for itable in self._dbspec.get_db():
-                    dbhandler.create_table(itable)
-
-                # and remember the name of the current database
-                currdbname = dbname
-
-            # now, populate the datatase
-            self._logger.debug(" Inserting data into '%s'" % currdbname)
-            for itable in self._dbspec.get_db():
-                self._logger.debug(" Populating '%s'" % itable.get_name())
-                dbhandler.insert_data(itable,
-                                      itable.poll(dbspec=self._dbspec,
-                                                  namespace=BotParser._namespace,
-                                                  data=BotParser._data,
-                                                  param=None,
-                                                  regexp=BotParser._regexp,
-                                                  snippet=BotParser._snippet,
-                                                  user=BotParser._user,
-                                                  logger=self._logger,
-                                                  logfilter=self._logfilter))
-
-            # and close the database
-            dbhandler.close()
-
-            # update the index
-            idx += 1
+                    self._logger.debug(" Populating '%s'" % itable.get_name())
+                    dbhandler.insert_data(itable,
+                                          itable.poll(dbspec=self._dbspec,
+                                                      namespace=run.namespace,
+                                                      data=run.data,
+                                                      param=run.param,
+                                                      regexp=run.regexp,
+                                                      snippet=run.snippet,
+                                                      user=run.user,
+                                                      logger=self._logger,
+                                                      logfilter=self._logfilter,
+                                                      matches=run.matches))
+
+                # and commit all changes every once in a while
+                if (idx + 1) % BotParser.batch_size == 0:
+                    dbhandler.commit()
+
+                # update the index
+                idx += 1
+
+        finally:
+            if dbhandler:
+                dbhandler.close()
+
+        # return the namespaces of the last run so that they are available to
+        # the windUp action
+        return run
 
     # -----------------------------------------------------------------------------
     # wrapup
@@ -729,6 +898,9 @@ class BotParser (object):
         else:
             raise ValueError(" Incorrect dbspec in wrapup")
 
+        # and show the hit rate of the cache of compiled snippets
+        dbexpression.log_snippet_stats(self._logger)
+
     # -----------------------------------------------------------------------------
     # go
     #
@@ -742,6 +914,7 @@ class BotParser (object):
     #
     # directory - target directory where all output is recorded
     # output - filenames given to the backup copies of the parsed files
+    # dbprofile - storage profile of the databases (see sqltools.profiles)
     # logger - if a logger is given, autobot uses a child of it. Otherwise, it
     #          creates its own logger
     # logfilter - if the client code uses a logger that requires additional
@@ -761,9 +934,9 @@ class BotParser (object):
     # quiet - if given, some additional information is skipped
     # -----------------------------------------------------------------------------
     def go (self, txtfile, dbfile, dbname="$name.db", directory=os.getcwd (),
-            compress=False, argnamespace=None, output="$name", logger=None, logfilter=None,
-            prologue=None, epilogue=None, enter=None, windUp=None,
-            quiet=False):
+            compress=False, argnamespace=None, output="$name", dbprofile='default',
+            logger=None, logfilter=None, prologue=None, epilogue=None, enter=None,
+            windUp=None, quiet=False):
         """
         main service provided by this class. It automates the whole parsing
         process. It parses the contents of all files specified in txtfile (which
@@ -775,6 +948,7 @@ class BotParser (object):
 
         directory - target directory where all output is recorded
         output - filenames given to the backup copies of the parsed files
+        dbprofile - storage profile of the databases (see sqltools.profiles)
         logger - if a logger is given, autobot uses a child of it. Otherwise, it
                  creates its own logger
         logfilter - if the client code uses a logger that requires additional
@@ -796,10 +970,10 @@ class BotParser (object):
 
         # copy the attributes
         (self._txtfile, self._dbfile, self._dbname, self._directory,
-         self._compress, self._argnamespace, self._output,
+         self._compress, self._argnamespace, self._output, self._dbprofile,
          self._prologue, self._epilogue, self._quiet) = \
          (txtfile, dbfile, dbname, directory,
-          compress, argnamespace, output,
+          compress, argnamespace, output, dbprofile,
           prologue, epilogue, quiet)
 
         # logger settings - if a logger has been passed, just create a child of
@@ -830,7 +1004,7 @@ class BotParser (object):
         self._logger.debug (" Starting automated parsing ...")
 
         # check that all parameters are valid
-        self.check_flags (self._txtfile, self._dbfile, self._directory)
+        self.check_flags (self._txtfile, self._dbfile, self._directory, self._dbprofile)
 
         # and now, create the database specification
 
@@ -855,7 +1029,7 @@ class BotParser (object):
         # and now, unless quiet is enabled, show the flags
         if (not self._quiet):
 
-            self.show_switches (self._txtfile, self._dbfile, self._directory)
+            self.show_switches (self._txtfile, self._dbfile, self._directory, self._dbprofile)
 
         # setup the necessary environment and retrieve the directores to be
         # used
@@ -869,19 +1043,25 @@ class BotParser (object):
                 self.statregexp = iregexp.get_specification ()
                 self._logger.warning (" The data regexp has been overridden to '%s'" % iregexp.get_specification ())
 
-        # in case it is requested to execute an *enter* action do it now
+        # compile all tables only once, before parsing any file
+        for itable in self._dbspec.get_db ():
+            itable.compile (self._dbspec, self._logger, self._logfilter)
+
+        # in case it is requested to execute an *enter* action do it now. Since
+        # no file has been parsed yet, it is given empty namespaces
         if enter:
+            run = BotRun (BotParser._user)
             action = enter (dbfile=self._dbfile,
                             directory=self._directory,
-                            namespace=BotParser._namespace,
-                            user=BotParser._user)
+                            namespace=run.namespace,
+                            user=run.user)
             action (self._logger)
 
         # record the start time
         self._starttime = datetime.datetime.now ()
 
         # now, invoke the automated parsing of this particular text file
-        self.parse_all_files (self._txtfile, resultsdir)
+        run = self.parse_all_files (self._txtfile, resultsdir)
 
         # record the end time
         self._endtime = datetime.datetime.now ()
@@ -893,9 +1073,9 @@ class BotParser (object):
         if windUp:
             action = windUp (dbfile=self._dbfile,
                              directory=self._directory,
-                             namespace=BotParser._namespace,
-                             data=BotParser._data,
-                             user=BotParser._user)
+                             namespace=run.namespace,
+                             data=run.data,
+                             user=run.user)
             action (self._logger)
 
 
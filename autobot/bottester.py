@@ -27,20 +27,28 @@ Base class of all testbots
 import bz2                      # bzip2 compression service
 import datetime                 # date/time
 import logging                  # loggers
+import math                     # ceil
 import os                       # os services
-import re                       # regular expressions
+import resource                 # resource limits
 import shutil                   # shell utitilies such as copying files
+import signal                   # signals
 import subprocess               # subprocess management
-import string                   # rstrip
+import tempfile                 # scratch directories
 import time                     # time management
 
 from collections import defaultdict
 
 from botparser import BotParser # services for automated parsing of text files
+from botparser import BotRun    # namespaces of a single run
+import cgrouptools              # resources accounting with cgroups
+import dbexpression             # evaluation of database expressions
 import dbparser                 # parsing of database specification files
 import dbtools                  # database specification files
+import jobtools                 # concurrent execution of jobs
 import namespace                # single and multi key attributes
 import sqltools                 # sqlite3 database access
+import stattools                # online statistics
+import streamtools              # memory-mapped files
 import systools                 # process management
 import timetools                # timing management
 import tsttools                 # test specification files
@@ -76,6 +84,13 @@ class BotTester (BotParser):
     # -----------------------------------------------------------------------------
     kill_delay = 5
 
+    # maximum number of samples of every sys table kept in memory. Once this
+    # number is reached, they are written to the database while the solver is
+    # still running so that the memory used does not depend on the length of
+    # the run
+    # -----------------------------------------------------------------------------
+    chunk_size = 1000
+
     # default string used for tst/db files that are passed as verbatim strings
     # and thus, have no name
     # -----------------------------------------------------------------------------
@@ -102,6 +117,24 @@ class BotTester (BotParser):
     # * dirvar: these are also the flags given to the executable but they are
     #           named after their position
     #
+    # * sysvar: in addition to those defined in BotParser, the resources
+    #           consumed by the executable are available in cputime, wctime,
+    #           vsize (in MB), numprocs and numthreads, sampled every interval
+    #           seconds. If a cgroup is used
+    #           and it accounts memory, memory and peakmemory (both in MB)
+    #           are available as well. Once the executable terminates,
+    #           cputime is taken from the kernel so that it is exact and its
+    #           peak resident set size is given in maxrss (in MB). Summaries
+    #           of vsize computed online are also given in peakvsize,
+    #           meanvsize (weighted by the time between samples), p50vsize,
+    #           p95vsize and p99vsize (estimated) along with the ratio
+    #           between cputime and wctime, cpuutil
+    #
+    # Variables that are costly to compute (stdout, stderr, numprocs and
+    # numthreads, and the data read with the default regexp) are computed only
+    # if they are used in the database specification or if a prologue or
+    # epilogue is given
+    #
     # to make these relationships more apparent, the variables given in the
     # database specification file can be preceded by a prefix that provides
     # information about the namespace they are written to (all listed below):
@@ -141,7 +174,8 @@ class BotTester (BotParser):
     #
     # check the parameters given to the automated execution of this instance
     # -----------------------------------------------------------------------------
-    def check_flags (self, solver, tstfile, dbfile, timeout, memory, check, directory):
+    def check_flags (self, solver, tstfile, dbfile, timeout, memory, check, directory,
+                     jobs, filesize, adaptive, dbprofile, dboptimize, pack):
 
         """
         check the parameters given to the automated execution of this instance
@@ -193,13 +227,45 @@ class BotTester (BotParser):
             self._logger.critical (" The memory param shall be positive!")
             raise ValueError (" Memory allotted is negative")
 
+        # and also the number of jobs run simultaneously
+        if (jobs < 1):
+            self._logger.critical (" The number of jobs shall be positive!")
+            raise ValueError (" Number of jobs is not positive")
+
+        # the file size bound (if any) shall be positive
+        if (filesize is not None and filesize <= 0):
+            self._logger.critical (" The file size param shall be positive!")
+            raise ValueError (" File size bound is not positive")
+
+        # finally, the shortest interval between successive pings (if any)
+        # shall be positive and no larger than the check flag
+        if (adaptive is not None and (adaptive <= 0 or adaptive > check)):
+            self._logger.critical (" The adaptive flag should be positive and no larger than the check flag")
+            raise ValueError (" Shortest period between successive pings is out of range")
+
+        # and the storage profile of the database and its optimizations shall
+        # be known
+        if (dbprofile not in sqltools.profiles):
+            self._logger.critical (" Unknown storage profile '%s'" % dbprofile)
+            raise ValueError (" Unknown storage profile")
+
+        if (set (dboptimize) - set (['analyze', 'vacuum'])):
+            self._logger.critical (" The database can be optimized only with analyze and/or vacuum")
+            raise ValueError (" Unknown optimization of the database")
+
+        if (pack is not None and pack not in sqltools.compressions):
+            self._logger.critical (" Sys tables can be packed only with the compressions %s" % sqltools.compressions)
+            raise ValueError (" Unknown compression of packed tables")
+
 
     # -----------------------------------------------------------------------------
     # show_switches
     #
     # show a somehow beautified view of the current params
     # -----------------------------------------------------------------------------
-    def show_switches (self, solver, tstfile, dbfile, timeout, memory, check, directory, compress):
+    def show_switches (self, solver, tstfile, dbfile, timeout, memory, check, directory, compress,
+                       jobs, concurrent, cgroup, rlimits, filesize, adaptive,
+                       dbprofile, dboptimize, pack):
         """
         show a somehow beautified view of the current params
         """
@@ -215,12 +281,22 @@ class BotTester (BotParser):
   * Database             : %s
 
   * Check flag           : %.2f seconds
+  * Adaptive check       : %s
 
   * Directory            : %s
   * Compression          : %s
   * Time limit           : %i seconds
   * Memory bound         : %i bytes
- -----------------------------------------------------------------------------""" % (__revision__[1:-1], __date__[1:-2], __version__, solvernames, tstfile, dbfile, check, directory, {False: 'disabled', True: 'enabled'}[compress], timeout, memory))
+  * Jobs                 : %i
+  * Concurrent solvers   : %s
+  * CGroup               : %s
+  * Resource limits      : %s
+  * File size bound      : %s
+
+  * Database profile     : %s
+  * Database optimization: %s
+  * Packed sys tables    : %s
+ -----------------------------------------------------------------------------""" % (__revision__[1:-1], __date__[1:-2], __version__, solvernames, tstfile, dbfile, check, adaptive and 'from %.2f seconds' % adaptive or 'disabled', directory, {False: 'disabled', True: 'enabled'}[compress], timeout, memory, jobs, {False: 'disabled', True: 'enabled'}[concurrent], cgroup or 'disabled', {False: 'disabled', True: 'enabled'}[rlimits], filesize and '%i MB' % filesize or 'disabled', dbprofile, ', '.join (dboptimize) or 'disabled', pack or 'disabled'))
 
 
     # -----------------------------------------------------------------------------
@@ -313,127 +389,236 @@ class BotTester (BotParser):
     # using the allotted timeout and memory. The results are stored in
     # 'resultsdir' and different stats are stored in 'stats'.
     #
-    # This method computes the name given to all the output files which are
-    # named after the given user specifcation where variable substitutions
-    # specified in the current namespace are allowed.
+    # If more than one job was requested, up to that number of test cases are
+    # run simultaneously (see run_test_case). Samples of the sys tables are
+    # written to the database (through 'dbhandler') in chunks while every test
+    # case is running. Other data is written only by this method. In any case,
+    # data is written in the same order the test cases are specified. Changes
+    # are committed every batch_size test cases.
     #
-    # If a prologue/epilogue is given (they should be a subclass of BotAction )
-    # then its __call__ method is invoked before/after the execution of the
-    # solver with every test case
+    # It returns the namespaces of the last run as an instance of BotRun
     # -----------------------------------------------------------------------------
-    def run_all_cases (self, solver, resultsdir, stats):
+    def run_all_cases (self, solver, resultsdir, stats, dbhandler):
         """
         invokes the execution of the given solver *in the same directory where
         it resides* for solving all cases specified in the current test
         specification using the allotted timeout and memory. The results are
         stored in 'resultsdir' and different stats are stored in 'stats'.
 
-        This method computes the name given to all the output files which are
-        named after the given user specifcation where variable substitutions
-        specified in the current namespace are allowed.
+        If more than one job was requested, up to that number of test cases are
+        run simultaneously (see run_test_case). Samples of the sys tables are
+        written to the database (through 'dbhandler') in chunks while every
+        test case is running (if various test cases are run simultaneously,
+        into a database of every test case which is merged once it is
+        done). Other data is written only by this method. In
+        any case, data is written in the same order the test cases are
+        specified. Changes are committed every batch_size test cases.
 
-        If a prologue/epilogue is given (they should be a subclass of BotAction
-        ) then its __call__ method is invoked before/after the execution of the
-        solver with every test case
+        It returns the namespaces of the last run as an instance of BotRun
         """
 
-        def _sub (string):
+        def _run_test_case (itst):
             """
-            substitute in string the ocurrence of every keyword in the namespace
-            used in this instance of BotTester (BotParser._namespace) with
-            its value if it appears preceded by '$' in string and it is a
-            str. Similar to Template.substitute but it also allows the
-            substitution of strings which do not follow the convention of python
-            variable names
-
-            Of course, other namespaces can be used but _sub is used only to
-            compute the name of the output file so that only static information
-            is used
+            runs the given test case and returns the test case along with the
+            writer used while it was running and the namespaces and stats of
+            its run
             """
 
-            result = string                                 # initialization
+            # if various test cases are run simultaneously, the chunks of
+            # samples written while they run are written into a database of
+            # their own next to the database of the solver (so that they are
+            # neither kept in memory nor lost if this process is killed) and
+            # they are merged later. Otherwise, the rows of different test
+            # cases would be interleaved in the sys tables
+            writer = dbhandler
+            if self._pool.get_jobs () > 1:
+                (fd, dbname) = tempfile.mkstemp (prefix='deferred-', suffix='.db',
+                                                 dir=os.path.dirname (dbhandler.get_name ()))
+                os.close (fd)
+                writer = sqltools.dbwriter (dbname, self._dbprofile)
+                for itable in self._dbspec.get_db ():
+                    if itable.sysp () and self._pack:
+                        writer.create_packed_table (itable, self._pack)
+                    elif itable.sysp ():
+                        writer.create_table (itable)
 
-            # now, substitute every ocurrence of every single attribute in
-            # namespace with its value only in case the value is a string
-            for ikey in [jkey for jkey in BotParser._namespace
-                         if not isinstance (BotParser._namespace [jkey], dict)]:
+            try:
+                result = self.run_test_case (solver, resultsdir, itst, writer)
+            except:
+                if writer is not dbhandler:
+                    writer.close ()
+                    os.remove (writer.get_name ())
+                raise
 
-                # perform the substitution enforcing the type of value to be str
-                result = re.sub ('\$' + ikey, str (BotParser._namespace [ikey]), result)
+            if writer is not dbhandler:
+                writer.close ()
+            return (itst, writer) + result
 
-            # and return the result now return result
-            return result
 
+        # in case no test case is given, the namespaces of the last run are
+        # just empty
+        run = BotRun (BotParser._user)
 
-        # initialization
-        first = True
-        
-        # now, for each test case
-        for itst in self._tstspec:
+        # now, for each test case (in the same order they were given)
+        for (idx, (itst, writer, run, istats)) in enumerate (self._pool.imap (_run_test_case, self._tstspec)):
 
-            # namespaces
-            # -------------------------------------------------------------------------
-            # initialize the contents of the namespaces that hold variables
-            # whose value depends upon the output of the current execution
-            BotParser._namespace.clear ()
-            BotParser._data.clear ()
-            BotParser._regexp.clear ()
-            BotParser._snippet.clear()
-
-            # - param namespace
-            # -------------------------------------------------------------------------
-            # and now, add the values of all the directives in this testcase in
-            # the namespace param. These are automatically casted to string for
-            # the convenience of other functions
-            for idirective, ivalue in itst.get_values ().items ():
-                BotParser._param [idirective] = str (ivalue)
-
-            # and also with the position of every argument (so that $1 can be
-            # interpreted as the first parameter, $2 as the second, and so on)
-            # ---note that these numerical indices are casted to strings for
-            # the convenience of other functions. Note that if the user
-            # explicitly requested to redirect the stdin (with '<' in the
-            # definition of the test case) it is also preserved here
-            counter = 0
-            for iarg in itst.get_args ():
-                BotParser._param [str (counter)] = str (iarg)
-                counter += 1
-
-            # - main (sys) namespace
+            # database
             # -------------------------------------------------------------------------
-            # initialize the namespace with the parameters passed to the main
-            # script (ie., the testbot), mainvars. These are given in
-            # self._argnamespace. Since the argparser automatically casts type
-            # according to their type field, they are all converted into strings
-            # here to allow a uniform treatment
-            if self._argnamespace:
-                for index, value in self._argnamespace.__dict__.items ():
-                    BotParser._namespace [index] = str (value)
-
-            # and also with the following sys variables
-            #
-            #   index         - index of this file in the range [0, ...)
-            #   execname          - name of this exec
-            #   date          - current date
-            #   time          - current time
-            #   startfullexecdatetime - when the whole execution started
-            #                           in date/time format
-            #   startfullexectime - when the whole execution started in
-            #                       time format
+            self._logger.info (" Writing data into '%s'" % dbhandler.get_name ())
+
+            # first, append the chunks of samples of the sys tables written
+            # in a separate database while this test case was running (if
+            # any) and remove it
+            if writer is not dbhandler:
+                dbhandler.merge (writer.get_name (),
+                                 [itable for itable in self._dbspec.get_db () if itable.sysp ()],
+                                 remove=True)
+
+            # now, populate all sys and data tables with the data computed in
+            # the run of this test case (which, in the case of sys tables, are
+            # only the samples not written yet)
+            for itable in self._dbspec.get_db ():
+
+                if itable.sysp() or itable.datap():
+                    self._logger.debug(" Populating '%s'" % itable.get_name())
+                    dbhandler.insert_data(itable,
+                                          istats[itable.get_name()])
+
+            # the only two remaining cases are user tables and admin
+            # tables:
             #
-            # Note that other fields are added below to register the right
-            # timings when every parsing started/ended
-            BotParser._namespace.index = itst.get_id ()
-            BotParser._namespace.execname  = os.path.basename (solver)
-            BotParser._namespace.date  = datetime.datetime.now ().strftime ("%Y-%m-%d")
-            BotParser._namespace.time  = datetime.datetime.now ().strftime ("%H:%M:%S")
-            BotParser._namespace.startfullexecdatetime = datetime.datetime.now()
-            BotParser._namespace.startfullexectime = time.time()
-
-            # once data has been written into the namespaces, compute the right
-            # name of the output file using the information in the current
-            # namespace
-            outputprefix = _sub (self._output)
+            # admin tables - they are populated once the whole process for
+            #                this solver is over
+            # user tables - they should be untouched by autobot. Only the
+            #               user should have access to them
+
+            # and now, stats which contain admin data are kept, whereas the
+            # rest are just discarded, hence saving memory. In case of large
+            # experiments, memory is not harvested
+            for idbname in istats:
+                if idbname[0:6]=="admin_":
+                    stats [idbname] += istats [idbname]
+            
+            # commit all changes every once in a while
+            if (idx + 1) % BotParser.batch_size == 0:
+                dbhandler.commit ()
+
+        # and return the namespaces of the last run
+        return run
+
+
+    # -----------------------------------------------------------------------------
+    # run_test_case
+    #
+    # runs the given solver over the test case qualified by itst. This method
+    # computes the name given to all the output files which are named after the
+    # given user specifcation where variable substitutions specified in the
+    # current namespace are allowed.
+    #
+    # If a prologue/epilogue is given (they should be a subclass of BotAction )
+    # then its __call__ method is invoked before/after the execution of the
+    # solver with this test case
+    #
+    # All data is computed in new namespaces and stats so that different test
+    # cases can be run simultaneously. If more than one job was requested, the
+    # output files are also initially written in a scratch directory that is
+    # used only by this test case. It returns a tuple with the namespaces (an
+    # instance of BotRun) and the stats of this run. The stats include all the
+    # tuples to be inserted in the data tables and the last samples of the sys
+    # tables (the others are written with 'dbhandler' while the solver runs)
+    # -----------------------------------------------------------------------------
+    def run_test_case (self, solver, resultsdir, itst, dbhandler):
+        """
+        runs the given solver over the test case qualified by itst. This method
+        computes the name given to all the output files which are named after
+        the given user specifcation where variable substitutions specified in
+        the current namespace are allowed.
+
+        If a prologue/epilogue is given (they should be a subclass of BotAction
+        ) then its __call__ method is invoked before/after the execution of the
+        solver with this test case
+
+        All data is computed in new namespaces and stats so that different test
+        cases can be run simultaneously. If more than one job was requested, the
+        output files are also initially written in a scratch directory that is
+        used only by this test case. It returns a tuple with the namespaces (an
+        instance of BotRun) and the stats of this run. The stats include all the
+        tuples to be inserted in the data tables and the last samples of the
+        sys tables (the others are written with 'dbhandler' while the solver
+        runs)
+        """
+
+        # namespaces
+        # -------------------------------------------------------------------------
+        # create the namespaces that hold variables whose value depends upon
+        # the output of the current execution, and also the stats of this run
+        run = BotRun (BotParser._user)
+        stats = defaultdict (list)
+
+        # - param namespace
+        # -------------------------------------------------------------------------
+        # and now, add the values of all the directives in this testcase in
+        # the namespace param. These are automatically casted to string for
+        # the convenience of other functions
+        for idirective, ivalue in itst.get_values ().items ():
+            run.param [idirective] = str (ivalue)
+
+        # and also with the position of every argument (so that $1 can be
+        # interpreted as the first parameter, $2 as the second, and so on)
+        # ---note that these numerical indices are casted to strings for
+        # the convenience of other functions. Note that if the user
+        # explicitly requested to redirect the stdin (with '<' in the
+        # definition of the test case) it is also preserved here
+        counter = 0
+        for iarg in itst.get_args ():
+            run.param [str (counter)] = str (iarg)
+            counter += 1
+
+        # - main (sys) namespace
+        # -------------------------------------------------------------------------
+        # initialize the namespace with the parameters passed to the main
+        # script (ie., the testbot), mainvars. These are given in
+        # self._argnamespace. Since the argparser automatically casts type
+        # according to their type field, they are all converted into strings
+        # here to allow a uniform treatment
+        if self._argnamespace:
+            for index, value in self._argnamespace.__dict__.items ():
+                run.namespace [index] = str (value)
+
+        # and also with the following sys variables
+        #
+        #   index         - index of this file in the range [0, ...)
+        #   execname          - name of this exec
+        #   date          - current date
+        #   time          - current time
+        #   startfullexecdatetime - when the whole execution started
+        #                           in date/time format
+        #   startfullexectime - when the whole execution started in
+        #                       time format
+        #
+        # Note that other fields are added below to register the right
+        # timings when every parsing started/ended
+        run.namespace.index = itst.get_id ()
+        run.namespace.execname  = os.path.basename (solver)
+        run.namespace.date  = datetime.datetime.now ().strftime ("%Y-%m-%d")
+        run.namespace.time  = datetime.datetime.now ().strftime ("%H:%M:%S")
+        run.namespace.startfullexecdatetime = datetime.datetime.now()
+        run.namespace.startfullexectime = time.time()
+
+        # once data has been written into the namespaces, compute the right
+        # name of the output file using the information in the current
+        # namespace
+        outputprefix = self._sub (self._output, run.namespace)
+
+        # in case various test cases are run simultaneously, create a scratch
+        # directory to be used only by this one. Otherwise, the output files
+        # are written in the current working directory
+        workdir = os.getcwd ()
+        if self._pool.get_jobs () > 1:
+            workdir = tempfile.mkdtemp (prefix='scratch-',
+                                        dir=os.path.dirname (resultsdir))
+
+        try:
 
             # running
             # -------------------------------------------------------------------------
@@ -452,9 +637,9 @@ class BotTester (BotParser):
                                          basedir=self._directory,
                                          resultsdir=resultsdir,
                                          compress=self._compress,
-                                         namespace=BotParser._namespace,
-                                         user=BotParser._user,
-                                         param=BotParser._param,
+                                         namespace=run.namespace,
+                                         user=run.user,
+                                         param=run.param,
                                          stats=stats,
                                          startruntime=startruntime)
                 action (self._logger)
@@ -462,14 +647,15 @@ class BotTester (BotParser):
             # invoke the execution of this test case and record the start run
             # time and end run time
             self._logger.info ('\t%s' % itst)
-            BotParser._namespace.startexecdatetime = datetime.datetime.now()
-            BotParser._namespace.startexectime = time.time()
+            run.namespace.startexecdatetime = datetime.datetime.now()
+            run.namespace.startexectime = time.time()
 
             self.run_single_case (os.path.abspath (solver),
-                                  resultsdir, itst, outputprefix, stats)
+                                  resultsdir, itst, outputprefix, stats,
+                                  run, workdir, dbhandler)
 
-            BotParser._namespace.endexecdatetime = datetime.datetime.now()
-            BotParser._namespace.endexectime = time.time()
+            run.namespace.endexecdatetime = datetime.datetime.now()
+            run.namespace.endexectime = time.time()
 
             # finally, if an epilogue was given, execute it now passing by also
             # the end run time
@@ -485,94 +671,52 @@ class BotTester (BotParser):
                                          basedir=self._directory,
                                          resultsdir=resultsdir,
                                          compress=self._compress,
-                                         namespace=BotParser._namespace,
-                                         data=BotParser._data,
-                                         user=BotParser._user,
-                                         param=BotParser._param,
-                                         regexp=BotParser._regexp,
+                                         namespace=run.namespace,
+                                         data=run.data,
+                                         user=run.user,
+                                         param=run.param,
+                                         regexp=run.regexp,
                                          stats=stats,
                                          startruntime=startruntime,
                                          endruntime=time.time ())
                 action (self._logger)
 
-            # and register the exact time when the whole execution ended
-            # including processing the epilogue both in seconds from Epoc
-            # (endruntime) and in date/time format (enddatetime)
-            BotParser._namespace.endfullexectime = time.time()
-            BotParser._namespace.endfullexecdatetime = datetime.datetime.now()
+        finally:
 
-            # database
-            # -------------------------------------------------------------------------
-            # now, write data to the database. Note that we do this after
-            # invoking the epilogue so that the user gets a finer control on
-            # the data that is about to be inserted into the database
-            # finally, write down all the information to a sqlite3 db
-            dbname = os.path.join (self._directory,
-                                   os.path.basename (solver),
-                                   os.path.basename (solver) + '.db')
-
-            # create a new SQLITE3 database connection
-            dbhandler = sqltools.dbaccess(dbname)
-            
-            # in case this is the first test case, create all tables specified
-            # in the database specification file
-            if first:
-                for itable in self._dbspec.get_db():
-                    dbhandler.create_table(itable)
-            
-            self._logger.info (" Writing data into '%s'" % dbname)
-
-            # now, create the admin tables and populate all data tables
-            # self.create_admin_tables ()
-            for itable in self._dbspec.get_db ():
-
-                # if this is a system table, then populate it with data from
-                # the dictionary stats
-                if itable.sysp():
-                    self._logger.debug(" Populating '%s'" % itable.get_name())
-                    dbhandler.insert_data(itable,
-                                          stats[itable.get_name()])
+            # remove the scratch directory if any was created
+            if workdir != os.getcwd ():
+                shutil.rmtree (workdir, ignore_errors=True)
 
-                # if this is a data table, then populate it directly with data
-                # from the namespaces
-                if itable.datap():
-                    self._logger.debug(" Populating '%s'" % itable.get_name())
-                    dbhandler.insert_data(itable,
-                                          itable.poll(dbspec=self._dbspec,
-                                                      namespace=BotParser._namespace,
-                                                      data=BotParser._data,
-                                                      param=BotParser._param,
-                                                      regexp=BotParser._regexp,
-                                                      snippet=BotParser._snippet,
-                                                      user=BotParser._user,
-                                                      logger=self._logger,
-                                                      logfilter=self._logfilter))
+        # and register the exact time when the whole execution ended
+        # including processing the epilogue both in seconds from Epoc
+        # (endruntime) and in date/time format (enddatetime)
+        run.namespace.endfullexectime = time.time()
+        run.namespace.endfullexecdatetime = datetime.datetime.now()
 
-            # the only two remaining cases are user tables and admin
-            # tables:
-            #
-            # admin tables - they are populated once the whole process for
-            #                this solver is over
-            # user tables - they should be untouched by autobot. Only the
-            #               user should have access to them
+        # data tables
+        # -------------------------------------------------------------------------
+        # now, compute the data to be written to the data tables. Note that we
+        # do this after invoking the epilogue so that the user gets a finer
+        # control on the data that is about to be inserted into the database
+        for itable in self._dbspec.get_db ():
 
-            # and now, stats which do not contain admin data can be completely
-            # removed, hence saving memory -- this is a great modification of
-            # this release. In case of large experiments, memory is not
-            # harvested
-            newstats = defaultdict (list)
-            for idbname in stats:
-                if idbname[0:6]=="admin_":
-                    newstats [idbname] = stats [idbname]
-            stats = newstats
-            
-            # commit all changes and close the database
-            dbhandler.close()
+            # data tables are populated directly with data from the
+            # namespaces
+            if itable.datap():
+                stats[itable.get_name()] = itable.poll(dbspec=self._dbspec,
+                                                       namespace=run.namespace,
+                                                       data=run.data,
+                                                       param=run.param,
+                                                       regexp=run.regexp,
+                                                       snippet=run.snippet,
+                                                       user=run.user,
+                                                       logger=self._logger,
+                                                       logfilter=self._logfilter,
+                                                       matches=run.matches)
+
+        # and return the namespaces and stats of this run
+        return (run, stats)
 
-            # and make first false to never create tables in this database
-            # again
-            first = False
-            
 
     # -----------------------------------------------------------------------------
     # run_single_case
@@ -583,13 +727,16 @@ class BotTester (BotParser):
     # directory relative to the current location) for solving the particular
     # test case qualified by itst. It copies the stdout and stderr of the solver
     # in files named after output (plus either .log or .err) which are then
-    # moved to the specified results directory 'resultsdir'. The data generated
-    # is stored in 'stats'
+    # moved to the specified results directory 'resultsdir'. The output files
+    # are initially written in 'workdir'. The data generated is stored in
+    # 'stats' and the namespaces of this run are given in 'run'. Samples of the
+    # sys tables are written with 'dbhandler' every chunk_size samples
     #
     # The forked process is pinged every 'check' seconds and it is launched with
     # computational resources 'timeout' and 'memory'
     # -----------------------------------------------------------------------------
-    def run_single_case (self, solver, resultsdir, itst, output, stats):
+    def run_single_case (self, solver, resultsdir, itst, output, stats, run,
+                         workdir, dbhandler):
         """
         executes the specified 'solver' (qualified with its full path) *in the
         same directory where it resides* (this is fairly convenient in case the
@@ -597,8 +744,10 @@ class BotTester (BotParser):
         directory relative to the current location) for solving the particular
         test case qualified by itst. It copies the stdout and stderr of the
         solver in files named after output (plus either .log or .err) which are
-        then moved to the specified results directory 'resultsdir'. The data
-        generated is stored in 'stats'
+        then moved to the specified results directory 'resultsdir'. The output
+        files are initially written in 'workdir'. The data generated is stored
+        in 'stats' and the namespaces of this run are given in 'run'. Samples
+        of the sys tables are written with 'dbhandler' every chunk_size samples
 
         The forked process is pinged every 'check' seconds and it is launched
         with computational resources 'timeout' and 'memory'
@@ -626,13 +775,54 @@ class BotTester (BotParser):
 
             # redirect the log and standard output to different files so that the
             # whole output is recorded
-            (fdlog, fderr) = (os.open (os.path.join (os.getcwd (), output + ".log"),
+            (fdlog, fderr) = (os.open (os.path.join (workdir, output + ".log"),
                                        os.O_CREAT | os.O_TRUNC | os.O_WRONLY,
                                        0666),
-                              os.open (os.path.join (os.getcwd (), output + ".err"),
+                              os.open (os.path.join (workdir, output + ".err"),
                                        os.O_CREAT | os.O_TRUNC | os.O_WRONLY,
                                        0666))
 
+            # in case a cgroup was requested, create a new one for this test
+            # case and enforce the memory bound there. If it is not possible,
+            # resources are accounted only examining all processes
+            cgroup = None
+            if self._cgroup:
+                try:
+                    cgroup = cgrouptools.CGroup (self._cgroup)
+                    if not cgroup.set_memory_max (self._memory):
+                        self._logger.debug (" The memory bound could not be set in cgroup '%s'" % cgroup.get_path ())
+                except (IOError, OSError):
+                    self._logger.warning (" It was not possible to create a cgroup in '%s'" % self._cgroup)
+
+            def _preexec ():
+                """
+                prepares the child right before executing the solver: it
+                creates a new session, moves the child into its cgroup (if
+                any), restores the signals ignored by python and sets its
+                resource limits (if requested) so that they are enforced by
+                the kernel
+                """
+
+                os.setsid ()
+                if cgroup:
+                    cgroup.attach ()
+
+                # otherwise, the solver would inherit SIGXFSZ as ignored and it
+                # would not be killed when exceeding its limit of file size
+                systools.restore_signals ()
+
+                # RLIMIT_CPU sends SIGXCPU once the soft limit is exceeded and
+                # SIGKILL once the hard limit is exceeded
+                if self._rlimits:
+                    resource.setrlimit (resource.RLIMIT_AS,
+                                        (int (self._memory), int (self._memory)))
+                    resource.setrlimit (resource.RLIMIT_CPU,
+                                        (int (math.ceil (self._timeout)),
+                                         int (math.ceil (self._timeout)) + BotTester.kill_delay))
+                if self._filesize:
+                    resource.setrlimit (resource.RLIMIT_FSIZE,
+                                        (self._filesize * 2**20, self._filesize * 2**20))
+
             # create the child and record its process identifier
             # atorralba: Added parameter preexec_fn=os.setsid to address issue
             # #20. This ensures the execution of os.setsid after fork() so that
@@ -644,73 +834,145 @@ class BotTester (BotParser):
                                           stdout = fdlog,
                                           stderr = fderr,
                                           cwd=os.path.dirname (solver),
-                                          preexec_fn=os.setsid)
+                                          preexec_fn=_preexec,
+                                          close_fds=True)
             except OSError:
                 self._logger.critical (" OSError raised when invoking the subprocess")
+                if cgroup:
+                    cgroup.remove ()
                 raise OSError
 
             except ValueError:
                 self._logger.critical (" Popen was invoked with invalid arguments")
+                if cgroup:
+                    cgroup.remove ()
                 raise ValueError
 
             child_pid = child.pid
 
+            # the child is the leader of its own process group (see above).
+            # Its termination is notified by a watcher so that it is noticed
+            # immediately
+            child_pgrp = child_pid
+            watcher = systools.ChildWatcher (child_pid)
+
             # initialization
-            max_mem   = 0                           # max mem ever used
+            max_mem   = 0                           # max mem ever used (in bytes)
             real_time = 0                           # real time (in seconds)
+            prev_time = 0                           # real time of the last tick
             term_attempted = False                  # no SIGTERM yet
+            cause = None                            # why the child was killed
             time0 = datetime.datetime.now ()        # current time
 
             timeline = systools.ProcessTimeline ()  # create a process timeline
 
+            # only the descendants of the child are examined with a tracker.
+            # Record the child in the timeline right away, since it might
+            # terminate before the first tick
+            tracker = systools.ProcessTracker (child_pgrp)
+            timeline += systools.ProcessGroup (child_pgrp, tracker)
+
+            # the interval between ticks is either fixed or adaptive
+            interval = timetools.Interval (self._check, self._adaptive)
+
+            # samples of the sys tables are stored column by column. Those
+            # that are aggregated (either over windows or until they change)
+            # are computed online here
+            samplers = dict ()
+            for itable in self._dbspec.get_db ():
+                if itable.sysp ():
+                    stats [itable.get_name ()] = sqltools.dbbuffer (itable)
+                    samplers [itable.get_name ()] = itable.create_sampler ()
+
+            # the memory used is also summarized online
+            vsize = stattools.Summary ()
+
+            # the number of processes and threads are computed only if they
+            # are used
+            numprocs = self._uses (dbparser.SYSNST, 'numprocs')
+            numthreads = self._uses (dbparser.SYSNST, 'numthreads')
+
             while True:
 
-                time.sleep(self._check)
+                # wait either for the termination of the child or the next
+                # tick, whatever happens first
+                status = watcher.wait (interval.get ())
 
                 # get info of all the processes executed with the process group id
                 # of the child and its children and add them to the timeline
-                group = systools.ProcessGroup(os.getpgid (child_pid))
+                group = systools.ProcessGroup(child_pgrp, tracker)
                 timeline += group
 
                 # compute the wall-clock time
                 time1 = datetime.datetime.now ()    # time after sleeping
                 real_time = (time1-time0).total_seconds ()  # compute wall clock time accurately
+                timestamp = time.time ()            # when samples are taken
+
+                # the termination of the child is acknowledged only after
+                # sampling its process group one last time so that the
+                # processes it left behind are also added to the timeline
+                if status is not None:
 
-                # Generate the children information before the waitpid call to avoid a
-                # race condition. This way, we know that the child_pid is a descendant.
-                (pid, status) = os.waitpid (child_pid, os.WNOHANG)
-                if ((pid, status) != (0, 0)):
+                    # the child has been reaped by the watcher, so make sure
+                    # subprocess does not attempt to wait for it again
+                    child.returncode = status
                     break
 
                 # get the value of some sysvars such as total cpu time,
-                # memory...
+                # memory... If a cgroup is used, the cpu time (and the memory
+                # in use, in bytes) are taken from it
                 total_time = timeline.total_time()
                 total_vsize = group.total_vsize()
-                num_processes = timeline.total_processes ()
-                num_threads = timeline.total_threads ()
-
-                # and store them in the corresponding namespace
-                BotParser._namespace.cputime = timeline.total_time ()
-                BotParser._namespace.wctime = real_time
-                BotParser._namespace.vsize = timeline.total_vsize ()
-                BotParser._namespace.numprocs = timeline.total_processes ()
-                BotParser._namespace.numthreads = timeline.total_threads ()
-
-                # gather information for sys tables
+                memory = total_vsize * 2 ** 20
+                if cgroup:
+                    total_time = cgroup.cpu_time ()
+                    current = cgroup.memory_current ()
+                    if current is not None:
+                        memory = current
+                        run.namespace.memory = memory / float (2 ** 20)
+                        run.namespace.peakmemory = cgroup.memory_peak () / float (2 ** 20)
+
+                # and store them in the corresponding namespace along with
+                # the interval elapsed since the last tick
+                run.namespace.interval = interval.get ()
+                run.namespace.cputime = total_time
+                run.namespace.wctime = real_time
+                run.namespace.vsize = timeline.total_vsize ()
+                if numprocs:
+                    run.namespace.numprocs = timeline.total_processes ()
+                if numthreads:
+                    run.namespace.numthreads = timeline.total_threads ()
+                vsize.update (run.namespace.vsize, real_time - prev_time)
+                prev_time = real_time
+
+                # gather information for sys tables (aggregating it if
+                # requested) and write it to the database as soon as a whole
+                # chunk of samples is available
                 for itable in self._dbspec.get_db ():
                     if itable.sysp ():
-                        stats [itable.get_name ()] += itable.poll (dbspec=self._dbspec,
-                                                                   namespace=BotParser._namespace,
-                                                                   data=BotParser._data,
-                                                                   param=BotParser._param,
-                                                                   regexp=BotParser._regexp,
-                                                                   snippet=BotParser._snippet,
-                                                                   user=BotParser._user,
-                                                                   logger=self._logger,
-                                                                   logfilter=self._logfilter)
-
-                # update the maximum memory usage
-                max_mem = max (max_mem, total_vsize)
+                        rows = itable.poll (dbspec=self._dbspec,
+                                            namespace=run.namespace,
+                                            data=run.data,
+                                            param=run.param,
+                                            regexp=run.regexp,
+                                            snippet=run.snippet,
+                                            user=run.user,
+                                            logger=self._logger,
+                                            logfilter=self._logfilter,
+                                            matches=run.matches)
+                        if samplers [itable.get_name ()]:
+                            rows = samplers [itable.get_name ()].update (rows, real_time)
+
+                        samples = stats [itable.get_name ()]
+                        samples.extend (rows, timestamp)
+                        if len (samples) >= BotTester.chunk_size:
+                            dbhandler.insert_data (itable, samples)
+                            stats [itable.get_name ()] = sqltools.dbbuffer (itable)
+
+                # update the maximum memory usage and compute the interval
+                # until the next tick
+                max_mem = max (max_mem, memory)
+                interval.update (memory, self._memory)
 
                 # decide whether to kill the group or not
                 try_term = (total_time > self._timeout or
@@ -725,10 +987,13 @@ class BotTester (BotParser):
      children found: %s""" % timeline.pids ())
                     timeline.terminate ()
                     term_attempted = True
+                    cause = {False: 'timeout', True: 'memory'}[max_mem > self._memory]
                 elif term_attempted and try_kill:
                     self._logger.debug (""" aborting children with SIGKILL ...
      children found: %s""" % timeline.pids ())
                     timeline.terminate ()
+                    if cgroup:
+                        cgroup.kill ()
 
 
             # Execution has been completed!
@@ -736,8 +1001,46 @@ class BotTester (BotParser):
             # The main tasks here are to collect data for the admin tables and
             # also to process the stdout/stderr generated by this execution
             # -----------------------------------------------------------------
-            # record the exit status of this process
-            stats ['admin_status'].append ((itst.get_id (), status))
+            # the cpu time consumed by the child is accounted exactly either by
+            # its cgroup or by the kernel when it was waited for, along with
+            # its peak resident set size (in MB). The wall-clock time is
+            # updated as well
+            rusage = watcher.get_rusage ()
+            if cgroup:
+                run.namespace.cputime = cgroup.cpu_time ()
+            elif rusage:
+                run.namespace.cputime = rusage.ru_utime + rusage.ru_stime
+            if rusage:
+                run.namespace.maxrss = rusage.ru_maxrss / 1024.0
+            run.namespace.wctime = real_time
+
+            # the summaries of the memory used are available only now, along
+            # with the cpu utilization
+            for (name, value) in vsize.get ().items ():
+                run.namespace [name + 'vsize'] = value
+            if real_time > 0 and 'cputime' in run.namespace:
+                run.namespace.cpuutil = run.namespace.cputime / real_time
+
+            # the samples aggregated since the last row of every sys table
+            # are written as well
+            for (name, sampler) in samplers.items ():
+                if sampler:
+                    stats [name].extend (sampler.flush (real_time), time.time ())
+
+            # record the exit status of this process along with the cause of
+            # its termination: either because it was killed here or because
+            # the kernel enforced some limit. If it was killed once it exceeded
+            # the soft limit of cpu time, the kernel enforced the hard one
+            watcher.close ()
+            if not cause:
+                if self._rlimits and 'cputime' in run.namespace:
+                    cause = systools.exit_cause (status, run.namespace.cputime,
+                                                 int (math.ceil (self._timeout)))
+                else:
+                    cause = systools.exit_cause (status)
+                if cgroup and cgroup.oom_kills ():
+                    cause = 'memory'
+            stats ['admin_status'].append ((itst.get_id (), status, cause))
 
             # Even if we got here, there may be orphaned children or something we
             # may have missed due to a race condition. Check for that and kill
@@ -746,28 +1049,44 @@ class BotTester (BotParser):
  [Sanity check] children found: %s""" % timeline.pids ())
             timeline.terminate ()
 
+            # also kill all processes that are still in the process group of
+            # the child, even if they were never sampled
+            try:
+                os.killpg (child_pgrp, signal.SIGKILL)
+            except OSError:
+                pass
+
+            # if a cgroup was used, kill all processes that might have
+            # escaped from the process group and remove it
+            if cgroup and not cgroup.remove ():
+                self._logger.warning (" The cgroup '%s' could not be removed" % cgroup.get_path ())
+
             # add the timeline of this execution to the stats (sys table)
             stats ['admin_timeline'] += (map (lambda x,y:tuple (x+y),
                                               [[itst.get_id ()]]*len (timeline.get_processes ()),
                                               timeline.get_processes ()))
 
             # process now the stdout/stderr generated by the executable
-            for ilogfile in ['.log', '.err']:
+            for (ilogfile, variable) in [('.log', 'stdout'), ('.err', 'stderr')]:
 
                 # create a new sys variables with the contents of the
-                # stdout/stderr generated by the executable
-                with open(os.path.join(os.getcwd(), output + ilogfile), "r") as stream:
-                    if ilogfile == '.log': 
-                        BotParser._namespace.stdout = stream.read()
-                    if ilogfile == '.err':
-                        BotParser._namespace.stderr = stream.read()
-                stream.close()
+                # stdout/stderr generated by the executable if they are used.
+                # If they are used only to apply regexps to them, or not at
+                # all, they are just mapped in memory when parsing them
+                contents = None
+                if self._uses(dbparser.SYSNST, variable, contexts=False):
+                    with open(os.path.join(workdir, output + ilogfile), "r") as stream:
+                        contents = stream.read()
+                    run.namespace [variable] = contents
+                elif self._uses(dbparser.SYSNST, variable):
+                    contents = streamtools.MappedFile(os.path.join(workdir, output + ilogfile))
+                    run.namespace [variable] = contents
 
                 # parse the contents of these files
-                self.parse_single_file(os.path.join(os.getcwd(), output + ilogfile))
+                self.parse_single_file(os.path.join(workdir, output + ilogfile), run, contents)
 
                 # and copy the files to their target directory
-                self.copy_file(os.path.join (os.getcwd (), output + ilogfile),
+                self.copy_file(os.path.join (workdir, output + ilogfile),
                                resultsdir,
                                output + ilogfile,
                                move=True)
@@ -812,6 +1131,9 @@ class BotTester (BotParser):
         else:
             raise ValueError (" Incorrect dbspec in wrapup")
 
+        # and show the hit rate of the cache of compiled snippets
+        dbexpression.log_snippet_stats (self._logger)
+
 
     # -----------------------------------------------------------------------------
     # create_admin_tables
@@ -825,6 +1147,10 @@ class BotTester (BotParser):
         number of admin tables. These are created by hand in the following method
         """
 
+        # admin tables are created only once
+        if self._dbspec.get_db ("admin_params"):
+            return
+
         self._dbspec += dbparser.DBTable ("admin_params",
                                           [dbparser.DBColumn ('solver', 'text', 'ADMINVAR',
                                                               'solver', 'None'),
@@ -876,42 +1202,11 @@ class BotTester (BotParser):
                                           [dbparser.DBColumn ('id', 'text', 'ADMINVAR',
                                                               'index', 'None'),
                                            dbparser.DBColumn ('status', 'integer', 'ADMINVAR',
-                                                              'status', 'None')])
-
+                                                              'status', 'None'),
+                                           dbparser.DBColumn ('cause', 'text', 'ADMINVAR',
+                                                              'cause', 'None')])
 
-    # -----------------------------------------------------------------------------
-    # insert_data
-    #
-    # creates the table qualified by the instance of DBTable 'dbtable' in the
-    # given databasename and writes the specified 'data' into it. In case the
-    # table does not exist, it automatically creates it
-    # -----------------------------------------------------------------------------
-    def insert_data (self, databasename, dbtable, data):
-
-        """
-        creates the table qualified by the instance of DBTable 'dbtable' in the
-        given databasename and writes the specified 'data' into it. In case the
-        table does not exist, it automatically creates it
-        """
-
-        # compute the filename
-        dbfilename = databasename
-        self._logger.debug (" Populating '%s' in '%s'" % (dbtable.get_name (), dbfilename))
-
-        # connect to the sql database
-        db = sqltools.dbaccess (dbfilename)
 
-        # create the table in case it does not exist
-        if not db.find(dbtable.get_name()):
-            db.create_table (dbtable)
-
-        # and write data
-        db.insert_data (dbtable, data)
-
-        # close and exit
-        db.close ()
-
-        
     # -----------------------------------------------------------------------------
     # go
     #
@@ -937,6 +1232,20 @@ class BotTester (BotParser):
     # directory - target directory where all output is recorded
     # compress - if true, the files containing the standard output and error are
     #            compressed with bzip2
+    # jobs - maximum number of test cases run simultaneously
+    # concurrent - if true, the experiments with all solvers are run
+    #              concurrently. Still, no more than 'jobs' test cases are run
+    #              simultaneously
+    # cgroup - if a directory of a cgroup (v2) is given, every test case is run
+    #          in a new cgroup created there which is used to account the cpu
+    #          time and memory and to enforce the memory bound
+    # rlimits - if true, the memory and time bounds are also enforced by the
+    #           kernel on every process with setrlimit (RLIMIT_AS and RLIMIT_CPU)
+    # filesize - if given, maximum size (in MB) of every file written by the
+    #            solver (RLIMIT_FSIZE)
+    # adaptive - if given, the interval between successive pings starts at
+    #            this value and it grows geometrically up to 'check'. It is
+    #            shortened if the memory in use approaches its bound
     # logger - if a logger is given, autobot uses a child of it. Otherwise, it
     #          creates its own logger
     # logfilter - if the client code uses a logger that requires additional
@@ -960,8 +1269,10 @@ class BotTester (BotParser):
     # -----------------------------------------------------------------------------
     def go (self, solver, tstfile, dbfile, timeout, memory, argnamespace=None,
             output='$index', check=5, directory=os.getcwd (), compress=False,
-            logger=None, logfilter=None, prologue=None, epilogue=None,
-            enter=None, windUp=None, quiet=False):
+            jobs=1, concurrent=False, cgroup=None, rlimits=False, filesize=None,
+            adaptive=None, dbprofile='default', dboptimize=(), pack=None, logger=None,
+            logfilter=None, prologue=None, epilogue=None, enter=None, windUp=None,
+            quiet=False):
         """
         main service provided by this class. It automates the whole execution
         according to the given parameters. Solver is either a list of strings
@@ -985,6 +1296,27 @@ class BotTester (BotParser):
         directory - target directory where all output is recorded
         compress - if true, the files containing the standard output and error are
                    compressed with bzip2
+        jobs - maximum number of test cases run simultaneously
+        concurrent - if true, the experiments with all solvers are run
+                     concurrently. Still, no more than 'jobs' test cases are run
+                     simultaneously
+        cgroup - if a directory of a cgroup (v2) is given, every test case is
+                 run in a new cgroup created there which is used to account the
+                 cpu time and memory and to enforce the memory bound
+        rlimits - if true, the memory and time bounds are also enforced by the
+                  kernel on every process with setrlimit (RLIMIT_AS and
+                  RLIMIT_CPU)
+        filesize - if given, maximum size (in MB) of every file written by the
+                   solver (RLIMIT_FSIZE)
+        adaptive - if given, the interval between successive pings starts at
+                   this value and it grows geometrically up to 'check'. It is
+                   shortened if the memory in use approaches its bound
+        dbprofile - storage profile of the databases (see sqltools.profiles)
+        dboptimize - optimizations applied to every database once all data has
+                     been written: 'analyze' and/or 'vacuum'
+        pack - if given, every chunk of samples of the sys tables is stored in a
+               single row with a blob per column (see sqltools.pack) which is
+               compressed as specified: 'raw' or 'zlib'
         logger - if a logger is given, autobot uses a child of it. Otherwise, it
                  creates its own logger
         logfilter - if the client code uses a logger that requires additional
@@ -1010,10 +1342,13 @@ class BotTester (BotParser):
         # copy the attributes
         (self._solver, self._tstfile, self._dbfile, self._timeout, self._memory,
          self._argnamespace, self._output, self._check, self._directory, self._compress,
-         self._prologue, self._epilogue, self._quiet) = \
+         self._jobs, self._concurrent, self._cgroup, self._rlimits, self._filesize,
+         self._adaptive, self._dbprofile, self._dboptimize, self._pack, self._prologue,
+         self._epilogue, self._quiet) = \
          (solver, tstfile, dbfile, timeout, memory,
           argnamespace, output, check, directory, compress,
-          prologue, epilogue, quiet)
+          jobs, concurrent, cgroup, rlimits, filesize, adaptive,
+          dbprofile, dboptimize, pack, prologue, epilogue, quiet)
 
         # logger settings - if a logger has been passed, just create a child of
         # it and save the log filter since it might be given to other methods
@@ -1051,7 +1386,14 @@ class BotTester (BotParser):
 
         # check that all parameters are valid
         self.check_flags (self._solver, self._tstfile, self._dbfile,
-                          timeout, memory, check, directory)
+                          timeout, memory, check, directory, jobs, filesize,
+                          adaptive, dbprofile, dboptimize, pack)
+
+        # in case a cgroup was given, make sure it can be used. Otherwise,
+        # resources are accounted only examining all processes
+        if self._cgroup and not cgrouptools.available (self._cgroup):
+            self._logger.warning (" '%s' is not a writable cgroup (v2) or processes can not be moved into it. Resources are accounted with /proc only" % self._cgroup)
+            self._cgroup = None
 
         # and now, create the test case and database specifications
 
@@ -1091,7 +1433,9 @@ class BotTester (BotParser):
         if (not self._quiet):
 
             self.show_switches (solver, self._tstfile, self._dbfile, timeout, memory,
-                                check, directory, compress)
+                                check, directory, compress, jobs, concurrent,
+                                self._cgroup, rlimits, filesize, adaptive,
+                                dbprofile, dboptimize, pack)
 
         # is the user overriding the definition of the data regexp?
         for iregexp in self._dbspec.get_regexp ():
@@ -1105,91 +1449,152 @@ class BotTester (BotParser):
         if not solver:
             self._logger.warning (" No solver was given")
 
-        for isolver in self._solver:
+        # admin tables are shared by all solvers so that they are created only
+        # once
+        self.create_admin_tables ()
+
+        # compile all tables polled while running the test cases. This is done
+        # only once, before any job starts, since they are shared by all jobs
+        for itable in self._dbspec.get_db ():
+            if itable.sysp () or itable.datap ():
+                itable.compile (self._dbspec, self._logger, self._logfilter)
+
+        # create the pool of jobs used to run the test cases of every solver.
+        # If solvers are run concurrently, all of them share this pool so that
+        # no more than the given number of jobs are run simultaneously
+        self._pool = jobtools.JobPool (self._jobs)
+        solvers = jobtools.JobPool (max (1, len (self._solver)) if self._concurrent else 1)
+        try:
+            for isolver in solvers.imap (lambda x: self.run_solver (x, enter, windUp),
+                                         self._solver):
+                self._logger.debug (" Experiments with solver '%s' finished" % isolver)
+        finally:
+            solvers.close ()
+            self._pool.close ()
 
-            # first of all make sure to compute correctly the solver name
-            solvername = os.path.basename (isolver)
-            
-            # create an empty dictionary of stats
-            istats = defaultdict (list)
-
-            self._logger.info (" Starting experiments with solver '%s'" % solvername)
-
-            # setup the necessary environment and retrieve the directories to be
-            # used in the experimentation
-            (resultsdir, configdir, logdir) = self.setup (solvername, self._directory)
-
-            # write all the log information in the logdir
-            self.fetch (logdir)
-
-            # in case it is requested to execute an *enter* action do it now
-            if enter:
-                action = enter (solver=isolver,
-                                tstspec=self._tstspec,
-                                dbspec=self._dbspec,
-                                timeout=self._timeout,
-                                memory=self._memory,
-                                check=self._check,
-                                basedir=self._directory,
-                                resultsdir=resultsdir,
-                                compress=self._compress,
-                                namespace=BotParser._namespace,
-                                user=BotParser._user,
-                                stats=istats)
-                action (self._logger)
+        self._logger.debug (" Exiting from the automated execution ...")
+
+
+    # -----------------------------------------------------------------------------
+    # run_solver
+    #
+    # runs all test cases with the given solver and records its admin data. If
+    # an enter/windUp action is given, it is executed before/after running all
+    # test cases with this solver. It returns the solver
+    # -----------------------------------------------------------------------------
+    def run_solver (self, isolver, enter, windUp):
+        """
+        runs all test cases with the given solver and records its admin data.
+        If an enter/windUp action is given, it is executed before/after running
+        all test cases with this solver. It returns the solver
+        """
+
+        # first of all make sure to compute correctly the solver name
+        solvername = os.path.basename (isolver)
+        
+        # create an empty dictionary of stats
+        istats = defaultdict (list)
+
+        self._logger.info (" Starting experiments with solver '%s'" % solvername)
+
+        # setup the necessary environment and retrieve the directories to be
+        # used in the experimentation
+        (resultsdir, configdir, logdir) = self.setup (solvername, self._directory)
+
+        # write all the log information in the logdir
+        self.fetch (logdir)
+
+        # in case it is requested to execute an *enter* action do it now
+        # with empty namespaces
+        run = BotRun (BotParser._user)
+        if enter:
+            action = enter (solver=isolver,
+                            tstspec=self._tstspec,
+                            dbspec=self._dbspec,
+                            timeout=self._timeout,
+                            memory=self._memory,
+                            check=self._check,
+                            basedir=self._directory,
+                            resultsdir=resultsdir,
+                            compress=self._compress,
+                            namespace=run.namespace,
+                            user=run.user,
+                            stats=istats)
+            action (self._logger)
+
+        # create the database of this solver with all tables. All data of this
+        # solver is written by the same writer in a separate thread so that
+        # test cases are not delayed by the database. It is closed (hence
+        # committing all pending changes) no matter how the execution ends
+        dbname = os.path.join (self._directory, solvername, solvername + '.db')
+        dbhandler = sqltools.dbwriter (dbname, self._dbprofile)
+        try:
+
+            for itable in self._dbspec.get_db ():
+                self._logger.debug (" Creating table '%s'" % itable.get_name ())
+                if itable.sysp () and self._pack:
+                    dbhandler.create_packed_table (itable, self._pack)
+                else:
+                    dbhandler.create_table (itable)
 
             # record the start time
-            self._starttime = datetime.datetime.now ()
+            starttime = datetime.datetime.now ()
 
             # now, invoke the execution of all tests with this solver
-            self.run_all_cases (isolver, resultsdir, istats)
+            run = self.run_all_cases (isolver, resultsdir, istats, dbhandler)
 
             # record the end time of this solver
-            self._endtime = datetime.datetime.now ()
+            endtime = datetime.datetime.now ()
 
             # and wrapup
             self.wrapup (self._tstspec, self._dbspec, configdir)
 
-            # finally, write down all data in the admin tables to a sqlite3 db
-            dbname = os.path.join (self._directory, solvername, solvername + '.db')
+            # finally, write down all data in the admin tables
             self._logger.info (" Writing admin data into '%s'" % dbname)
 
             # admin tables are not populated using the poll method. Instead,
-            # their contents are inserted manually in either run_single_case or
-            # here
+            # their contents are inserted manually in either run_single_case
+            # or here
             istats ['admin_params'] = [(isolver, self._tstfile, self._dbfile, self._check, self._timeout, self._memory)]
             istats ['admin_tests'] = self._tstspec.get_defs ()
-            istats ['admin_time'] = [(self._starttime, self._endtime,
-                                      (self._endtime - self._starttime).total_seconds ())]
+            istats ['admin_time'] = [(starttime, endtime,
+                                      (endtime - starttime).total_seconds ())]
             istats ['admin_version'] = [('autobot', __version__, __revision__[1:-1], __date__ [1:-1])]
 
-            # now, create the admin tables and populate all data tables
-            self.create_admin_tables ()
+            # now, populate all admin tables
             for itable in self._dbspec.get_db ():
                 if itable.adminp():
-                    self.insert_data (dbname, itable, istats[itable.get_name ()])
-
-            # similarly to *enter*, in case a *windUp* action is given, execute
-            # it now before moving to the next solver
-            if windUp:
-                action = windUp (solver=isolver,
-                                 tstspec=self._tstspec,
-                                 dbspec=self._dbspec,
-                                 timeout=self._timeout,
-                                 memory=self._memory,
-                                 check=self._check,
-                                 basedir=self._directory,
-                                 resultsdir=resultsdir,
-                                 compress=self._compress,
-                                 namespace=BotParser._namespace,
-                                 data=BotParser._data,
-                                 user=BotParser._user,
-                                 regexp=BotParser._regexp,
-                                 stats=istats)
-                action (self._logger)
-
-        self._logger.debug (" Exiting from the automated execution ...")
-
+                    dbhandler.insert_data (itable, istats[itable.get_name ()])
+
+            # and leave the database ready to be queried
+            self._logger.debug (" Optimizing '%s'" % dbname)
+            dbhandler.optimize (vacuum='vacuum' in self._dboptimize,
+                                analyze='analyze' in self._dboptimize)
+
+        finally:
+            dbhandler.close ()
+
+        # similarly to *enter*, in case a *windUp* action is given, execute
+        # it now before finishing with this solver
+        if windUp:
+            action = windUp (solver=isolver,
+                             tstspec=self._tstspec,
+                             dbspec=self._dbspec,
+                             timeout=self._timeout,
+                             memory=self._memory,
+                             check=self._check,
+                             basedir=self._directory,
+                             resultsdir=resultsdir,
+                             compress=self._compress,
+                             namespace=run.namespace,
+                             data=run.data,
+                             user=run.user,
+                             regexp=run.regexp,
+                             stats=istats)
+            action (self._logger)
+
+
+        return isolver
 
 
 # Local Variables:
@@ -0,0 +1,311 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# cgrouptools.py
+# Description: accounting and enforcement of resources with cgroups v2
+# -----------------------------------------------------------------------------
+#
+# Started on  <Fri Oct 16 20:31:05 2026 Carlos Linares Lopez>
+# Last update <Fri Oct 16 20:31:05 2026 Carlos Linares Lopez (clinares)>
+# -----------------------------------------------------------------------------
+#
+# $Id::                                                                      $
+# $Date::                                                                    $
+# $Revision::                                                                $
+# -----------------------------------------------------------------------------
+#
+# Made by Carlos Linares Lopez
+# Login   <clinares@atlas>
+#
+
+# -----------------------------------------------------------------------------
+#     This file is part of testbot
+#
+#     testbot is free software: you can redistribute it and/or modify it under
+#     the terms of the GNU General Public License as published by the Free
+#     Software Foundation, either version 3 of the License, or (at your option)
+#     any later version.
+#
+#     testbot is distributed in the hope that it will be useful, but WITHOUT ANY
+#     WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+#     FOR A PARTICULAR PURPOSE.  See the GNU General Public License for more
+#     details.
+#
+#     You should have received a copy of the GNU General Public License along
+#     with testbot.  If not, see <http://www.gnu.org/licenses/>.
+#
+#     Copyright Carlos Linares Lopez, 2014
+# -----------------------------------------------------------------------------
+
+"""
+.. module:: cgrouptools
+   :platform: Linux
+   :synopsis: accounting and enforcement of resources with cgroups v2
+
+.. moduleauthor:: Carlos Linares Lopez <carlos.linares@uc3m.es>
+"""
+
+__version__  = '1.0'
+__revision__ = '$Revision$'
+
+# imports
+# -----------------------------------------------------------------------------
+import errno                    # error codes
+import os                       # process handling
+import signal                   # os signals
+import subprocess               # subprocess management
+import tempfile                 # unique directories
+import time                     # time management
+
+import systools                 # read_file
+
+
+# functions
+# -----------------------------------------------------------------------------
+def available (parent):
+    """
+    returns true if the given directory is a cgroup v2 where new cgroups can
+    be created by this process and processes can be moved into them. In this
+    case, the cpu and memory controllers are enabled (if possible) for all
+    cgroups created there
+    """
+
+    # cgroups v2 provide the list of available controllers and only those
+    # that can be written by this process are useful
+    if (not os.access (os.path.join (parent, "cgroup.controllers"), os.R_OK) or
+        not os.access (os.path.join (parent, "cgroup.procs"), os.W_OK) or
+        not os.access (parent, os.W_OK)):
+        return False
+
+    # enable all the controllers that can be used by its children. Failing to
+    # do so is not an error, but then the corresponding files will not exist
+    controllers = systools.read_file (os.path.join (parent, "cgroup.controllers")).split ()
+    enabled = systools.read_file (os.path.join (parent, "cgroup.subtree_control")).split ()
+    for icontroller in ["cpu", "memory"]:
+        if icontroller in controllers and icontroller not in enabled:
+            try:
+                write_file (os.path.join (parent, "cgroup.subtree_control"),
+                            "+" + icontroller)
+            except (IOError, OSError):
+                pass
+
+    # access rights are not enough, since moving processes into cgroups
+    # might be forbidden by other rules (e.g., delegation or the absence of
+    # processes in inner cgroups). Thus, move a child into a new cgroup once
+    try:
+        cgroup = CGroup (parent)
+    except (IOError, OSError):
+        return False
+
+    try:
+        subprocess.check_call (["true"], preexec_fn=cgroup.attach, close_fds=True)
+        return True
+    except (IOError, OSError, subprocess.CalledProcessError):
+        return False
+    finally:
+        cgroup.remove ()
+
+
+def write_file (filename, contents):
+    """
+    writes the given contents in the given file with a single system call as
+    required by the interface files of cgroups
+    """
+
+    fd = os.open (filename, os.O_WRONLY)
+    try:
+        os.write (fd, contents)
+    finally:
+        os.close (fd)
+
+
+# -----------------------------------------------------------------------------
+# CGroup
+#
+# Creates a new leaf cgroup (v2) where a process and all its descendants are
+# executed so that the resources consumed by all of them are accounted by the
+# kernel. It provides services to enforce a memory bound and to access the cpu
+# time and memory used by all processes in it
+# -----------------------------------------------------------------------------
+class CGroup(object):
+    """
+    Creates a new leaf cgroup (v2) where a process and all its descendants are
+    executed so that the resources consumed by all of them are accounted by the
+    kernel. It provides services to enforce a memory bound and to access the
+    cpu time and memory used by all processes in it
+    """
+
+    # how long to wait (in seconds) for all processes to leave this cgroup
+    # before removing it
+    # -----------------------------------------------------------------------------
+    remove_timeout = 5
+
+    def __init__(self, parent, prefix="testbot-"):
+        """
+        creates a new cgroup with a unique name starting with the given prefix
+        in the parent cgroup (which should be accessible as described in
+        available)
+
+        :param parent: directory of the parent cgroup
+        :type parent: str
+        :param prefix: prefix of the name of the new cgroup
+        :type prefix: str
+        """
+
+        self._path = tempfile.mkdtemp (prefix=prefix, dir=parent)
+
+        # the memory peak is computed manually in case the kernel does not
+        # provide it
+        self._peak = 0
+
+
+    def get_path (self):
+        """
+        returns the directory of this cgroup
+        """
+
+        return self._path
+
+
+    def attach (self):
+        """
+        moves the calling process into this cgroup. It is intended to be
+        invoked by a child process right before executing a new program so
+        that all its descendants belong to this cgroup as well
+        """
+
+        write_file (os.path.join (self._path, "cgroup.procs"), str (os.getpid ()))
+
+
+    def set_memory_max (self, nbytes):
+        """
+        sets the maximum number of bytes that can be used by all processes in
+        this cgroup. If they exceed it, the kernel kills them. Swap is disabled
+        (if possible) so that the memory is not exceeded silently. It returns
+        true if the memory bound could be set and false otherwise
+        """
+
+        try:
+            write_file (os.path.join (self._path, "memory.max"), str (nbytes))
+        except (IOError, OSError):
+            return False
+
+        try:
+            write_file (os.path.join (self._path, "memory.swap.max"), "0")
+        except (IOError, OSError):
+            pass
+
+        return True
+
+
+    def cpu_time (self):
+        """
+        cumulated CPU time (user and system) of all processes that were ever
+        in this cgroup, in seconds
+        """
+
+        stat = systools.read_file (os.path.join (self._path, "cpu.stat")).split ()
+        return int (stat [1 + stat.index ("usage_usec")]) / 1e6
+
+
+    def memory_current (self):
+        """
+        memory currently used by all processes in this cgroup, in bytes. If
+        the memory controller is not available, it returns None
+        """
+
+        try:
+            current = int (systools.read_file (os.path.join (self._path, "memory.current")))
+        except (IOError, OSError):
+            return None
+
+        self._peak = max (self._peak, current)
+        return current
+
+
+    def memory_peak (self):
+        """
+        maximum memory used by all processes in this cgroup, in bytes. If the
+        kernel does not record it, the maximum of all values returned by
+        memory_current is returned instead. If the memory controller is not
+        available, it returns None
+        """
+
+        try:
+            return int (systools.read_file (os.path.join (self._path, "memory.peak")))
+        except (IOError, OSError):
+            if self.memory_current () is None:
+                return None
+            return self._peak
+
+
+    def oom_kills (self):
+        """
+        returns the number of processes in this cgroup killed by the kernel
+        because the memory bound was exceeded. If the memory controller is not
+        available, it returns 0
+        """
+
+        try:
+            events = systools.read_file (os.path.join (self._path, "memory.events")).split ()
+        except (IOError, OSError):
+            return 0
+
+        if "oom_kill" not in events:
+            return 0
+        return int (events [1 + events.index ("oom_kill")])
+
+
+    def pids (self):
+        """
+        returns the process identifier of all processes in this cgroup
+        """
+
+        return [int (pid) for pid in
+                systools.read_file (os.path.join (self._path, "cgroup.procs")).split ()]
+
+
+    def kill (self):
+        """
+        kills all processes in this cgroup, even those that left the process
+        group of the process initially attached
+        """
+
+        # use cgroup.kill if available. Otherwise, kill all processes one by
+        # one
+        try:
+            write_file (os.path.join (self._path, "cgroup.kill"), "1")
+        except (IOError, OSError):
+            for pid in self.pids ():
+                try:
+                    os.kill (pid, signal.SIGKILL)
+                except OSError:
+                    pass
+
+
+    def remove (self):
+        """
+        kills all processes in this cgroup and removes it. Processes take some
+        time to leave the cgroup so that it waits for them for no more than
+        remove_timeout seconds. It returns true if the cgroup was removed and
+        false otherwise
+        """
+
+        self.kill ()
+
+        deadline = time.time () + CGroup.remove_timeout
+        while True:
+            try:
+                os.rmdir (self._path)
+                return True
+            except OSError as error:
+                if error.errno != errno.EBUSY or time.time () > deadline:
+                    return False
+            time.sleep (0.01)
+
+
+
+# Local Variables:
+# mode:python
+# fill-column:79
+# End:
@@ -33,10 +33,74 @@ __date__ = '$Date$'
 
 # imports
 # -----------------------------------------------------------------------------
-import re                               # regular expressions (finditer)
+import os                               # stat
 import string                           # split, find
+import threading                        # locks
 
 import dbparser                         # t_SLASH
+import streamtools                      # memory-mapped files
+
+# the code of snippets is compiled only once and it is cached here indexed by
+# the name of the file where it is defined along with its modification time and
+# size so that it is compiled again only if the file changes. The cache is
+# shared by all threads
+_codes = dict ()
+_codeslock = threading.Lock ()
+_codesstats = {'hits': 0, 'misses': 0}
+
+
+# functions
+# -----------------------------------------------------------------------------
+def compile_snippet (filename):
+    """
+    returns a tuple with the code object of the snippet defined in the given
+    file and whether it was found in the cache (true) or it had to be compiled
+    (false). Files are compiled again only if their modification time or size
+    change
+    """
+
+    status = os.stat (filename)
+    key = (status.st_mtime, status.st_size)
+
+    # if this file was already compiled and it has not changed, then return
+    # its code object
+    with _codeslock:
+        entry = _codes.get (filename)
+        if entry and entry [0] == key:
+            _codesstats ['hits'] += 1
+            return (entry [1], True)
+
+    # otherwise, compile it and cache the result
+    with open (filename) as stream:
+        code = compile (stream.read (), filename, 'exec')
+
+    with _codeslock:
+        _codes [filename] = (key, code)
+        _codesstats ['misses'] += 1
+
+    return (code, False)
+
+
+def get_snippet_stats ():
+    """
+    returns a tuple with the number of hits and misses of the cache of compiled
+    snippets
+    """
+
+    with _codeslock:
+        return (_codesstats ['hits'], _codesstats ['misses'])
+
+
+def log_snippet_stats (logger):
+    """
+    shows the hit rate of the cache of compiled snippets with the given logger,
+    unless no snippet was ever compiled
+    """
+
+    (hits, misses) = get_snippet_stats ()
+    if hits + misses:
+        logger.debug (" Snippets cache: %d hits, %d misses (hit rate: %.2f%%)"
+                      % (hits, misses, 100.0 * hits / (hits + misses)))
 
 
 # -----------------------------------------------------------------------------
@@ -132,7 +196,8 @@ class DBExpression:
             # close and exit
             stream.close
 
-    def eval_snippet(self, dbspec, sys, data, param, regexp, snippet, user):
+    def eval_snippet(self, dbspec, sys, data, param, regexp, snippet, user,
+                     matches=None):
         """evaluates the expression stored in this instance which is certainly known
         to be a snippet.
 
@@ -152,6 +217,9 @@ class DBExpression:
         This method prevents evaluating the snippet in case it has been already
         evaluated
 
+        If a dictionary is given in matches, it is used as a cache of the
+        matches of regexps (see DBSpec.findall)
+
         Thus, this method actually modifies the snippet namespace whereas it
         uses all the other namespaces for retrieving data
         """
@@ -197,7 +265,8 @@ class DBExpression:
                                                                       param,
                                                                       regexp,
                                                                       snippet,
-                                                                      user)
+                                                                      user,
+                                                                      matches)
 
             # cast this value to its corresponding type as specified by the
             # user. Two different cases are allowed: either the input variable
@@ -215,15 +284,17 @@ class DBExpression:
 
         # Step #2
         # ---------------------------------------------------------------------
-        # compile the python file and execute it
-        with open(isnippet.get_filecode()) as stream:
-
-            contents = stream.read()
-            fobject = compile(contents, isnippet.get_filecode(), 'exec')
-
-            # and now evaluate its contants using the dictionary of globals
-            # computed in the previous step
-            eval(fobject, dglobals)
+        # compile the python file (only if it was not compiled before) and
+        # execute it
+        (fobject, hit) = compile_snippet(isnippet.get_filecode())
+        if not hit:
+            (hits, misses) = get_snippet_stats()
+            self._logger.debug(" The snippet '%s' has been compiled (snippets cache: %d hits, %d misses)"
+                               % (isnippet.get_filecode(), hits, misses))
+
+        # and now evaluate its contants using the dictionary of globals
+        # computed in the previous step
+        eval(fobject, dglobals)
 
         # Step #3
         # ---------------------------------------------------------------------
@@ -247,7 +318,7 @@ class DBExpression:
                         key=dict(zip(keys, keys)),
                         value=[tuple(values)])
 
-    def eval (self, dbspec, sys, data, param, regexp, snippet, user):
+    def eval (self, dbspec, sys, data, param, regexp, snippet, user, matches=None):
         """
         eval returns the evaluation of the expression stored in this
         instance. The evaluation is resolved with information of the regular
@@ -284,58 +355,87 @@ class DBExpression:
 
         eval might raise warnings and errors. Therefore, it receives a logger to
         show messages
+
+        If a dictionary is given in matches, it is used as a cache of the
+        matches of regexps (see DBSpec.findall). To evaluate the same
+        expression many times, use compile instead
         """
 
-        def _get_namespace (atype = None):
-            """
-            return the namespace that should contain the values of a variable of
-            the type of this instance or the given type if any.
+        return self.compile (dbspec) (sys, data, param, regexp, snippet, user, matches)
+
+    def compile (self, dbspec):
+        """
+        returns a function that evaluates the expression stored in this
+        instance with the given database specification. It takes the
+        namespaces sys, data, param, regexp, snippet and user (in this order)
+        and, optionally, a cache of matches and returns the same value than
+        eval. All the decisions that do not
+        depend upon the contents of the namespaces (which namespace holds the
+        value, whether it is a regexp or a snippet, what contexts have to be
+        applied) are taken only once, here
+        """
 
-            This function actually implements the logic that associates
-            namespace types (nst in the jargon of the dbparser) to namespaces as
-            given above. In case no namespace is found for this particular type
-            it returns None
+        # position of the namespace that contains the values of every type of
+        # variable in the arguments of the function returned
+        positions = {dbparser.SYSNST    : 0, dbparser.MAINNST   : 0,
+                     dbparser.DATANST   : 1, dbparser.FILENST   : 1,
+                     dbparser.PARAMNST  : 2, dbparser.DIRNST    : 2,
+                     dbparser.REGEXPNST : 3, dbparser.SNIPPETNST: 4,
+                     dbparser.USERNST   : 5}
+
+        def _compile_retrieve (position, variable):
+            """
+            return a function that retrieves the value of the given variable
+            from the namespace in the given position. In case it does not
+            exist, an error is raised
             """
 
-            # if no type is given, use the default type of this
-            # instance. Otherwise, copy the specified one
-            if atype:
-                prefix = string.upper (atype)
-            else:
-                prefix = string.upper (self._type)
+            def _retrieve (*namespaces):
+
+                # check the given variable exists in the current namespace
+                nspace = namespaces [position]
+                if variable not in nspace:
+
+                    self._logger.critical (" Variable '%s' has not been found!" % variable)
+                    raise ValueError
+
+                # and return its value
+                return nspace [variable]
 
-            if prefix   == dbparser.SYSNST     or prefix == dbparser.MAINNST: return sys
-            elif prefix == dbparser.DATANST    or prefix == dbparser.FILENST: return data
-            elif prefix == dbparser.PARAMNST   or prefix == dbparser.DIRNST : return param
-            elif prefix == dbparser.REGEXPNST                               : return regexp
-            elif prefix == dbparser.SNIPPETNST                              : return snippet
-            elif prefix == dbparser.USERNST                                 : return user
-            else: return None
+            return _retrieve
 
 
-        def _retrieve (nspace, variable):
+        def _compile_projection (position, prefix, variable):
             """
-            return the value of the given variable which should be accessed in
-            the specified namespace. In case it does not exist, an error is
-            raised
+            return a function that projects the regexp/snippet in the given
+            position (either the regexp or snippet namespace) over the given
+            variable
             """
 
-            # check the given variable exists in the current namespace
-            if variable not in nspace:
+            def _project (*namespaces):
 
-                self._logger.critical (" Variable '%s' has not been found!" % variable)
-                raise ValueError
+                # the result of a projection is a list with a tuple that
+                # contains the keys used for the projection and then a list of
+                # tuples with the values (also projected). We get rid here of
+                # the tuple of keys and we convert the list of tuples into a
+                # list of values
+                values = [ivalue [0] for ivalue in
+                          namespaces [position].projection (prefix, variable) [1]]
 
-            # and return its value
-            return nspace [variable]
+                # also, in case this list consists of a single value we return
+                # it as a scalar
+                if len (values) == 1:
+                    return values [0]
+                return values
 
+            return _project
 
-        def _eval_without_context (expression):
+
+        def _compile_without_context (expression):
             """
-            returns the value of the given expression according to the
-            namespaces given to 'eval'. This applies just to expressions without
-            context or the first context of regular expressions with an
-            arbitrary number of them
+            returns a function that computes the value of the given expression.
+            This applies just to expressions without context or the first
+            context of regular expressions with an arbitrary number of them
             """
 
             # -----------------------------------------------------------------
@@ -356,68 +456,43 @@ class DBExpression:
 
                 # If this instance is a regexp, maybe this refers to the first
                 # context, which is not a regexp on its own. Thus, it is
-                # mandatory now to check the real type of this argument
-                nspace = _get_namespace (prefix)
-
-                # in case this is proven to be either a regular expression or a
-                # snippet---because its prefix refers to no known namespace,
-                # then project it over the specified variable
-                if not nspace:
-
-                    # dissambiguate between the regexp and the snippet
-                    # namespaces looking at the definitions of regexps and
-                    # snippets instead of using the type of this instance
-                    if dbspec.get_regexp (prefix):
-                        result = regexp.projection (prefix, variable)
-                    elif dbspec.get_snippet (prefix):
-                        result = snippet.projection (prefix, variable)
-                    else:
-                        self._logger.critical (" The expression '%s' is neither a 'REGEXP' nor a 'SNIPPET'" % expression)
-                        raise ValueError
-
-                    # the result of a projection is a list with a tuple that
-                    # contains the keys used for the projection and then a list
-                    # of tuples with the values (also projected). We get rid
-                    # here of the tuple of keys and we convert the list of
-                    # tuples into a list of values
-                    values = map (lambda x:x[0], result[1])
-
-                    # also, in case this list consists of a single value we
-                    # return it as a scalar
-                    if len (values) == 1:
-                        return values [0]
-                    return values
-
-                # otherwise, just retrieve the right value from the given
-                # namespace
-                else:
-                    return _retrieve (nspace, variable)
+                # mandatory now to check the real type of this argument. In
+                # case this is not a known namespace, then dissambiguate
+                # between the regexp and the snippet namespaces looking at the
+                # definitions of regexps and snippets instead of using the
+                # type of this instance
+                if string.upper (prefix) in positions:
+                    return _compile_retrieve (positions [string.upper (prefix)], variable)
+                elif dbspec.get_regexp (prefix):
+                    return _compile_projection (positions [dbparser.REGEXPNST], prefix, variable)
+                elif dbspec.get_snippet (prefix):
+                    return _compile_projection (positions [dbparser.SNIPPETNST], prefix, variable)
+
+                def _unknown (*namespaces):
+                    self._logger.critical (" The expression '%s' is neither a 'REGEXP' nor a 'SNIPPET'" % expression)
+                    raise ValueError
+
+                return _unknown
 
             # otherwise, get the namespace that should contain the value of this
             # expression and return the value of this variable as stored in that
             # namespace
-            else:
-
-                return _retrieve (_get_namespace (), expression)
+            return _compile_retrieve (positions.get (string.upper (self._type)), expression)
 
 
-        def _apply_regexp (s, regexp, groupname):
+        def _apply_regexp (s, regexp, groupname, matches):
             """
-            returns all matches in s of the given regexp and returns the values
-            of the specified group.
+            returns all matches in s of the regexp with the given name and
+            returns the values of the specified group. The matches are cached
+            in matches, if given (see DBSpec.findall)
 
             it returns either a single string or a list of strings in case there
             is an arbitrary number of matches strictly greater than 1
             """
 
-            # initialization
-            values = list ()
-
-            # for all matches of the given regexp in s
-            for imatch in re.finditer (regexp, s):
-
-                # add the value of the specified group to the list of values
-                values.append (imatch.group (groupname))
+            # for all matches of the given regexp in s get the value of the
+            # specified group
+            values = dbspec.findall (regexp, groupname, s, matches)
 
             # in case there is just a single match return just that string
             if len (values) == 1:
@@ -431,38 +506,57 @@ class DBExpression:
         # first case: the expression given has no context
         if not self._hascontext:
 
-            return _eval_without_context (self._expression)
-
-        # otherwise, in case it has a context
+            return _compile_without_context (self._expression)
+
+        # otherwise, in case it has a context, the first one is evaluated as
+        # any other expression and all the others shall be regular expressions
+        # which are applied one after another
+        head = _compile_without_context (self._contexts [0])
+        contexts = [tuple (string.split (icontext, '.'))
+                    for icontext in self._contexts[1:]]
+
+        # only the matches of the first regexp applied to a stream (either the
+        # standard output/error or the contents of a file) are cached, since
+        # streams live as long as the run. Other values (e.g., those returned
+        # by snippets or the results of previous contexts) are computed anew
+        # every time and caching them would only make the cache grow
+        (prefix, variable) = string.split (self._contexts [0], '.', 1)
+        if not ((string.upper (prefix) in [dbparser.SYSNST, dbparser.MAINNST] and
+                 variable in ['stdout', 'stderr']) or
+                string.upper (prefix) == dbparser.FILENST):
+            contexts = [(sregexp, group, False) for (sregexp, group) in contexts]
         else:
+            contexts = [(sregexp, group, index == 0)
+                        for (index, (sregexp, group)) in enumerate (contexts)]
+
+        def _eval_with_context (sys, data, param, regexp, snippet, user, matches=None):
 
             # first of all, evaluate the first context and store its value in
             # an ancilliary variable
-            currvalue = _eval_without_context (self._contexts [0])
+            currvalue = head (sys, data, param, regexp, snippet, user)
 
-            # process all contexts one after another but the first one ---these
-            # shall be all regular expressions!
-            for icontext in self._contexts[1:]:
-
-                # compute the prefix and variable of this expression
-                (regexp, group) = string.split (icontext, '.')
-                sregexp = dbspec.get_regexp (regexp).get_specification ()
+            # process all contexts one after another but the first one
+            for (sregexp, group, cached) in contexts:
 
                 # Check whether the current value consists of a scalar or a list
-                # of values
-                if isinstance (currvalue, (int, float, str)):
+                # of values. Streams used only to apply regexps to them might
+                # be given as memory-mapped files
+                if isinstance (currvalue, (int, float, str, streamtools.MappedFile)):
 
                     # there is no guarantee that this value is a string (maybe
                     # this is a value returned by a snippet). Enforce a
-                    # conversion if necessary
-                    if not isinstance (currvalue, str):
-                        currvalue = str (currvalue)
+                    # conversion if necessary. Matches are not cached in this
+                    # case, since the string is computed every time
+                    if not isinstance (currvalue, (str, streamtools.MappedFile)):
+                        currvalue = _apply_regexp (str (currvalue), sregexp, group, None)
 
                     # if it is a string just compute the value that results by
                     # applying the corresponding specification
-                    currvalue = _apply_regexp (currvalue,
-                                               sregexp,
-                                               group)
+                    else:
+                        currvalue = _apply_regexp (currvalue,
+                                                   sregexp,
+                                                   group,
+                                                   matches if cached else None)
 
                     # in case there was no match return None
                     if not currvalue:
@@ -479,8 +573,10 @@ class DBExpression:
                         # is not a string (e.g., it is returned by a snippet),
                         # in that case enforce the type conversion
                         if not isinstance (ivalue, str):
-                            ivalue = str (ivalue)
-                        result = _apply_regexp (ivalue, sregexp, group)
+                            result = _apply_regexp (str (ivalue), sregexp, group, None)
+                        else:
+                            result = _apply_regexp (ivalue, sregexp, group,
+                                                    matches if cached else None)
                         if result:
                             newvalue.append (result)
                     if not newvalue:
@@ -491,6 +587,7 @@ class DBExpression:
             # and return the final value of processing all contexts
             return currvalue
 
+        return _eval_with_context
 
 
 # Local Variables:
@@ -55,6 +55,7 @@ import ply.lex as lex
 import ply.yacc as yacc
 
 import dbexpression                     # evaluation of database expressions
+import stattools                        # aggregate functions
 
 
 # globals
@@ -95,10 +96,11 @@ class DBColumn:
     Definition of an individiual column of a table
     """
 
-    def __init__ (self, cidentifier, ctype, cvartype, cvariable, caction):
+    def __init__ (self, cidentifier, ctype, cvartype, cvariable, caction,
+                  caggregate=None):
         """
         creates a column identified by the identifier, type, variable type,
-        variable and action given in the arguments
+        variable, action and aggregate function given in the arguments
 
         * identifier: it is a valid identifier which is represented with a
                       string that starts with a letter and can contain an
@@ -174,18 +176,23 @@ class DBColumn:
                   If any other value is given, then it is used as a default
                   value in case the variable was not available, e.g.,
                   "<Unavailable>"
+
+        * aggregate: name of the aggregate function (see
+                     stattools.aggregates) applied to the values of this
+                     column in tables that aggregate their samples, e.g.,
+                     max. By default, None
         """
 
-        (self._identifier, self._type, self._vartype, self._variable , self._action) = \
-            (cidentifier, ctype, cvartype, cvariable, caction)
+        (self._identifier, self._type, self._vartype, self._variable , self._action, self._aggregate) = \
+            (cidentifier, ctype, cvartype, cvariable, caction, caggregate)
 
     def __str__ (self):
         """
         output formatting
         """
 
-        return "\t [identifier: %s] [type: %s] [vartype: %s] [variable: %s] [action: %s]" % \
-            (self._identifier, self._type, self._vartype, self._variable, self._action)
+        return "\t [identifier: %s] [type: %s] [vartype: %s] [variable: %s] [action: %s] [aggregate: %s]" % \
+            (self._identifier, self._type, self._vartype, self._variable, self._action, self._aggregate)
 
 
     def get_identifier (self):
@@ -228,6 +235,14 @@ class DBColumn:
         return self._action
 
 
+    def get_aggregate (self):
+        """
+        return the name of the aggregate function of this column or None
+        """
+
+        return self._aggregate
+
+
 # -----------------------------------------------------------------------------
 # DBTableIter
 #
@@ -294,12 +309,26 @@ class DBTable:
     populating it from data in various namespaces
     """
 
-    def __init__ (self, name, columns):
+    def __init__ (self, name, columns, window=None, onchange=False):
         """
-        creates a table with the given name and the specified columns
+        creates a table with the given name and the specified columns. If a
+        window (in seconds) is given, the samples of this table are aggregated
+        over consecutive windows of that length (see stattools.Window). If
+        onchange is true, samples are recorded only when they change (see
+        stattools.Change) and an additional column 'duration' is added
         """
 
-        (self._name, self._columns) = (name, columns)
+        (self._name, self._columns, self._window, self._onchange) = \
+            (name, columns, window, onchange)
+
+        # the plan used to poll this table is computed by compile, before it
+        # is polled
+        self._plan = None
+
+        # the duration of the samples recorded on change is not polled but
+        # computed by autobot
+        if onchange:
+            self._columns = columns + [DBColumn ('duration', 'real', None, None, 'None')]
 
 
     def __iter__ (self):
@@ -327,9 +356,17 @@ class DBTable:
         columns = reduce (lambda x,y:x+'\n'+y,
                           [DBColumn.__str__ (icolumn) for icolumn in self._columns])
 
-        return """ %s {
+        # and also the window, if any, or whether samples are recorded on
+        # change
+        window = ''
+        if self._window:
+            window = ' window %s' % self._window
+        elif self._onchange:
+            window = ' on change'
+
+        return """ %s%s {
 %s
- }""" % (self._name, columns)
+ }""" % (self._name, window, columns)
 
 
     def get_name (self):
@@ -348,6 +385,50 @@ class DBTable:
         return self._columns
 
 
+    def get_window (self):
+        """
+        return the length (in seconds) of the windows used to aggregate the
+        samples of this table or None if they are not aggregated
+        """
+
+        return self._window
+
+
+    def get_plan (self):
+        """
+        return the plan used to poll this table (see compile) or None if it
+        has not been compiled yet
+        """
+
+        return self._plan
+
+
+    def onchangep (self):
+        """
+        returns True if the samples of this table are recorded only when they
+        change
+        """
+
+        return self._onchange
+
+
+    def create_sampler (self):
+        """
+        returns a new instance of either stattools.Window or stattools.Change
+        that aggregates the samples of this table as specified in its columns,
+        or None if they are not aggregated
+        """
+
+        if self._window:
+            return stattools.Window (self._window,
+                                     [icolumn.get_aggregate () for icolumn in self._columns])
+        if self._onchange:
+            return stattools.Change ([icolumn.get_aggregate () for icolumn in self._columns
+                                      if icolumn.get_vartype ()])
+
+        return None
+
+
     def adminp (self):
         """
         returns True if this is an admin table, ie., those that contain admin
@@ -409,7 +490,82 @@ class DBTable:
         return None
 
 
-    def poll (self, dbspec, namespace, data, param, regexp, snippet, user, logger, logfilter):
+    def compile (self, dbspec, logger, logfilter):
+        """
+        compiles the definition of the columns of this table into a plan that
+        is used by poll to evaluate them with the given database specification
+        and logger. All the decisions that do not depend upon the contents of
+        the namespaces (the expression of every column, whether it requires
+        the evaluation of a volatile snippet, how to cast its values and what
+        to do if they are not found) are taken only once, here. The plan is
+        stored in this table and returned
+        """
+
+        # casting functions and neutral elements of all column types: text (''),
+        # integer (0) or real (0.0)
+        casts = {'text': str, 'integer': int, 'real': float}
+        neutrals = {'text': '', 'integer': 0, 'real': 0.0}
+
+        # update information about the logger ---the child and its filter. This
+        # is done only once since the same child is returned every time
+        plogger = logger.getChild ("DBTable.poll")
+        plogger.addFilter (logfilter)
+
+        plan = list ()
+        for icolumn in self:
+
+            # columns computed by autobot (such as the duration of samples
+            # recorded on change) are not polled
+            if not icolumn.get_vartype ():
+                continue
+
+            if icolumn.get_type () not in casts:
+                plogger.error (" Unknown type '%s'" % icolumn.get_type ())
+                raise TypeError
+
+            # create an expresssion that contains the specification of this
+            # column
+            expression = dbexpression.DBExpression (icolumn.get_vartype (),
+                                                    icolumn.get_variable (),
+                                                    plogger,
+                                                    logfilter)
+
+            # foremost, in case this is a volatile snippet, then its execution
+            # has to be requested every time this column is evaluated
+            volatile = None
+
+            # on one hand, because it is a snippet on its own
+            if expression.get_type () == SNIPPETNST:
+
+                snippetexp = dbspec.get_snippet (string.split (icolumn.get_variable (), '.') [0])
+                if snippetexp.get_keyword () == 'volatile':
+                    volatile = expression
+
+            # or because it is a regexp whose head is a snippet
+            elif expression.get_type () == REGEXPNST and expression.has_context ():
+
+                # all regexps belong to a context, so access the first one
+                # freely
+                (prefix, var) = string.split (expression.get_context () [0], '.')
+                snippetexp = dbspec.get_snippet (prefix)
+                if snippetexp and snippetexp.get_keyword () == 'volatile':
+
+                    # in this case, a specific expression has to be created to
+                    # represent the head of this regexp
+                    volatile = dbexpression.DBExpression (SNIPPETNST,
+                                                          expression.get_context () [0],
+                                                          plogger,
+                                                          logfilter)
+
+            plan.append ((icolumn, expression.compile (dbspec), volatile,
+                          casts [icolumn.get_type ()], neutrals [icolumn.get_type ()]))
+
+        self._plan = (dbspec, logger, plogger, plan)
+        return self._plan
+
+
+    def poll (self, dbspec, namespace, data, param, regexp, snippet, user, logger, logfilter,
+              matches=None):
         """
         returns a tuple of values according to the definition of columns of this
         table and the values specified in the given namespaces: namespace, data,
@@ -430,36 +586,17 @@ class DBTable:
         output variables is declared as volatile) then it requests the
         recomputation of the snippet
 
+        the columns are evaluated according to the plan computed by compile,
+        which has to be invoked before polling this table. Since tables are
+        shared by all jobs, they should be compiled before any job starts so
+        that the plan is never computed concurrently. If a dictionary is given in
+        matches, it is used as a cache of the matches of regexps (see
+        DBSpec.findall)
+
         this method is likely to raise warnings and errors (along with an
         exception). Therefore, it receives also a logger to show messages
         """
 
-        def _neutral (ctype):
-            """
-            returns the neutral element of the given column type:
-            text (''), integer (0) or real (0.0)
-            """
-
-            if ctype == 'text': return ''
-            elif ctype == 'integer': return 0
-            elif ctype == 'real': return 0.0
-            else:
-                logger.error (" Unknown type '%s'" % ctype)
-                raise TypeError
-
-
-        def _cast_value (ctype, cvalue):
-            """
-            converts the given value to the specified column type
-            """
-
-            if ctype == 'text': return str (cvalue)
-            elif ctype == 'integer': return int (cvalue)
-            elif ctype == 'real': return float (cvalue)
-            else:
-                logger.error (" Unknown type '%s'" % ctype)
-                raise TypeError
-
         def _replicate (t, cardinality):
             """
             it returns a list of tuples with length equal to cardinality such
@@ -473,106 +610,63 @@ class DBTable:
                     for i in range(cardinality)]
 
 
-        # update information about the logger ---the child and its filter
-        logger = logger.getChild ("DBTable.poll")
-        logger.addFilter (logfilter)
+        # the plan of this table should have been computed already
+        if not self._plan:
+            logger.error (" Error [%s]: The table has not been compiled!" % self._name)
+            raise ValueError
+        (logger, plan) = self._plan [2:]
 
         # initialization
-        t=()                    # raw description of the tuples to return
+        t=[]                    # raw description of the tuples to return
         cardinality = 1         # default cardinality of every column
+        replicate = False       # whether any column resolved to a list
 
         # for all columns in this table
-        for icolumn in self:
-
-            # create an expresssion that contains the specification of this
-            # column
-            expression = dbexpression.DBExpression (icolumn.get_vartype (),
-                                                    icolumn.get_variable (),
-                                                    logger,
-                                                    logfilter)
+        for (icolumn, evaluate, volatile, cast, neutral) in plan:
 
             # foremost, in case this is a volatile snippet, then request its
             # execution *now*
-
-            # on one hand, because it is a snippet on its own
-            if expression.get_type () == SNIPPETNST:
-
-                snippetexp = dbspec.get_snippet (string.split (icolumn.get_variable (), '.') [0])
-                if snippetexp.get_keyword () == 'volatile':
-                    expression.eval_snippet (dbspec  = dbspec,
-                                             sys     = namespace,
-                                             data    = data,
-                                             param   = param,
-                                             regexp  = regexp,
-                                             snippet = snippet,
-                                             user    = user)
-
-            # or because it is a regexp whose head is a snippet
-            elif expression.get_type () == REGEXPNST:
-
-                # all regexps belong to a context, so access the first one
-                # freely
-                (prefix, var) = string.split (expression.get_context () [0], '.')
-                snippetexp = dbspec.get_snippet (prefix)
-                if snippetexp and snippetexp.get_keyword () == 'volatile':
-
-                    # in this case, a specific expression has to be created to
-                    # represent the head of this regexp
-                    nestedexp = dbexpression.DBExpression (SNIPPETNST,
-                                                           expression.get_context () [0],
-                                                           logger,
-                                                           logfilter)
-
-                    # and evaluate it
-                    nestedexp.eval_snippet (dbspec  = dbspec,
-                                            sys     = namespace,
-                                            data    = data,
-                                            param   = param,
-                                            regexp  = regexp,
-                                            snippet = snippet,
-                                            user    = user)
+            if volatile:
+                volatile.eval_snippet (dbspec  = dbspec,
+                                       sys     = namespace,
+                                       data    = data,
+                                       param   = param,
+                                       regexp  = regexp,
+                                       snippet = snippet,
+                                       user    = user,
+                                       matches = matches)
 
             # at this point we are in good shape to ensure that all necessary
             # data to evaluate any expression is already present in the
             # corresponding namespaces, so that evaluate the expression of the
             # definition of this particular column
-            result = expression.eval (dbspec  = dbspec,
-                                      sys     = namespace,
-                                      data    = data,
-                                      param   = param,
-                                      regexp  = regexp,
-                                      snippet = snippet,
-                                      user    = user)
+            result = evaluate (namespace, data, param, regexp, snippet, user, matches)
 
             # in case that the evaluation of this column resolved to nothing
-            if result == None:
-
-                # then execute the specified action
-                value = self.execute_action (icolumn, logger)
-
-                # and include the pertinent value
-                if value: t += (value,)
-                else: t+=(_neutral (icolumn.get_type ()),)
-
-            # otherwise, add it after coercing the desired type
-            else:
-
-                # the result might be either a single scalar or a list
-                if isinstance (result, list):
-
-                    vals = [_cast_value (icolumn.get_type (), iresult) for iresult in result]
-                    t += (vals,)
-
-                    # and check the cardinality ---if no column has been found
-                    # with more than one item, then this one sets the maximum
-                    # cardinality found so far
-                    if cardinality == 1: cardinality = len (vals)
-
-                    # otherwise, if the cardinality of this one is greater than
-                    # one and it does not match the current max cardinality,
-                    # then an error has been found
-                    elif len (vals) > 1 and cardinality != len (vals):
-                        logger.error ("""
+            if result is None:
+
+                # then execute the specified action and include the pertinent
+                # value
+                t.append (self.execute_action (icolumn, logger) or neutral)
+
+            # otherwise, add it after coercing the desired type. The result
+            # might be either a single scalar or a list
+            elif isinstance (result, list):
+
+                vals = [cast (iresult) for iresult in result]
+                t.append (vals)
+                replicate = True
+
+                # and check the cardinality ---if no column has been found
+                # with more than one item, then this one sets the maximum
+                # cardinality found so far
+                if cardinality == 1: cardinality = len (vals)
+
+                # otherwise, if the cardinality of this one is greater than
+                # one and it does not match the current max cardinality, then
+                # an error has been found
+                elif len (vals) > 1 and cardinality != len (vals):
+                    logger.error ("""
      Error: while processing the table
 
     %s
@@ -583,14 +677,16 @@ class DBTable:
      vals        : %s
      len (vals)  : %i
      t           : %s
-    """ % (self, cardinality, vals, len (vals), t))
-                        raise ValueError
+    """ % (self, cardinality, vals, len (vals), tuple (t)))
+                    raise ValueError
 
-                # in case this is a scalar
-                else:
-                    t += (_cast_value (icolumn.get_type (), result),)
+            # in case this is a scalar
+            else:
+                t.append (cast (result))
 
-        # and finally replicate this tuple and return the result
+        # and finally replicate this tuple (if necessary) and return the result
+        if not replicate:
+            return [tuple (t)]
         return _replicate (t, cardinality)
 
 
@@ -951,6 +1047,8 @@ class DBParser :
         'STRING',
         'LCURBRACK',
         'RCURBRACK',
+        'LPAREN',
+        'RPAREN',
         'EQ',
         'SEMICOLON',
         'SLASH',
@@ -973,7 +1071,7 @@ class DBParser :
 
         # Build the lexer and parser
         self._lexer = lex.lex(module=self)
-        self._parser = yacc.yacc(module=self,write_tables=0)
+        self._parser = yacc.yacc(module=self,write_tables=0,debug=0)
 
         # and also declare a couple of symbol tables for storing the names of
         # regexps and snippets
@@ -986,22 +1084,25 @@ class DBParser :
     # Regular expression rules for simple tokens
     t_LCURBRACK  = r'\{'
     t_RCURBRACK  = r'\}'
+    t_LPAREN     = r'\('
+    t_RPAREN     = r'\)'
     t_EQ         = r'='
     t_SEMICOLON  = r';'
     t_SLASH      = r'/'
 
+    # Definition of real numbers. They are defined before integer numbers so
+    # that their integer part is not taken as an integer number
+    def t_FLOAT(self, t):
+        r'((\d*\.\d+)(E[\+-]?\d+)?|([1-9]\d*E[\+-]?\d+))'
+        t.value = float(t.value)
+        return t
+
     # Definition of integer numbers
     def t_NUMBER(self, t):
         r'\d+'
         t.value = int(t.value)
         return t
 
-    # Definition of real numbers
-    def t_FLOAT(self, t):
-        r'((\d*\.\d+)(E[\+-]?\d+)?|([1-9]\d*E[\+-]?\d+))'
-        t.value = float(t.value)
-        return t
-
     # A regular expression for recognizing both single and doubled quoted
     # strings in a single line
     def t_STRING (self, t):
@@ -1229,9 +1330,54 @@ class DBParser :
 
     # definition of data tables
     # -----------------------------------------------------------------------------
+    #
+    # the words 'window', 'on' and 'change' are not reserved so that they can
+    # still be used as the names of columns, regexps and snippets. Instead,
+    # they are lexed as identifiers and recognized here by their value
     def p_table (self, p):
-        '''table : TABLEID LCURBRACK columns RCURBRACK'''
-        p[0] = DBTable (p[1], p[3])
+        '''table : TABLEID LCURBRACK columns RCURBRACK
+                 | TABLEID ID number LCURBRACK columns RCURBRACK'''
+        if len (p) == 5:
+            p[0] = DBTable (p[1], p[3])
+
+            # aggregate functions can only be used in tables that aggregate
+            # their samples
+            for icolumn in p[3]:
+                if icolumn.get_aggregate ():
+                    print "Line %i: The column '%s' uses the aggregate function '%s' but the table '%s' does not aggregate its samples" % (p.lineno (1), icolumn.get_identifier (), icolumn.get_aggregate (), p[1])
+                    self.p_error (p)
+        else:
+
+            if p[2] != 'window':
+                print "Line %i: Unknown qualifier '%s' of table '%s'" % (p.lineno (1), p[2], p[1])
+                self.p_error (p)
+
+            # only samples of sys tables can be aggregated
+            if p[1][0:4] != 'sys_' or p[3] <= 0:
+                print "Line %i: Only sys tables can aggregate their samples over windows of positive length" % p.lineno (1)
+                self.p_error (p)
+            p[0] = DBTable (p[1], p[5], p[3])
+
+    def p_table_onchange (self, p):
+        '''table : TABLEID ID ID LCURBRACK columns RCURBRACK'''
+        if (p[2], p[3]) != ('on', 'change'):
+            print "Line %i: Unknown qualifier '%s %s' of table '%s'" % (p.lineno (1), p[2], p[3], p[1])
+            self.p_error (p)
+
+        # only samples of sys tables can be recorded on change and the column
+        # 'duration' is computed automatically
+        if p[1][0:4] != 'sys_':
+            print "Line %i: Only the samples of sys tables can be recorded on change" % p.lineno (1)
+            self.p_error (p)
+        if 'duration' in [icolumn.get_identifier () for icolumn in p[5]]:
+            print "Line %i: The column 'duration' is computed automatically in table '%s'" % (p.lineno (1), p[1])
+            self.p_error (p)
+        p[0] = DBTable (p[1], p[5], onchange=True)
+
+    def p_number (self, p):
+        '''number : NUMBER
+                  | FLOAT'''
+        p[0] = p[1]
 
     def p_columns (self, p):
         '''columns : column
@@ -1242,12 +1388,31 @@ class DBParser :
             p[0] = [p[1]] + p[2]
 
     def p_column (self, p):
-        '''column : ID type variable SEMICOLON
-                  | ID type variable action SEMICOLON'''
+        '''column : ID type colvalue SEMICOLON
+                  | ID type colvalue action SEMICOLON'''
         if len (p) == 5:
-            p[0] = DBColumn (p[1], p[2], p[3][0], p[3][1], 'None')
+            p[0] = DBColumn (p[1], p[2], p[3][0], p[3][1], 'None', p[3][2])
         elif len (p) == 6:
-            p[0] = DBColumn (p[1], p[2], p[3][0], p[3][1], p[4])
+            p[0] = DBColumn (p[1], p[2], p[3][0], p[3][1], p[4], p[3][2])
+
+        # verify that the aggregate function (if any) can be applied to the
+        # type of this column
+        if p[3][2] and p[2] not in stattools.aggregates [p[3][2]][1]:
+            print "Line %i: The aggregate function '%s' can not be applied to the column '%s' of type %s" % (p.lineno (1), p[3][2], p[1], p[2])
+            self.p_error (p)
+
+    # the value of a column is given by a variable which, in sys tables, might
+    # be aggregated with a function
+    def p_colvalue (self, p):
+        '''colvalue : variable
+                    | ID LPAREN variable RPAREN'''
+        if len (p) == 2:
+            p[0] = (p[1][0], p[1][1], None)
+        else:
+            if p[1] not in stattools.aggregates:
+                print "Line %i: Unknown aggregate function '%s'" % (p.lineno (1), p[1])
+                self.p_error (p)
+            p[0] = (p[3][0], p[3][1], p[1])
 
     def p_type (self, p):
         '''type : INTEGER
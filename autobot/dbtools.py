@@ -51,6 +51,7 @@ import re               # compile, groups
 import string           # split
 
 import dbparser         # testbot parser utilities (lex and yacc)
+import streamtools      # memory-mapped files
 
 
 # -----------------------------------------------------------------------------
@@ -133,9 +134,11 @@ class DBSpec(object):
         self._tables = p._tables
 
         # create different lists for storing regexps and database tables. They
-        # are also indexed in a dictionary by their name
+        # are also indexed in a dictionary by their name. Regexps are compiled
+        # only once, here
         self._regexp = []
         self._regexpdict = {}
+        self._patterns = {}
         self._db = []
         self._dbdict = {}
         self._snippet = []
@@ -144,6 +147,7 @@ class DBSpec(object):
             if isinstance (itable, dbparser.DBRegexp):
                 self._regexp.append (itable)
                 self._regexpdict [itable.get_name ()] = itable
+                self._patterns [itable.get_name ()] = re.compile (itable.get_specification ())
             elif isinstance (itable, dbparser.DBTable):
                 self._db.append (itable)
                 self._dbdict [itable.get_name ()] = itable
@@ -153,23 +157,33 @@ class DBSpec(object):
             else:
                 raise NotImplementedError ('Unknown table type')
 
+        # the variables used in this specification are computed only once,
+        # here, since they are looked up for every test case and file
+        self._update_dependencies ()
+
 
     def __iadd__ (self, itable):
         """
         adds a new table/regexp to this specification
         """
 
-        # first, add it to the right list of tables
+        # first, add it to the right list of tables and index it by its name
         if isinstance (itable, dbparser.DBRegexp):
             self._regexp.append (itable)
+            self._regexpdict [itable.get_name ()] = itable
+            self._patterns [itable.get_name ()] = re.compile (itable.get_specification ())
         elif isinstance (itable, dbparser.DBTable):
             self._db.append (itable)
+            self._dbdict [itable.get_name ()] = itable
         else:
             raise NotImplementedError ('Unknown table type')
 
         # second, add it also to the generic list of tables
         self._tables.append (itable)
 
+        # and update the variables used in this specification
+        self._update_dependencies ()
+
         return self
 
 
@@ -279,17 +293,203 @@ class DBSpec(object):
                 return self._snippetdict [name]
 
 
+    def get_pattern (self, name):
+        """
+        return the compiled regular expression of the regexp with the given
+        name or None if it does not exist
+        """
+
+        return self._patterns.get (name)
+
+
     def isregexp (self, name):
         """
         return true if and only if the given string is the name of a regexp and
         false otherwise
         """
 
-        for iregexp in self._regexp:
-            if iregexp.get_name () == name:
-                return True
+        return name in self._regexpdict
+
+
+    def get_heads (self):
+        """
+        return a dictionary that maps every variable used as the head of a
+        regexp with contexts (e.g., sys.stdout in sys.stdout/figures.country)
+        to the set of names of the regexps applied directly to it in any
+        column or input variable of a snippet. The regexps used without
+        context (which are applied to the current stream) are mapped to None
+        """
+
+        heads = dict ()
+        variables = [icolumn for itable in self._db for icolumn in itable]
+        variables += [ivariable for isnippet in self._snippet
+                      for ivariable in isnippet.get_inputvars ()]
+        for ivariable in variables:
+            if ivariable.get_vartype () == dbparser.REGEXPNST:
+                contexts = string.split (ivariable.get_variable (), dbparser.DBParser.t_SLASH)
+                if len (contexts) == 1:
+                    (head, name) = (None, contexts [0])
+                else:
+                    (head, name) = (contexts [0], contexts [1])
+                name = string.split (name, '.') [0]
+                if name in self._regexpdict:
+                    heads.setdefault (head, set ()).add (name)
+
+        return heads
+
+
+    def get_dependencies (self, contexts=True):
+        """
+        return a set with all the variables used in any column of any table or
+        in any input variable of any snippet. Every variable is given as a
+        tuple (nst, variable) with the type of the namespace that contains it
+        (main variables are given as sys variables), e.g., (dbparser.SYSNST,
+        'cputime'). Snippets are given as (dbparser.SNIPPETNST, name) and
+        regexps as the variable they are applied to. Regexps used without
+        context are applied to the current stream, sys.stdout. If contexts is
+        false, the variables regexps are applied to are not included
+        """
+
+        namespaces = [dbparser.SYSNST, dbparser.MAINNST, dbparser.DATANST,
+                      dbparser.DIRNST, dbparser.FILENST, dbparser.PARAMNST,
+                      dbparser.USERNST]
+
+        dependencies = set ()
+        variables = [icolumn for itable in self._db for icolumn in itable]
+        variables += [ivariable for isnippet in self._snippet
+                      for ivariable in isnippet.get_inputvars ()]
+        for ivariable in variables:
+
+            (nst, variable) = (ivariable.get_vartype (), ivariable.get_variable ())
+
+            # regexps depend upon the first context, which is either a
+            # variable, a snippet or another regexp applied to the current
+            # stream
+            if nst == dbparser.REGEXPNST:
+                heads = string.split (variable, dbparser.DBParser.t_SLASH)
+                (prefix, variable) = string.split (heads [0], '.')
+                if len (heads) > 1 and string.upper (prefix) in namespaces:
+                    nst = string.upper (prefix)
+                elif len (heads) > 1 and prefix in self._snippetdict:
+                    (nst, variable) = (dbparser.SNIPPETNST, prefix)
+                else:
+                    (nst, variable) = (dbparser.SYSNST, 'stdout')
 
-        return False
+                # snippets still have to be computed to apply regexps to them
+                if not contexts and nst != dbparser.SNIPPETNST:
+                    continue
+
+            # snippets are referred to by their name
+            elif nst == dbparser.SNIPPETNST:
+                variable = string.split (variable, '.') [0]
+
+            if nst == dbparser.MAINNST:
+                nst = dbparser.SYSNST
+            dependencies.add ((nst, variable))
+
+        return dependencies
+
+
+    def _update_dependencies (self):
+        """
+        computes the variables used in this specification, both considering
+        the variables regexps are applied to and not, along with the types of
+        namespaces they belong to (see get_dependencies)
+        """
+
+        self._dependencies = {}
+        for icontexts in [True, False]:
+            dependencies = self.get_dependencies (icontexts)
+            self._dependencies [icontexts] = (dependencies,
+                                              set (inst for (inst, ivariable) in dependencies))
+
+
+    def depends (self, nst, variable=None, contexts=True):
+        """
+        return true if the given variable of the given type of namespace (or
+        any variable of it if none is given) is used in any column of any
+        table or in any input variable of any snippet (see get_dependencies).
+        If contexts is false, variables used only to apply regexps to them are
+        not considered
+        """
+
+        if nst == dbparser.MAINNST:
+            nst = dbparser.SYSNST
+
+        (dependencies, namespaces) = self._dependencies [bool (contexts)]
+        if variable is None:
+            return nst in namespaces
+        return (nst, variable) in dependencies
+
+
+    def scan (self, text, names, matches=None, patterns=()):
+        """
+        scans text with all the regexps given by name and, additionally, with
+        all the compiled regular expressions given in patterns. It returns a
+        list with the matches of every regexp given by name followed by the
+        matches of every pattern.
+
+        If a dictionary is given in matches, the matches of the regexps given
+        by name are cached there (see findall) so that the text is never
+        scanned again with them. Text can be either a string or an instance of
+        streamtools.MappedFile. In the second case, the values of all groups
+        are cached instead so that the file can be closed afterwards
+        """
+
+        contents = streamtools.view (text)
+        result = [list (ipattern.finditer (contents)) for ipattern in
+                  [self._patterns [iname] for iname in names] + list (patterns)]
+
+        # the matches of memory-mapped files are not cached, since they refer
+        # to the memory map, which might be closed afterwards. Instead, the
+        # values of all their groups are computed right away
+        if matches is not None:
+            for (iname, imatches) in zip (names, result):
+                groups = dict ()
+                if isinstance (text, streamtools.MappedFile):
+                    groups = dict ((igroup, [imatch.group (igroup) for imatch in imatches])
+                                   for igroup in self._patterns [iname].groupindex)
+                    imatches = None
+                matches [(iname, id (text))] = (text, imatches, groups)
+
+        return result
+
+
+    def findall (self, name, group, text, matches=None):
+        """
+        return a list with the values of the given group in all matches of the
+        regexp with the given name in text.
+
+        If a dictionary is given in matches, it is used as a cache of the
+        matches found in every text by every regexp so that the same text is
+        scanned only once by the same regexp, even if different groups are
+        requested. Texts are identified by their identity and thus, the cache
+        also keeps a reference to them. It is intended to be used during a
+        single run (see botparser.BotRun) only with texts that live as long as
+        the run (such as the standard output or the contents of files), since
+        every other text would add a new entry. The values returned should not
+        be modified. Text can be either a string or an instance of
+        streamtools.MappedFile
+        """
+
+        # if no cache is given, just scan the text
+        if matches is None:
+            return [imatch.group (group) for imatch in
+                    self._patterns [name].finditer (streamtools.view (text))]
+
+        # otherwise, scan the text only if it was not scanned before
+        key = (name, id (text))
+        entry = matches.get (key)
+        if entry is None or entry [0] is not text:
+            entry = (text,
+                     list (self._patterns [name].finditer (streamtools.view (text))),
+                     dict ())
+            matches [key] = entry
+
+        # and compute the values of this group only once as well
+        if group not in entry [2]:
+            entry [2][group] = [imatch.group (group) for imatch in entry [1]]
+        return entry [2][group]
 
 
     def verify_regexps (self):
@@ -305,14 +505,7 @@ class DBSpec(object):
             name and None otherwise
             """
 
-            # in case the regexp is found within the current collection of
-            # regexps, return it
-            for iregexp in self._regexp:
-                if iregexp.get_name () == name:
-                    return iregexp
-
-            # otherwise, return None
-            return None
+            return self._regexpdict.get (name)
 
 
         def _seek_group (regexp, group):
@@ -321,9 +514,9 @@ class DBSpec(object):
             exists and -1 otherwise
             """
 
-            # compile this regular expression and go over all its groups. If the
+            # go over all the groups of this regular expression. If the
             # specified one exists, return its index
-            m = re.compile (regexp.get_specification ())
+            m = self._patterns [regexp.get_name ()]
             if group in m.groupindex:
                 return m.groupindex [group]
 
@@ -0,0 +1,172 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# jobtools.py
+# Description: concurrent execution of jobs
+# -----------------------------------------------------------------------------
+#
+# Started on  <Fri Oct 16 10:12:41 2026 Carlos Linares Lopez>
+# Last update <Fri Oct 16 10:12:41 2026 Carlos Linares Lopez (clinares)>
+# -----------------------------------------------------------------------------
+#
+# $Id::                                                                      $
+# $Date::                                                                    $
+# $Revision::                                                                $
+# -----------------------------------------------------------------------------
+#
+# Made by Carlos Linares Lopez
+# Login   <clinares@atlas>
+#
+
+# -----------------------------------------------------------------------------
+#     This file is part of testbot
+#
+#     testbot is free software: you can redistribute it and/or modify it under
+#     the terms of the GNU General Public License as published by the Free
+#     Software Foundation, either version 3 of the License, or (at your option)
+#     any later version.
+#
+#     testbot is distributed in the hope that it will be useful, but WITHOUT ANY
+#     WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+#     FOR A PARTICULAR PURPOSE.  See the GNU General Public License for more
+#     details.
+#
+#     You should have received a copy of the GNU General Public License along
+#     with testbot.  If not, see <http://www.gnu.org/licenses/>.
+#
+#     Copyright Carlos Linares Lopez, 2014
+# -----------------------------------------------------------------------------
+
+"""
+.. module:: jobtools
+   :platform: Linux
+   :synopsis: concurrent execution of jobs
+
+.. moduleauthor:: Carlos Linares Lopez <carlos.linares@uc3m.es>
+"""
+
+__version__  = '1.0'
+__revision__ = '$Revision$'
+
+# imports
+# -----------------------------------------------------------------------------
+import collections             # deque
+import multiprocessing          # TimeoutError
+import threading                # locks
+
+from multiprocessing.pool import ThreadPool
+
+
+# -----------------------------------------------------------------------------
+# JobPool
+#
+# Runs an arbitrary number of jobs using no more than a given number of them
+# simultaneously. Jobs are executed in threads of this process since most of
+# the time they just wait for the termination of a child process. If only one
+# job is allowed, they are executed in the calling thread, one after another.
+#
+# The same pool can be shared among different threads which then compete for
+# the same number of jobs
+# -----------------------------------------------------------------------------
+class JobPool (object):
+    """
+    Runs an arbitrary number of jobs using no more than a given number of them
+    simultaneously. Jobs are executed in threads of this process since most of
+    the time they just wait for the termination of a child process. If only one
+    job is allowed, they are executed in the calling thread, one after another.
+
+    The same pool can be shared among different threads which then compete for
+    the same number of jobs
+    """
+
+    # results are retrieved with a timeout so that the calling thread still
+    # attends signals (e.g., SIGINT) while waiting for them
+    # -----------------------------------------------------------------------------
+    poll_delay = 1
+
+    def __init__ (self, jobs):
+        """
+        creates a pool that runs up to the given number of jobs simultaneously
+        """
+
+        # jobs should be strictly positive
+        if jobs < 1:
+            raise ValueError (" The number of jobs should be strictly positive")
+
+        self._jobs = jobs
+
+        # create the pool of threads only if jobs can be run concurrently.
+        # Otherwise, jobs are serialized with a lock in case this pool is
+        # shared among different threads
+        self._lock = threading.Lock ()
+        self._pool = None
+        if jobs > 1:
+            self._pool = ThreadPool (jobs)
+
+
+    def get_jobs (self):
+        """
+        return the maximum number of jobs run simultaneously
+        """
+
+        return self._jobs
+
+
+    def imap (self, func, iterable):
+        """
+        returns an iterator over the results of applying func to every item in
+        iterable. Results are returned in the same order than the items in
+        iterable, no matter the order they are computed. If any application of
+        func raises an exception, it is raised again when its result is
+        retrieved
+        """
+
+        # in case jobs are not run concurrently, just apply func to every item
+        # (lazily) in the calling thread
+        if not self._pool:
+            for item in iterable:
+                with self._lock:
+                    result = func (item)
+                yield result
+            return
+
+        # otherwise, submit jobs to the pool and retrieve their results in
+        # order. No more jobs than the size of the pool are submitted ahead of
+        # the result being retrieved so that neither items nor results are
+        # buffered
+        pending = collections.deque ()
+        items = iter (iterable)
+        while True:
+            for item in items:
+                pending.append (self._pool.apply_async (func, (item,)))
+                if len (pending) >= self._jobs:
+                    break
+            if not pending:
+                return
+            while True:
+                try:
+                    result = pending [0].get (timeout=JobPool.poll_delay)
+                    break
+                except multiprocessing.TimeoutError:
+                    continue
+            pending.popleft ()
+            yield result
+
+
+    def close (self):
+        """
+        waits for the termination of all jobs currently running and releases
+        all resources. Jobs not started yet are discarded
+        """
+
+        if self._pool:
+            self._pool.terminate ()
+            self._pool.join ()
+            self._pool = None
+
+
+
+# Local Variables:
+# mode:python
+# fill-column:79
+# End:
@@ -100,14 +100,24 @@ class ContextFilter(logging.Filter):
     defines contextual information to be passed to other modules
     """
 
+    def __init__(self, name=''):
+        """
+        the node and user do not change while running, so they are computed
+        only once
+        """
+
+        logging.Filter.__init__ (self, name)
+
+        (self._node, self._user) = (socket.gethostname (), getpass.getuser ())
+
     def filter(self, record):
         """
         Defines the additional information (color, node and user) that is set up
         in the logger configuration
         """
 
-        record.node = socket.gethostname ()
-        record.user = getpass.getuser ()
+        record.node = self._node
+        record.user = self._user
 
         if record.levelname == 'DEBUG':
             record.color = colors.darkwhite
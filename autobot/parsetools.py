@@ -88,7 +88,8 @@ class ShowPlaceHoldersTests (argparse.Action):
  $level      | level information
  $timeout    | maximum time allotted to every execution
  $memory     | maximum memory allotted to every execution
- $check      | delay between successive pings to the executable"""
+ $check      | delay between successive pings to the executable
+ $jobs       | maximum number of test cases run simultaneously"""
 
         print """ %s+%s
 
@@ -213,12 +214,42 @@ class BotTestArgParser (object):
                                      default=5,
                                      type=float,
                                      help='delay in seconds (which can be given as a floating-point number) between successive pings to the solver. By default, 5 seconds')
+        self._optional.add_argument ('-a', '--adaptive',
+                                     type=float,
+                                     help='if given, the delay between successive pings starts at this value (in seconds) and it doubles after every ping up to the value given in --check. It is shortened if the memory in use approaches its bound. By default, the delay is fixed')
         self._optional.add_argument ('-d', '--directory',
                                      default=os.getcwd (),
                                      help="directory where the results of the tests are stored. Relative directories are rooted in the current working directory. By default, the current working directory.")
         self._optional.add_argument ('-B','--bz2',
                                      action='store_true',
                                      help="if enabled, the (standard and error) output are compressed using bz2. By default, disabled")
+        self._optional.add_argument ('-j', '--jobs',
+                                     default=1,
+                                     type=int,
+                                     help="maximum number of test cases run simultaneously. By default, 1")
+        self._optional.add_argument ('-M', '--concurrent',
+                                     action='store_true',
+                                     help="if enabled, the experiments with all solvers are run concurrently, sharing the maximum number of test cases given in --jobs. By default, disabled")
+        self._optional.add_argument ('-g', '--cgroup',
+                                     help="directory of a cgroup (v2) where this process can create new cgroups. If given, every test case is run in its own cgroup which accounts the cpu time and memory and enforces the memory bound. If it can not be used, resources are accounted with /proc only. By default, disabled")
+        self._optional.add_argument ('-r', '--rlimits',
+                                     action='store_true',
+                                     help="if enabled, the time and memory bounds are also enforced by the kernel on every process of the solver with setrlimit (RLIMIT_CPU and RLIMIT_AS). Note that processes exceeding RLIMIT_AS are not killed: their allocations fail instead and, if they terminate because of that, their exit cause is recorded as 'exit' with the exit status they chose. By default, disabled")
+        self._optional.add_argument ('-F', '--file-size',
+                                     type=int,
+                                     help="maximum size in MB of every file written by the solver, enforced by the kernel with setrlimit (RLIMIT_FSIZE). By default, unlimited")
+        self._optional.add_argument ('-P', '--db-profile',
+                                     choices=['default', 'fast'],
+                                     default='default',
+                                     help="storage profile of the databases. 'fast' uses a write-ahead log, synchronizes the database less often and keeps temporary data in memory, so that data is written much faster but the last transactions might be lost in case of a power failure. By default, 'default', i.e., the settings of sqlite3")
+        self._optional.add_argument ('-Z', '--db-optimize',
+                                     nargs='+',
+                                     choices=['analyze', 'vacuum'],
+                                     default=[],
+                                     help="optimizations applied to every database once all test cases have been run: 'analyze' gathers statistics for speeding up queries and 'vacuum' rebuilds the database to reclaim unused space. By default, none")
+        self._optional.add_argument ('-k', '--pack',
+                                     choices=['raw', 'zlib'],
+                                     help="if given, the samples of every sys table are stored in packed tables with one row per test case (or every 1000 samples) where every column contains all its values (along with their timestamps) in a single blob, either raw or compressed with zlib. Use unpackbot.py to expand them. By default, disabled")
 
         # Group of logging services
         self._logging = self._parser.add_argument_group ('Logging', 'The following arguments specify various logging settings')
@@ -404,6 +435,10 @@ class BotParseArgParser ():
         self._optional.add_argument ('-B','--bz2',
                                      action='store_true',
                                      help="if enabled, the parsed files are compressed using bz2. By default, disabled")
+        self._optional.add_argument ('-P', '--db-profile',
+                                     choices=['default', 'fast'],
+                                     default='default',
+                                     help="storage profile of the databases. 'fast' uses a write-ahead log, synchronizes the database less often and keeps temporary data in memory, so that data is written much faster but the last transactions might be lost in case of a power failure. By default, 'default', i.e., the settings of sqlite3")
 
         # Group of logging services
         self._logging = self._parser.add_argument_group ('Logging', 'The following arguments specify various logging settings')
@@ -445,6 +480,118 @@ class BotParseArgParser ():
         return self._parser.parse_args ()
 
 
+# -----------------------------------------------------------------------------
+# UnpackArgParser
+#
+# Provides an argument parser that can be reused/extended for expanding packed
+# tables
+# -----------------------------------------------------------------------------
+class UnpackArgParser (object):
+    """
+    Provides an argument parser that can be reused/extended for expanding
+    packed tables
+    """
+
+    def __init__ (self):
+        """
+        create a parser and store its contents in this instance
+        """
+
+        self._parser = argparse.ArgumentParser (description="Expands the packed tables of a database generated by testbot into regular rows")
+
+        # now, add the arguments
+
+        # Group of mandatory arguments
+        self._mandatory = self._parser.add_argument_group ("Mandatory arguments", "The following arguments are required")
+        self._mandatory.add_argument ('-D', '--db',
+                                      required=True,
+                                      help="database with packed tables")
+
+        # Group of optional arguments
+        self._optional = self._parser.add_argument_group ('Optional', 'The following arguments are optional')
+        self._optional.add_argument ('-t', '--table',
+                                     nargs='+',
+                                     help="packed tables to expand. By default, all")
+        self._optional.add_argument ('-o', '--output',
+                                     help="database where the expanded tables are written with the same name and an additional column 'timestamp'. It should not contain tables with the same names. By default, rows are shown on the standard output")
+
+        # Group of miscellaneous arguments
+        self._misc = self._parser.add_argument_group ('Miscellaneous')
+        self._misc.add_argument ('-V', '--version',
+                                 action='version',
+                                 version=" %s %s %s %s" % (sys.argv [0], __version__, __revision__[1:-1], __date__[1:-1]),
+                                 help="output version information and exit")
+
+    # -----------------------------------------------------------------------------
+    # parse_args
+    #
+    # just parse the arguments with this argument parser
+    # -----------------------------------------------------------------------------
+    def parse_args (self):
+        """
+        just parse the arguments with this argument parser
+        """
+
+        return self._parser.parse_args ()
+
+
+# -----------------------------------------------------------------------------
+# BenchArgParser
+#
+# Provides an argument parser that can be reused/extended for benchmarking the
+# storage of the databases
+# -----------------------------------------------------------------------------
+class BenchArgParser (object):
+    """
+    Provides an argument parser that can be reused/extended for benchmarking
+    the storage of the databases
+    """
+
+    def __init__ (self):
+        """
+        create a parser and store its contents in this instance
+        """
+
+        self._parser = argparse.ArgumentParser (description="Measures the performance of the different ways in which testbot stores data in the databases")
+
+        # now, add the arguments
+
+        # Group of optional arguments
+        self._optional = self._parser.add_argument_group ('Optional', 'The following arguments are optional')
+        self._optional.add_argument ('-b', '--benchmark',
+                                     nargs='+',
+                                     choices=['profiles', 'memory', 'packed'],
+                                     default=['profiles', 'memory', 'packed'],
+                                     help="benchmarks to run. 'profiles' measures the rows written per second with every storage profile, 'memory' measures the memory taken by every sample in lists of tuples and in buffers and 'packed' measures the size of the databases with regular and packed tables. By default, all")
+        self._optional.add_argument ('-r', '--runs',
+                                     type=int,
+                                     default=200,
+                                     help="number of test cases written to every database. By default, 200")
+        self._optional.add_argument ('-n', '--rows',
+                                     type=int,
+                                     default=50,
+                                     help="number of rows written for every test case. By default, 50")
+
+        # Group of miscellaneous arguments
+        self._misc = self._parser.add_argument_group ('Miscellaneous')
+        self._misc.add_argument ('-V', '--version',
+                                 action='version',
+                                 version=" %s %s %s %s" % (sys.argv [0], __version__, __revision__[1:-1], __date__[1:-1]),
+                                 help="output version information and exit")
+
+    # -----------------------------------------------------------------------------
+    # parse_args
+    #
+    # just parse the arguments with this argument parser
+    # -----------------------------------------------------------------------------
+    def parse_args (self):
+        """
+        just parse the arguments with this argument parser
+        """
+
+        return self._parser.parse_args ()
+
+
 
 # Local Variables:
 # mode:python
@@ -46,9 +46,97 @@ __revision__ = "$Revision$"
 
 # imports
 # -----------------------------------------------------------------------------
+import array            # efficient arrays of numeric values
 import datetime         # date/time management
+import os               # removing files
+import marshal          # serialization of python values
+import Queue            # synchronized queues
 import re               # regexp
 import sqlite3          # sql lite dbs
+import sys              # byte order
+import threading        # writer threads
+import zlib             # compression
+
+
+# globals
+# -----------------------------------------------------------------------------
+
+# storage profiles - every profile consists of a list of pragmas (name, value)
+# which are applied in the given order right after connecting to a
+# database. 'default' preserves the settings of sqlite3, whereas 'fast' trades
+# durability of the last transactions in case of a power failure (but not in
+# case of a crash of this process) for a much higher throughput
+profiles = {'default': [],
+            'fast': [('page_size', 8192),       # only before creating tables
+                     ('journal_mode', 'WAL'),
+                     ('synchronous', 'NORMAL'),
+                     ('cache_size', -65536),    # in KiB, ie., 64 MB
+                     ('temp_store', 'MEMORY')]}
+
+# packed tables - tables can be packed so that every row contains a whole
+# series of samples: every column stores all its values in a single blob (see
+# pack) along with the number of samples and their timestamps. The name of all
+# packed tables in a database (along with the compression used) is stored in
+# the following table
+packed_tables = 'packed_tables'
+
+# compression methods available for packed tables
+compressions = ['raw', 'zlib']
+
+
+# functions
+# -----------------------------------------------------------------------------
+def pack (values, compression='raw'):
+    """
+    returns a blob with all the given values. Arrays are stored as a sequence of
+    machine values (in little endian) whereas any other sequence is serialized
+    with marshal. If compression is 'zlib', the result is compressed. In the
+    case of arrays, the i-th bytes of all values are grouped together before,
+    since consecutive samples usually differ only in their lowest bytes. The
+    blob is prefixed with a tag that describes its contents (see unpack)
+    """
+
+    if isinstance (values, array.array):
+        if sys.byteorder == 'big':
+            values = array.array (values.typecode, values)
+            values.byteswap ()
+        (tag, contents) = (values.typecode, values.tostring ())
+    else:
+        (tag, contents) = ('m', marshal.dumps (list (values)))
+
+    if compression == 'zlib':
+        if tag != 'm':
+            contents = ''.join ([contents [ibyte::values.itemsize]
+                                 for ibyte in xrange (values.itemsize)])
+        return sqlite3.Binary (tag + 'z' + zlib.compress (contents))
+    return sqlite3.Binary (tag + '-' + contents)
+
+
+def unpack (blob):
+    """
+    returns the values stored in a blob created with pack, either as an array
+    or as a list
+    """
+
+    blob = str (blob)
+    (tag, compressed, contents) = (blob [0], blob [1], blob [2:])
+    if compressed == 'z':
+        contents = zlib.decompress (contents)
+
+    if tag == 'm':
+        return marshal.loads (contents)
+
+    values = array.array (tag)
+    if compressed == 'z':
+        (shuffled, contents) = (contents, bytearray (len (contents)))
+        length = len (contents) // values.itemsize
+        for ibyte in xrange (values.itemsize):
+            contents [ibyte::values.itemsize] = shuffled [ibyte * length:(ibyte + 1) * length]
+        contents = str (contents)
+    values.fromstring (contents)
+    if sys.byteorder == 'big':
+        values.byteswap ()
+    return values
 
 
 # -----------------------------------------------------------------------------
@@ -62,13 +150,18 @@ class sqldb(object):
     this class wraps read/write access to sqlite3 databases
     """
 
-    def __init__ (self, dbname):
+    def __init__ (self, dbname, profile='default'):
         """
-        connects to a sqlite3 database
+        connects to a sqlite3 database and applies all the pragmas of the
+        given storage profile
         """
 
-        # store the name of the database
-        self._dbname = dbname
+        # verify the storage profile
+        if profile not in profiles:
+            raise ValueError (" Unknown storage profile '%s'" % profile)
+
+        # store the name of the database and its profile
+        (self._dbname, self._profile) = (dbname, profile)
 
         # connect to this database
         self._conn = sqlite3.connect (dbname)
@@ -76,6 +169,26 @@ class sqldb(object):
         # and get a cursor
         self._cursor = self._conn.cursor ()
 
+        # and apply the storage profile
+        for (pragma, value) in profiles [profile]:
+            self._cursor.execute ("PRAGMA %s=%s;" % (pragma, value))
+
+
+    def get_name (self):
+        """
+        returns the name of this database
+        """
+
+        return self._dbname
+
+
+    def get_profile (self):
+        """
+        returns the name of the storage profile of this database
+        """
+
+        return self._profile
+
 
     def execute (self, command):
         """
@@ -85,6 +198,14 @@ class sqldb(object):
         self._cursor.execute (command)
 
 
+    def executemany (self, command, rows):
+        """
+        executes the given command in the current cursor once for every row
+        """
+
+        self._cursor.executemany (command, rows)
+
+
     def fetchone (self):
         """
         fetches the next row from the current cursor
@@ -113,6 +234,36 @@ class sqldb(object):
         return (table,) in self._cursor.fetchall()
 
 
+    def commit (self):
+        """
+        commits all changes made since the last commit so that they are
+        written to disk
+        """
+
+        self._conn.commit ()
+
+
+    def optimize (self, vacuum=False, analyze=False):
+        """
+        commits all changes and, if the database is in WAL mode, copies all
+        pages in the write-ahead log back into the database file and truncates
+        the log. If requested, the database is also rebuilt (vacuum) to reclaim
+        unused space and statistics for the query planner are gathered
+        (analyze)
+        """
+
+        self._conn.commit ()
+
+        if analyze:
+            self._cursor.execute ("ANALYZE;")
+        if vacuum:
+            self._cursor.execute ("VACUUM;")
+
+        self._cursor.execute ("PRAGMA journal_mode;")
+        if self._cursor.fetchone () [0] == 'wal':
+            self._cursor.execute ("PRAGMA wal_checkpoint(TRUNCATE);")
+
+
     def close (self):
         """
         commits changes and closes the connection
@@ -135,13 +286,16 @@ class dbaccess(sqldb):
     retrieving information of various automated tests
     """
 
-    def __init__ (self, dbname):
+    def __init__ (self, dbname, profile='default'):
         """
-        create/connect a test db
+        create/connect a test db with the given storage profile
         """
 
         # invoke the parent's constructor
-        sqldb.__init__ (self, dbname)
+        sqldb.__init__ (self, dbname, profile)
+
+        # tables packed by this connection, along with their compression
+        self._packed = dict ()
 
 
     def create_table (self, dbtable):
@@ -162,19 +316,469 @@ class dbaccess(sqldb):
         self._cursor.execute (cmdline)
 
 
+    def create_packed_table (self, dbtable, compression='raw'):
+        """
+        creates a packed table with the name and columns specified in dbtable
+        (DBTable) whose blobs are compressed as specified (either 'raw' or
+        'zlib'). Every row of a packed table stores a whole series of samples
+        in three columns (samples, timestamps) plus one blob per column of
+        dbtable
+        """
+
+        if compression not in compressions:
+            raise ValueError (" Unknown compression '%s'" % compression)
+
+        # create the table
+        self._cursor.execute ('CREATE TABLE %s (samples integer, timestamps blob, %s)' %
+                              (dbtable.get_name (),
+                               ', '.join ([icolumn.get_identifier () + ' blob'
+                                           for icolumn in dbtable.get_columns ()])))
+
+        # and register it
+        self._cursor.execute ('CREATE TABLE IF NOT EXISTS %s (name text, compression text)' %
+                              packed_tables)
+        self._cursor.execute ('INSERT INTO %s VALUES (?, ?)' % packed_tables,
+                              (dbtable.get_name (), compression))
+        self._packed [dbtable.get_name ()] = compression
+
+
     def insert_data (self, dbtable, data):
         """
-        it stores data in the table qualified by dbtable (DBTable)
+        it stores data in the table qualified by dbtable (DBTable). data is
+        either a list of tuples or an instance of dbbuffer. If the table was
+        created as a packed table with this connection, all data is stored in
+        a single row
         """
 
-        if (len (data) > 0):
+        if (len (data) > 0) and dbtable.get_name () in self._packed:
+
+            # pack all columns, each one in a single blob
+            if not isinstance (data, dbbuffer):
+                data = dbbuffer (dbtable).extend (data)
+            compression = self._packed [dbtable.get_name ()]
 
-            # populate the table with the given data
-            specline = "?, " * (len (data[0]) - 1)
+            specline = "?, " * (1 + len (dbtable))
             cmdline = "INSERT INTO %s VALUES (%s)" % (dbtable.get_name (), specline + '?')
 
+            self._cursor.execute (cmdline,
+                                  [len (data), pack (data.get_timestamps (), compression)] +
+                                  [pack (icolumn, compression) for icolumn in data.get_columns ()])
+
+        elif (len (data) > 0):
+
+            # populate the table with the given data. Buffers are consumed
+            # directly without creating tuples
+            specline = "?, " * (len (dbtable) - 1)
+            cmdline = "INSERT INTO %s VALUES (%s)" % (dbtable.get_name (), specline + '?')
+
+            if isinstance (data, dbbuffer):
+                data = data.rows ()
             self._cursor.executemany (cmdline, data)
 
+    def merge (self, dbname, dbtables, remove=False):
+        """
+        appends all rows of the tables qualified by dbtables (a list of
+        DBTable) in the database dbname to the same tables of this database,
+        in the same order they were inserted there. Both tables should be
+        either regular or packed with the same compression. Rows are copied
+        by sqlite3 without loading them in memory. If remove is given, the
+        database dbname is removed afterwards
+        """
+
+        self._cursor.execute ("ATTACH DATABASE ? AS merged;", (dbname,))
+        for itable in dbtables:
+            self._cursor.execute ("INSERT INTO %s SELECT * FROM merged.%s ORDER BY rowid;" %
+                                  (itable.get_name (), itable.get_name ()))
+        self._conn.commit ()
+        self._cursor.execute ("DETACH DATABASE merged;")
+
+        if remove:
+            os.remove (dbname)
+
+
+    def get_packed (self):
+        """
+        returns the names of all packed tables in this database
+        """
+
+        if not self.find (packed_tables):
+            return []
+
+        self._cursor.execute ("SELECT name FROM %s;" % packed_tables)
+        return [name for (name,) in self._cursor.fetchall ()]
+
+
+    def unpack_table (self, name):
+        """
+        returns all rows of the given packed table as tuples with the values of
+        all its columns followed by the timestamp of the sample (or None if it
+        is unknown)
+        """
+
+        cursor = self._conn.cursor ()
+        cursor.execute ("SELECT * FROM %s;" % name)
+        for irow in cursor:
+            timestamps = [None if itimestamp != itimestamp else itimestamp
+                          for itimestamp in unpack (irow [1])]
+            for isample in zip (*([unpack (icolumn) for icolumn in irow [2:]] + [timestamps])):
+                yield isample
+
+
+# -----------------------------------------------------------------------------
+# dbbuffer
+#
+# this class stores rows of a table in memory column by column. Columns of
+# type integer and real are stored in arrays of machine values whereas the
+# rest are stored in lists of python objects
+# -----------------------------------------------------------------------------
+class dbbuffer(object):
+
+    """
+    this class stores rows of a table in memory column by column. Columns of
+    type integer and real are stored in arrays of machine values whereas the
+    rest are stored in lists of python objects.
+
+    If a value can not be stored in an array (e.g., None or an integer that
+    overflows), the whole column is converted into a list
+    """
+
+    # typecodes of the arrays used for every column type
+    # -----------------------------------------------------------------------------
+    typecodes = {'integer': 'l', 'real': 'd'}
+
+    def __init__ (self, dbtable):
+        """
+        creates an empty buffer for the rows of the given table (DBTable)
+        """
+
+        self._columns = [array.array (dbbuffer.typecodes [icolumn.get_type ()])
+                         if icolumn.get_type () in dbbuffer.typecodes else list ()
+                         for icolumn in dbtable.get_columns ()]
+
+        # the time when every row was sampled (if given) is also recorded
+        self._timestamps = array.array ('d')
+
+
+    def __len__ (self):
+        """
+        returns the number of rows in this buffer
+        """
+
+        return len (self._columns [0])
+
+
+    def __getitem__ (self, index):
+        """
+        returns the row at the given position as a tuple
+        """
+
+        return tuple (icolumn [index] for icolumn in self._columns)
+
+
+    def __iter__ (self):
+        """
+        returns all rows in this buffer as tuples
+        """
+
+        for index in xrange (len (self)):
+            yield self [index]
+
+
+    def get_columns (self):
+        """
+        returns the values of every column either as an array or as a list
+        """
+
+        return self._columns
+
+
+    def get_timestamps (self):
+        """
+        returns an array with the time when every row was sampled. Unknown
+        timestamps are given as NaN
+        """
+
+        return self._timestamps
+
+
+    def append (self, row, timestamp=None):
+        """
+        adds the given row (a sequence with a value per column) to this buffer
+        which was sampled at the given time (if known)
+        """
+
+        self._timestamps.append (float ('nan') if timestamp is None else timestamp)
+        for (index, (icolumn, ivalue)) in enumerate (zip (self._columns, row)):
+            try:
+                icolumn.append (ivalue)
+            except (TypeError, OverflowError):
+                self._columns [index] = icolumn.tolist () + [ivalue]
+
+
+    def extend (self, rows, timestamp=None):
+        """
+        adds all the given rows to this buffer which were sampled at the given
+        time (if known)
+        """
+
+        for irow in rows:
+            self.append (irow, timestamp)
+
+        return self
+
+
+    __iadd__ = extend
+
+
+    def rows (self):
+        """
+        returns all rows in this buffer as views of the columns. The same view
+        is returned every time so that it should be consumed before
+        retrieving the next one
+        """
+
+        view = dbrow (self._columns)
+        for index in xrange (len (self)):
+            view.index = index
+            yield view
+
+
+# -----------------------------------------------------------------------------
+# dbrow
+#
+# this class provides access to a single row of a dbbuffer without copying
+# its values
+# -----------------------------------------------------------------------------
+class dbrow(object):
+
+    """
+    this class provides access to a single row of a dbbuffer without copying
+    its values
+    """
+
+    __slots__ = ['columns', 'index']
+
+    def __init__ (self, columns, index=0):
+        """
+        creates a view of the row at the given position of the given columns
+        """
+
+        (self.columns, self.index) = (columns, index)
+
+
+    def __len__ (self):
+        """
+        returns the number of values in this row
+        """
+
+        return len (self.columns)
+
+
+    def __getitem__ (self, column):
+        """
+        returns the value of the given column in this row
+        """
+
+        return self.columns [column][self.index]
+
+
+# -----------------------------------------------------------------------------
+# dbwriter
+#
+# this class writes data into a sqlite3 database in a separate thread so that
+# the caller does not wait for the database. Operations are submitted through
+# a bounded queue: if the writer falls behind, the caller blocks until there
+# is room in the queue
+# -----------------------------------------------------------------------------
+class dbwriter(object):
+
+    """
+    this class writes data into a sqlite3 database in a separate thread so that
+    the caller does not wait for the database. Operations are submitted through
+    a bounded queue: if the writer falls behind, the caller blocks until there
+    is room in the queue.
+
+    It provides the same services than dbaccess to write data. If any of them
+    fails, all subsequent operations are discarded and the error is raised in
+    the caller with the next operation or when closing the writer. In any case,
+    all data written before the error is committed
+    """
+
+    # maximum number of operations waiting in the queue
+    # -----------------------------------------------------------------------------
+    queue_size = 64
+
+    # the caller waits for the writer with a timeout so that it still attends
+    # signals (e.g., SIGINT) and notices errors while waiting
+    # -----------------------------------------------------------------------------
+    poll_delay = 1
+
+    def __init__ (self, dbname, profile='default', queue_size=None):
+        """
+        creates a thread that connects to a sqlite3 database with the given
+        storage profile and executes all operations submitted to it
+        """
+
+        # verify the storage profile
+        if profile not in profiles:
+            raise ValueError (" Unknown storage profile '%s'" % profile)
+
+        # store the name of the database and its profile
+        (self._dbname, self._profile) = (dbname, profile)
+
+        # create the queue of operations. Errors are recorded here
+        self._queue = Queue.Queue (queue_size or dbwriter.queue_size)
+        self._error = None
+
+        # and start the writer
+        self._thread = threading.Thread (target=self._write)
+        self._thread.daemon = True
+        self._thread.start ()
+
+
+    def _write (self):
+        """
+        executes all operations in the queue until the writer is closed. In
+        case of an error, all operations are discarded from then on (so that
+        the caller is never blocked) and the database is closed at the end,
+        hence committing all data written before
+        """
+
+        # connections can only be used in the thread where they were created
+        dbhandler = None
+        try:
+            dbhandler = dbaccess (self._dbname, self._profile)
+        except Exception as error:
+            self._error = error
+
+        while True:
+
+            (operation, args) = self._queue.get ()
+            if not operation:
+                break
+
+            if not self._error:
+                try:
+                    getattr (dbhandler, operation) (*args)
+                except Exception as error:
+                    self._error = error
+
+        if dbhandler:
+            try:
+                dbhandler.close ()
+            except Exception as error:
+                self._error = self._error or error
+
+
+    def _check (self):
+        """
+        raises the error (if any) found by the writer
+        """
+
+        if self._error:
+            raise self._error
+
+
+    def _submit (self, operation, *args):
+        """
+        submits the given operation with the given arguments to the writer. If
+        the queue is full, it blocks until there is room in it
+        """
+
+        while True:
+            self._check ()
+            try:
+                self._queue.put ((operation, args), timeout=dbwriter.poll_delay)
+                return
+            except Queue.Full:
+                continue
+
+
+    def get_name (self):
+        """
+        returns the name of this database
+        """
+
+        return self._dbname
+
+
+    def get_profile (self):
+        """
+        returns the name of the storage profile of this database
+        """
+
+        return self._profile
+
+
+    def create_table (self, dbtable):
+        """
+        creates a table with the name and columns specified in dbtable (DBTable)
+        """
+
+        self._submit ('create_table', dbtable)
+
+
+    def create_packed_table (self, dbtable, compression='raw'):
+        """
+        creates a packed table as described in dbaccess.create_packed_table
+        """
+
+        if compression not in compressions:
+            raise ValueError (" Unknown compression '%s'" % compression)
+
+        self._submit ('create_packed_table', dbtable, compression)
+
+
+    def insert_data (self, dbtable, data):
+        """
+        it stores data in the table qualified by dbtable (DBTable). data should
+        not be modified afterwards
+        """
+
+        if (len (data) > 0):
+            self._submit ('insert_data', dbtable, data)
+
+
+    def merge (self, dbname, dbtables, remove=False):
+        """
+        appends all rows of the given tables in the database dbname as
+        described in dbaccess.merge. The database dbname should not be written
+        anymore
+        """
+
+        self._submit ('merge', dbname, dbtables, remove)
+
+
+    def commit (self):
+        """
+        commits all changes made since the last commit
+        """
+
+        self._submit ('commit')
+
+
+    def optimize (self, vacuum=False, analyze=False):
+        """
+        optimizes the database as described in sqldb.optimize
+        """
+
+        self._submit ('optimize', vacuum, analyze)
+
+
+    def close (self):
+        """
+        waits for the writer to execute all pending operations, commits changes
+        and closes the connection. If the writer found any error, it is raised
+        here
+        """
+
+        # once closed, the writer is not restarted
+        if self._thread.is_alive ():
+            self._queue.put ((None, ()))
+            while self._thread.is_alive ():
+                self._thread.join (dbwriter.poll_delay)
+
+        self._check ()
 
 
 # Local Variables:
@@ -0,0 +1,611 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# stattools.py
+# Description: online statistics of series of samples
+# -----------------------------------------------------------------------------
+#
+# Started on  <Fri Oct 16 23:40:18 2026 Carlos Linares Lopez>
+# Last update <Fri Oct 16 23:40:18 2026 Carlos Linares Lopez (clinares)>
+# -----------------------------------------------------------------------------
+#
+# $Id::                                                                      $
+# $Date::                                                                    $
+# $Revision::                                                                $
+# -----------------------------------------------------------------------------
+#
+# Made by Carlos Linares Lopez
+# Login   <clinares@atlas>
+#
+
+# -----------------------------------------------------------------------------
+#     This file is part of testbot
+#
+#     testbot is free software: you can redistribute it and/or modify it under
+#     the terms of the GNU General Public License as published by the Free
+#     Software Foundation, either version 3 of the License, or (at your option)
+#     any later version.
+#
+#     testbot is distributed in the hope that it will be useful, but WITHOUT ANY
+#     WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+#     FOR A PARTICULAR PURPOSE.  See the GNU General Public License for more
+#     details.
+#
+#     You should have received a copy of the GNU General Public License along
+#     with testbot.  If not, see <http://www.gnu.org/licenses/>.
+#
+#     Copyright Carlos Linares Lopez, 2014
+# -----------------------------------------------------------------------------
+
+"""
+.. module:: stattools
+   :platform: Linux
+   :synopsis: online statistics of series of samples
+
+.. moduleauthor:: Carlos Linares Lopez <carlos.linares@uc3m.es>
+"""
+
+__version__  = '1.0'
+__revision__ = '$Revision$'
+
+
+# -----------------------------------------------------------------------------
+# Aggregate
+#
+# Base class of all aggregate functions. They are computed online, i.e.,
+# samples are given one at a time and only a constant amount of memory is used
+# -----------------------------------------------------------------------------
+class Aggregate(object):
+    """
+    Base class of all aggregate functions. They are computed online, i.e.,
+    samples are given one at a time and only a constant amount of memory is
+    used
+    """
+
+    def __init__ (self):
+        """
+        creates an aggregate with no samples
+        """
+
+        self.reset ()
+
+
+    def reset (self):
+        """
+        forgets all samples seen so far
+        """
+
+        self._value = None
+
+
+    def update (self, value):
+        """
+        takes the given sample into account
+        """
+
+        raise NotImplementedError
+
+
+    def get (self):
+        """
+        returns the value of this aggregate or None if no sample was given
+        """
+
+        return self._value
+
+
+# -----------------------------------------------------------------------------
+# Min
+#
+# minimum of all samples
+# -----------------------------------------------------------------------------
+class Min(Aggregate):
+    """
+    minimum of all samples
+    """
+
+    def update (self, value):
+        """
+        takes the given sample into account
+        """
+
+        if self._value is None or value < self._value:
+            self._value = value
+
+
+# -----------------------------------------------------------------------------
+# Max
+#
+# maximum of all samples
+# -----------------------------------------------------------------------------
+class Max(Aggregate):
+    """
+    maximum of all samples
+    """
+
+    def update (self, value):
+        """
+        takes the given sample into account
+        """
+
+        if self._value is None or value > self._value:
+            self._value = value
+
+
+# -----------------------------------------------------------------------------
+# Sum
+#
+# sum of all samples
+# -----------------------------------------------------------------------------
+class Sum(Aggregate):
+    """
+    sum of all samples
+    """
+
+    def update (self, value):
+        """
+        takes the given sample into account
+        """
+
+        self._value = value if self._value is None else self._value + value
+
+
+# -----------------------------------------------------------------------------
+# Mean
+#
+# arithmetic mean of all samples, possibly weighted
+# -----------------------------------------------------------------------------
+class Mean(Aggregate):
+    """
+    arithmetic mean of all samples, possibly weighted
+    """
+
+    def reset (self):
+        """
+        forgets all samples seen so far
+        """
+
+        (self._value, self._count) = (None, 0)
+
+
+    def update (self, value, weight=1):
+        """
+        takes the given sample into account with the given weight (e.g., the
+        time elapsed since the previous sample). The mean is updated
+        incrementally to avoid large sums
+        """
+
+        if weight <= 0:
+            return
+
+        self._count += weight
+        if self._value is None:
+            self._value = float (value)
+        else:
+            self._value += (value - self._value) * weight / float (self._count)
+
+
+# -----------------------------------------------------------------------------
+# First
+#
+# first sample
+# -----------------------------------------------------------------------------
+class First(Aggregate):
+    """
+    first sample
+    """
+
+    def reset (self):
+        """
+        forgets all samples seen so far
+        """
+
+        (self._value, self._empty) = (None, True)
+
+
+    def update (self, value):
+        """
+        takes the given sample into account
+        """
+
+        if self._empty:
+            (self._value, self._empty) = (value, False)
+
+
+# -----------------------------------------------------------------------------
+# Last
+#
+# last sample
+# -----------------------------------------------------------------------------
+class Last(Aggregate):
+    """
+    last sample
+    """
+
+    def update (self, value):
+        """
+        takes the given sample into account
+        """
+
+        self._value = value
+
+
+# -----------------------------------------------------------------------------
+# Count
+#
+# number of samples
+# -----------------------------------------------------------------------------
+class Count(Aggregate):
+    """
+    number of samples
+    """
+
+    def reset (self):
+        """
+        forgets all samples seen so far
+        """
+
+        self._value = 0
+
+
+    def update (self, value):
+        """
+        takes the given sample into account
+        """
+
+        self._value += 1
+
+
+# -----------------------------------------------------------------------------
+# Quantile
+#
+# estimate of the p-quantile of all samples computed with the P-square
+# algorithm (Jain and Chlamtac, 1985). Only five markers are kept, no matter
+# the number of samples. While fewer than five samples are available, the
+# quantile is computed exactly
+# -----------------------------------------------------------------------------
+class Quantile(Aggregate):
+    """
+    estimate of the p-quantile of all samples computed with the P-square
+    algorithm (Jain and Chlamtac, 1985). Only five markers are kept, no matter
+    the number of samples. While fewer than five samples are available, the
+    quantile is computed exactly
+    """
+
+    def __init__ (self, p):
+        """
+        creates an estimate of the p-quantile, with 0 < p < 1, with no
+        samples
+        """
+
+        if not 0 < p < 1:
+            raise ValueError (" The quantile should be in the interval (0, 1)")
+
+        self._p = p
+        super (Quantile, self).__init__ ()
+
+
+    def reset (self):
+        """
+        forgets all samples seen so far
+        """
+
+        p = self._p
+
+        # heights and actual positions of the markers, their desired positions
+        # and the increments of the desired positions
+        self._heights = []
+        self._positions = [1, 2, 3, 4, 5]
+        self._desired = [1, 1 + 2 * p, 1 + 4 * p, 3 + 2 * p, 5]
+        self._increments = [0, p / 2, p, (1 + p) / 2, 1]
+
+
+    def update (self, value):
+        """
+        takes the given sample into account
+        """
+
+        (heights, positions, desired) = (self._heights, self._positions, self._desired)
+
+        # the first five samples are used as the initial markers
+        if len (heights) < 5:
+            heights.append (float (value))
+            heights.sort ()
+            return
+
+        # find the cell the new sample falls in, adjusting the extreme markers
+        # if necessary
+        if value < heights [0]:
+            (heights [0], cell) = (float (value), 0)
+        elif value >= heights [4]:
+            (heights [4], cell) = (float (value), 3)
+        else:
+            cell = 0
+            while value >= heights [cell + 1]:
+                cell += 1
+
+        for index in xrange (cell + 1, 5):
+            positions [index] += 1
+        for index in xrange (5):
+            desired [index] += self._increments [index]
+
+        # and move the middle markers towards their desired positions
+        for index in xrange (1, 4):
+            delta = desired [index] - positions [index]
+            if ((delta >= 1 and positions [index + 1] - positions [index] > 1) or
+                (delta <= -1 and positions [index - 1] - positions [index] < -1)):
+                sign = 1 if delta > 0 else -1
+                height = self._parabolic (index, sign)
+                if not heights [index - 1] < height < heights [index + 1]:
+                    height = self._linear (index, sign)
+                heights [index] = height
+                positions [index] += sign
+
+
+    def get (self):
+        """
+        returns the estimate of the quantile or None if no sample was given
+        """
+
+        heights = self._heights
+        if not heights:
+            return None
+
+        if len (heights) == 5 and self._positions [4] > 5:
+            return heights [2]
+
+        # with a few samples, interpolate between the closest ones
+        rank = self._p * (len (heights) - 1)
+        lower = int (rank)
+        upper = min (lower + 1, len (heights) - 1)
+        return heights [lower] + (rank - lower) * (heights [upper] - heights [lower])
+
+
+    def _parabolic (self, index, sign):
+        """
+        returns the new height of the given marker when moved one position in
+        the given direction according to the piecewise-parabolic formula
+        """
+
+        (q, n) = (self._heights, self._positions)
+        return q [index] + float (sign) / (n [index + 1] - n [index - 1]) * (
+            (n [index] - n [index - 1] + sign) * (q [index + 1] - q [index]) / (n [index + 1] - n [index]) +
+            (n [index + 1] - n [index] - sign) * (q [index] - q [index - 1]) / (n [index] - n [index - 1]))
+
+
+    def _linear (self, index, sign):
+        """
+        returns the new height of the given marker when moved one position in
+        the given direction with a linear interpolation
+        """
+
+        (q, n) = (self._heights, self._positions)
+        return q [index] + sign * (q [index + sign] - q [index]) / (n [index + sign] - n [index])
+
+
+# aggregate functions recognized in the database specification files and the
+# column types they can be applied to
+# -----------------------------------------------------------------------------
+aggregates = {'min'  : (Min,   ['integer', 'real', 'text']),
+              'max'  : (Max,   ['integer', 'real', 'text']),
+              'sum'  : (Sum,   ['integer', 'real']),
+              'mean' : (Mean,  ['real']),
+              'first': (First, ['integer', 'real', 'text']),
+              'last' : (Last,  ['integer', 'real', 'text']),
+              'count': (Count, ['integer', 'real'])}
+
+
+# -----------------------------------------------------------------------------
+# Summary
+#
+# Summary statistics of a series of samples computed online in constant
+# memory: the peak, the mean (weighted) and a number of percentiles
+# (estimated). They are returned in a dictionary indexed by 'peak', 'mean' and
+# 'p' followed by the percentile, e.g., 'p95'
+# -----------------------------------------------------------------------------
+class Summary(object):
+    """
+    Summary statistics of a series of samples computed online in constant
+    memory: the peak, the mean (weighted) and a number of percentiles
+    (estimated). They are returned in a dictionary indexed by 'peak', 'mean'
+    and 'p' followed by the percentile, e.g., 'p95'
+    """
+
+    # percentiles computed by default
+    # -----------------------------------------------------------------------------
+    percentiles = (50, 95, 99)
+
+    def __init__ (self, percentiles=None):
+        """
+        creates a summary with no samples of the given percentiles (or those by
+        default)
+        """
+
+        (self._peak, self._mean) = (Max (), Mean ())
+        self._quantiles = [('p%i' % ipercentile, Quantile (ipercentile / 100.0))
+                           for ipercentile in (percentiles or Summary.percentiles)]
+
+
+    def update (self, value, weight=1):
+        """
+        takes the given sample into account. The weight is used only to
+        compute the mean
+        """
+
+        self._peak.update (value)
+        self._mean.update (value, weight)
+        for (name, iquantile) in self._quantiles:
+            iquantile.update (value)
+
+
+    def get (self):
+        """
+        returns a dictionary with all the summary statistics or an empty
+        dictionary if no sample was given
+        """
+
+        if self._peak.get () is None:
+            return dict ()
+
+        result = dict ((name, iquantile.get ()) for (name, iquantile) in self._quantiles)
+        result ['peak'] = self._peak.get ()
+        result ['mean'] = self._mean.get ()
+
+        return result
+
+
+# -----------------------------------------------------------------------------
+# Window
+#
+# Aggregates the rows of a table over consecutive windows of time of the same
+# length. Every column is aggregated with its own aggregate function (by
+# default, the last sample) and a single row is returned per window
+# -----------------------------------------------------------------------------
+class Window(object):
+    """
+    Aggregates the rows of a table over consecutive windows of time of the same
+    length. Every column is aggregated with its own aggregate function (by
+    default, the last sample) and a single row is returned per window
+    """
+
+    def __init__ (self, length, functions):
+        """
+        creates a window of the given length (in seconds) where the i-th
+        column is aggregated with the i-th function given (the name of an
+        aggregate function or None)
+        """
+
+        (self._length, self._start) = (length, None)
+        self._aggregates = [aggregates [ifunction or 'last'][0] ()
+                            for ifunction in functions]
+
+
+    def update (self, rows, timestamp):
+        """
+        takes into account the given rows sampled at the given time (in
+        seconds). If the current window is over, it returns a list with the row
+        that aggregates all rows sampled in it. Otherwise, it returns an empty
+        list
+        """
+
+        # windows are aligned to multiples of their length
+        result = []
+        if self._start is not None and timestamp >= self._start + self._length:
+            result = self.flush ()
+        if self._start is None:
+            self._start = self._length * int (timestamp / self._length)
+
+        for irow in rows:
+            for (iaggregate, ivalue) in zip (self._aggregates, irow):
+                iaggregate.update (ivalue)
+
+        return result
+
+
+    def flush (self, timestamp=None):
+        """
+        returns a list with the row that aggregates all rows sampled in the
+        current window (if any) and starts a new one. The timestamp is
+        ignored since all windows have the same length
+        """
+
+        if self._start is None:
+            return []
+
+        row = tuple (iaggregate.get () for iaggregate in self._aggregates)
+        for iaggregate in self._aggregates:
+            iaggregate.reset ()
+        self._start = None
+
+        return [row]
+
+
+# -----------------------------------------------------------------------------
+# Change
+#
+# Records the rows of a table only when they change. Columns without an
+# aggregate function are compared with the previous row and a new row is
+# returned only when any of them changes. Columns with an aggregate function
+# are aggregated over all the rows that were not recorded. Every row comes with
+# an additional value: the time elapsed (in seconds) since the first row it
+# aggregates
+# -----------------------------------------------------------------------------
+class Change(object):
+    """
+    Records the rows of a table only when they change. Columns without an
+    aggregate function are compared with the previous row and a new row is
+    returned only when any of them changes. Columns with an aggregate function
+    are aggregated over all the rows that were not recorded. Every row comes
+    with an additional value: the time elapsed (in seconds) since the first row
+    it aggregates
+    """
+
+    def __init__ (self, functions):
+        """
+        creates a new recorder where the i-th column is aggregated with the
+        i-th function given (the name of an aggregate function) or it is
+        compared with the previous row if None is given
+        """
+
+        self._aggregates = [aggregates [ifunction][0] () if ifunction else None
+                            for ifunction in functions]
+        self._keys = [index for (index, ifunction) in enumerate (functions)
+                      if not ifunction]
+
+        # the values compared, the first row with them and when it was sampled
+        (self._key, self._row, self._start, self._last) = (None, None, None, None)
+
+
+    def update (self, rows, timestamp):
+        """
+        takes into account the given rows sampled at the given time (in
+        seconds). It returns a list with the rows that aggregate all samples
+        taken before any change was found (if any)
+        """
+
+        result = []
+        for irow in rows:
+
+            # if any column changed, record all samples taken so far
+            key = tuple (irow [index] for index in self._keys)
+            if self._start is not None and key != self._key:
+                result += self.flush (timestamp)
+            if self._start is None:
+                (self._key, self._row, self._start) = (key, irow, timestamp)
+
+            for (iaggregate, ivalue) in zip (self._aggregates, irow):
+                if iaggregate:
+                    iaggregate.update (ivalue)
+            self._last = timestamp
+
+        return result
+
+
+    def flush (self, timestamp=None):
+        """
+        returns a list with the row that aggregates all samples taken since the
+        last change (if any) and that lasted until the given time (in seconds)
+        or the last sample if none is given
+        """
+
+        if self._start is None:
+            return []
+
+        if timestamp is None:
+            timestamp = self._last
+        row = tuple (iaggregate.get () if iaggregate else ivalue
+                     for (iaggregate, ivalue) in zip (self._aggregates, self._row))
+        row += (timestamp - self._start,)
+
+        for iaggregate in self._aggregates:
+            if iaggregate:
+                iaggregate.reset ()
+        (self._key, self._row, self._start, self._last) = (None, None, None, None)
+
+        return [row]
+
+
+# Local Variables:
+# mode:python
+# fill-column:79
+# End:
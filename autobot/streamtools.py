@@ -0,0 +1,161 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# streamtools.py
+# Description: memory-mapped access to the output of processes
+# -----------------------------------------------------------------------------
+#
+# Started on  <Sat Oct 17 09:14:52 2026 Carlos Linares Lopez>
+# Last update <Sat Oct 17 09:14:52 2026 Carlos Linares Lopez (clinares)>
+# -----------------------------------------------------------------------------
+#
+# $Id::                                                                      $
+# $Date::                                                                    $
+# $Revision::                                                                $
+# -----------------------------------------------------------------------------
+#
+# Made by Carlos Linares Lopez
+# Login   <clinares@atlas>
+#
+
+# -----------------------------------------------------------------------------
+#     This file is part of testbot
+#
+#     testbot is free software: you can redistribute it and/or modify it under
+#     the terms of the GNU General Public License as published by the Free
+#     Software Foundation, either version 3 of the License, or (at your option)
+#     any later version.
+#
+#     testbot is distributed in the hope that it will be useful, but WITHOUT ANY
+#     WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+#     FOR A PARTICULAR PURPOSE.  See the GNU General Public License for more
+#     details.
+#
+#     You should have received a copy of the GNU General Public License along
+#     with testbot.  If not, see <http://www.gnu.org/licenses/>.
+#
+#     Copyright Carlos Linares Lopez, 2014
+# -----------------------------------------------------------------------------
+
+"""
+.. module:: streamtools
+   :platform: Linux
+   :synopsis: memory-mapped access to the output of processes
+
+.. moduleauthor:: Carlos Linares Lopez <carlos.linares@uc3m.es>
+"""
+
+__version__  = '1.0'
+__revision__ = '$Revision$'
+
+# imports
+# -----------------------------------------------------------------------------
+import mmap                     # memory-mapped files
+import os                       # fstat
+
+
+# functions
+# -----------------------------------------------------------------------------
+def view (text):
+    """
+    returns an object that can be scanned with regular expressions with the
+    contents of text: the memory-mapped buffer of text if it is an instance of
+    MappedFile and text itself otherwise
+    """
+
+    if isinstance (text, MappedFile):
+        return text.get_buffer ()
+    return text
+
+
+# -----------------------------------------------------------------------------
+# MappedFile
+#
+# Gives read-only access to the contents of a file through a memory map so that
+# they are not copied to memory unless they are explicitly requested as a
+# string. The file is mapped when this instance is created so that it can be
+# moved or even removed afterwards
+# -----------------------------------------------------------------------------
+class MappedFile(object):
+    """
+    Gives read-only access to the contents of a file through a memory map so
+    that they are not copied to memory unless they are explicitly requested as a
+    string. The file is mapped when this instance is created so that it can be
+    moved or even removed afterwards
+    """
+
+    def __init__(self, filename):
+        """
+        maps the contents of the given file in memory
+
+        :param filename: name of the file to map
+        :type filename: str
+        """
+
+        self._filename = filename
+
+        # empty files can not be mapped, so that an empty string is used
+        # instead
+        with open (filename, "r") as stream:
+            if os.fstat (stream.fileno ()).st_size:
+                self._buffer = mmap.mmap (stream.fileno (), 0, access=mmap.ACCESS_READ)
+            else:
+                self._buffer = ''
+
+        # the contents of the file are materialized only on demand
+        self._contents = None
+
+
+    def get_filename (self):
+        """
+        returns the name of the file mapped in memory
+        """
+
+        return self._filename
+
+
+    def get_buffer (self):
+        """
+        returns the memory-mapped buffer of this file. It can be sliced and
+        scanned with regular expressions as any other string without copying
+        the whole contents of the file
+        """
+
+        return self._buffer
+
+
+    def close (self):
+        """
+        releases the memory map of this file. Its contents can still be
+        accessed only if they were already materialized
+        """
+
+        if not isinstance (self._buffer, str):
+            self._buffer.close ()
+        self._buffer = ''
+
+
+    def __len__ (self):
+        """
+        returns the size of this file in bytes
+        """
+
+        return len (self._buffer)
+
+
+    def __str__ (self):
+        """
+        returns the contents of this file. They are copied from the memory map
+        only the first time
+        """
+
+        if self._contents is None:
+            self._contents = self._buffer [:]
+        return self._contents
+
+
+
+# Local Variables:
+# mode:python
+# fill-column:79
+# End:
@@ -48,16 +48,23 @@ __revision__ = '$Revision: 306 $'
 # imports
 # -----------------------------------------------------------------------------
 import datetime         # date/time
+import errno            # error codes
 import os               # process handling
+import select           # waiting for I/O completion
 import signal           # os signals
+import threading        # threads
 import time             # time management
 
 from collections import defaultdict
+from collections import OrderedDict
 
 
 # globals
 # -----------------------------------------------------------------------------
-JIFFIES_PER_SECOND = 100
+# number of clock ticks (jiffies) per second of this system. All times in /proc
+# are given in clock ticks. It can be overridden in case the processes are
+# examined in a system with a different clock tick rate
+JIFFIES_PER_SECOND = os.sysconf (os.sysconf_names['SC_CLK_TCK'])
 
 # functions
 # -----------------------------------------------------------------------------
@@ -77,6 +84,77 @@ def rpartition(text, pattern):
         return text[:pos], pattern, text[pos + len(pattern):]
 
 
+def read_file (filename):
+    """
+    returns the whole contents of the given file. It is intended for reading
+    small files in /proc and it is cheaper than using file objects
+    """
+
+    fd = os.open (filename, os.O_RDONLY)
+    try:
+        contents = chunk = os.read (fd, 4096)
+        while chunk:
+            chunk = os.read (fd, 4096)
+            contents += chunk
+    finally:
+        os.close (fd)
+
+    return contents
+
+
+def read_boottime ():
+    """
+    returns the time when the system was booted in seconds since the Epoch
+    """
+
+    return time.time () - float (read_file ("/proc/uptime").split ()[0])
+
+
+def restore_signals ():
+    """
+    restores the default action of the signals that python ignores at startup
+    (SIGPIPE and SIGXFSZ). Otherwise, they are inherited as ignored by all
+    children so that, e.g., processes that exceed their limit of file size are
+    not killed but their writes just fail
+    """
+
+    for isignal in [signal.SIGPIPE, signal.SIGXFSZ]:
+        signal.signal (isignal, signal.SIG_DFL)
+
+
+def exit_cause (status, cputime=None, cpulimit=None):
+    """
+    returns a string that describes the cause of the termination of a process
+    given its exit status as returned by os.waitpid: 'exit' if it terminated
+    normally; 'cpulimit' or 'fsizelimit' if it was killed because it exceeded
+    its limit of cpu time or file size (see setrlimit) and 'signal' if it was
+    killed by any other signal
+
+    Shells report that their last command was killed by a signal with the exit
+    code 128 + signal, so that these exit codes are also acknowledged as
+    'cpulimit' or 'fsizelimit'
+
+    Processes that exceed the hard limit of cpu time are killed with SIGKILL.
+    Thus, if the cpu time consumed by the process and its soft limit of cpu
+    time (both in seconds) are given, SIGKILL is also acknowledged as
+    'cpulimit' if the process exceeded its limit
+    """
+
+    causes = {signal.SIGXCPU: 'cpulimit',
+              signal.SIGXFSZ: 'fsizelimit'}
+
+    if os.WIFSIGNALED (status):
+        if (os.WTERMSIG (status) == signal.SIGKILL and
+            cpulimit is not None and cputime >= cpulimit):
+            return 'cpulimit'
+        return causes.get (os.WTERMSIG (status), 'signal')
+
+    if os.WIFEXITED (status) and os.WEXITSTATUS (status) - 128 in causes:
+        return causes [os.WEXITSTATUS (status) - 128]
+
+    return 'exit'
+
+
 def read_processes (pgrp):
     """
     computes the list of processes whose process group matches the given one or
@@ -86,13 +164,15 @@ def read_processes (pgrp):
     """
 
     # compute the list of processes currently running in the system
-    processes = [Process (int (filename)) for filename in os.listdir ("/proc")
+    boottime = read_boottime ()
+    processes = [Process (int (filename), boottime) for filename in os.listdir ("/proc")
                  if filename.isdigit ()]
 
     # initialize a dictionary that maps every pgrp selected to the process ids
-    # that belong to it
+    # that belong to it and also the set of all process ids selected so far
     pgrps = defaultdict (set)
     pgrps[pgrp] = set ()        # annotate this pgrp for further tracking
+    pids = set ()
 
     # now, compute the list of pgrps to watch until a fixpoint is reached
     sentinel = True
@@ -107,10 +187,11 @@ def read_processes (pgrp):
             if ((iprocess.pgrp not in pgrps or
                  iprocess.pid not in pgrps[iprocess.pgrp]) and
                 (iprocess.pgrp in pgrps or
-                 iprocess.ppid in reduce (lambda x,y:x.union (y), pgrps.values ()))):
+                 iprocess.ppid in pids)):
 
                 sentinel = True
                 pgrps[iprocess.pgrp].add (iprocess.pid)
+                pids.add (iprocess.pid)
 
     # finally, filter the original list of processes and retain only those whose
     # pgrp has been selected. Take care to remove the process whose pid=pgrp
@@ -121,6 +202,24 @@ def read_processes (pgrp):
     return filter (lambda iprocess:iprocess.pgrp in pgrps, processes)
 
 
+def read_children (pid):
+    """
+    returns the list of process ids of the children of the given process as
+    listed in /proc/<pid>/task/*/children. If the process does not exist
+    anymore, an empty list is returned
+    """
+
+    children = []
+    try:
+        for itask in os.listdir ("/proc/%d/task" % pid):
+            with open ("/proc/%d/task/%s/children" % (pid, itask)) as stream:
+                children += [int (ichild) for ichild in stream.read ().split ()]
+    except (IOError, OSError):
+        pass
+
+    return children
+
+
 # -----------------------------------------------------------------------------
 # Process
 #
@@ -133,7 +232,13 @@ class Process(object):
     particular process identified by its process identifier (PID)
     """
 
-    def __init__(self, pid):
+    # processes are sampled very often so that their attributes are stored in
+    # slots
+    __slots__ = ['pid', 'ppid', 'pgrp', 'utime', 'stime', 'cutime', 'cstime',
+                 'numthreads', 'sttime', 'vsize', 'cmdline', 'starttime',
+                 'endtime']
+
+    def __init__(self, pid, boottime=None, cmdlines=None):
         """
         Access the :file:`stat` and :file:`cmdline` of a particular process
         identified by its process id (PID) in the :file:`/proc` filesystem. The
@@ -142,52 +247,70 @@ class Process(object):
         parameters see ``man /proc`` In case that these files cannot be
         accessed, it returns immediately with a pid, ppid and pgrp equal to -1
 
-        It also processes the entries in the /proc/<pid>/fd and stat its
-        contents in the form of instances of FileInfo
+        Since many processes are usually sampled at the same time, the boot
+        time of the system (see read_boottime) can be given so that it is not
+        computed again for every process. Likewise, if a dictionary is given in
+        cmdlines, the command line of every process is read only once and
+        stored there indexed by the key of the process (see get_key)
 
         :param pid: process identifier (PID)
         :type pid: int
+        :param boottime: boot time of the system in seconds since the Epoch
+        :type boottime: float
+        :param cmdlines: command lines of the processes already sampled
+        :type cmdlines: dict
         """
 
         # avoid race conditions by verifying that there is still information
         # available about this process
         try:
-            stat = open("/proc/%d/stat" % pid).read()
-            cmdline = open("/proc/%d/cmdline" % pid).read()
+            stat = read_file ("/proc/%d/stat" % pid)
+            if not stat:
+                raise OSError
+
+            # Don't use stat.split(): the command can contain spaces
+            # Be careful which "()" to match: the command name can contain
+            # parentheses.
+            rparen = stat.rfind (")")
+            command = stat[stat.find ("(")+1:rparen]
+            parts = stat[rparen+1:].split()
+
+            # now, retrieve various data from proc/%pid/stat
+            self.pid = pid
+            self.ppid = int(parts[1])
+            self.pgrp = int(parts[2])
+            self.utime = int(parts[11])
+            self.stime = int(parts[12])
+            self.cutime = int(parts[13])
+            self.cstime = int(parts[14])
+            self.numthreads = int (parts[17])
+            self.sttime = int (parts[19])
+            self.vsize = int(parts[20])
+
+            # the command line is read only if it was not read before. Note
+            # that a process changes its command line (and also its command)
+            # when it executes another program
+            cmdline = cmdlines and cmdlines.get ((pid, self.sttime))
+            if cmdline and cmdline[0] == command:
+                self.cmdline = cmdline[1]
+            else:
+                self.cmdline = read_file ("/proc/%d/cmdline" % pid).rstrip("\0\n").replace("\0", " ")
+                if cmdlines is not None:
+                    cmdlines [(pid, self.sttime)] = (command, self.cmdline)
 
         except:
             
-            self.pid = self.ppid = self.pgrp = -1
+            self.pid = self.ppid = self.pgrp = self.sttime = -1
             self.cmdline = '<Invalid cmdline>'
 
             return
 
-        # Don't use stat.split(): the command can contain spaces
-        # Be careful which "()" to match: the command name can contain
-        # parentheses.
-        prefix, lparen, rest = partition(stat, "(")
-        command, rparen, suffix = rpartition(rest, ")")
-        parts = suffix.split()
-
-        # now, retrieve various data from proc/%pid/stat
-        self.pid = pid
-        self.ppid = int(parts[1])
-        self.pgrp = int(parts[2])
-        self.utime = int(parts[11])
-        self.stime = int(parts[12])
-        self.cutime = int(parts[13])
-        self.cstime = int(parts[14])
-        self.numthreads = int (parts[17])
-        self.sttime = int (parts[19])
-        self.vsize = int(parts[20])
-        self.cmdline = cmdline.rstrip("\0\n").replace("\0", " ")
-
         # now, compute the start time of this process as the difference between
         # the current time and the boot up time plus the time in seconds (which
         # is the start time divided by the number of jiffies)
-        uptime=open ("/proc/uptime").read ()
-        self.starttime = time.time () - float (uptime.split (' ')[0]) + \
-            self.sttime/float(JIFFIES_PER_SECOND)
+        if boottime is None:
+            boottime = read_boottime ()
+        self.starttime = boottime + self.sttime/float(JIFFIES_PER_SECOND)
 
         # finally, initialize the end time of this process to an impossible
         # value (so that consistency can be enforced later) and the list of fds
@@ -206,10 +329,12 @@ class Process(object):
 
     def __eq__ (self, other):
         """
-        returns true if this instance and other refer to the same process
+        returns true if this instance and other refer to the same process. Two
+        processes are the same if they have the same pid and start time, so
+        that reused process ids are told apart
         """
 
-        return (self.pid == other.get_pid ())
+        return (self.get_key () == other.get_key ())
 
 
     def __ne__ (self, other):
@@ -218,7 +343,24 @@ class Process(object):
         ---defined only for consistency with __eq__
         """
 
-        return (self.pid != other.get_pid ())
+        return (self.get_key () != other.get_key ())
+
+
+    def __hash__ (self):
+        """
+        returns a hash value consistent with __eq__
+        """
+
+        return hash (self.get_key ())
+
+
+    def get_key (self):
+        """
+        returns a tuple (pid, start time in jiffies) which uniquely identifies
+        this process
+        """
+
+        return (self.pid, self.sttime)
 
 
     def get_pid (self):
@@ -270,6 +412,230 @@ class Process(object):
         return self.utime + self.stime + self.cutime + self.cstime
 
 
+# -----------------------------------------------------------------------------
+# ProcessTracker
+#
+# Keeps track of the processes that belong to a particular process group and
+# all their descendants (even if they have a different process group) between
+# successive invocations so that only these processes are examined. Similarly
+# to read_processes, processes that were once tracked are tracked while they
+# are alive, even if they are reparented.
+#
+# New processes are discovered by reading the children of the tracked processes
+# in /proc/<pid>/task/*/children. Besides, all process ids in /proc are listed
+# but only the processes that were not seen before are examined (since a
+# process can never become a descendant of another one) to find those left
+# behind in a tracked process group after their parent terminated
+# -----------------------------------------------------------------------------
+class ProcessTracker(object):
+    """
+    Keeps track of the processes that belong to a particular process group and
+    all their descendants (even if they have a different process group) between
+    successive invocations so that only these processes are examined.
+    Similarly to read_processes, processes that were once tracked are tracked
+    while they are alive, even if they are reparented.
+
+    New processes are discovered by reading the children of the tracked
+    processes in :file:`/proc/<pid>/task/*/children`. Processes left behind in
+    a tracked process group after their parent terminated are reparented, so
+    that they are searched for among the processes in :file:`/proc` which were
+    not seen before (since a process can never become a descendant of another
+    one). As listing :file:`/proc` takes time proportional to the number of
+    processes in the host, this is done only the first time, when a tracked
+    process terminated or when a tracked process group has no member among the
+    descendants found but it still exists. Thus, a process forked by another
+    one which was never seen is missed if its parent terminated in between
+    while some other member of its process group is still tracked
+    """
+
+    def __init__(self, pgrp):
+        """
+        starts tracking the processes of the given process group. Note that the
+        leader of this process group should exist
+
+        :param pgrp: group id
+        :type pgrp: int
+        """
+
+        self._pgrp = pgrp
+
+        # the start time of every tracked process is recorded to tell it apart
+        # from other processes that reuse the same process id
+        self._tracked = {}
+
+        # process ids seen in /proc which do not belong to the tracked tree
+        self._untracked = set ()
+
+        # process groups of the tracked processes
+        self._pgrps = set ([pgrp])
+
+        # command lines of the tracked processes
+        self._cmdlines = {}
+
+        # the leader of the process group is examined only the first time
+        self._first = True
+
+        # decide how to discover new processes
+        mypid = os.getpid ()
+        self._children = os.path.exists ("/proc/%d/task/%d/children" % (mypid, mypid))
+
+
+    def _is_tracked (self, process):
+        """
+        returns true if the given process is the same process that was
+        tracked with the same process id
+        """
+
+        return self._tracked.get (process.pid) == process.sttime
+
+
+    def _read_descendants (self, boottime):
+        """
+        returns the list of processes currently alive which were tracked or are
+        descendants of them, using the children of every process
+        """
+
+        processes = []
+        pending = self._tracked.keys ()
+        if self._first:
+            pending.append (self._pgrp)
+        visited = set ()
+        while pending:
+
+            pid = pending.pop ()
+            if pid in visited:
+                continue
+            visited.add (pid)
+
+            # read the information of this process and skip it if it either
+            # does not exist anymore or it is a different process
+            process = Process (pid, boottime, self._cmdlines)
+            if process.pid < 0 or (pid in self._tracked and not self._is_tracked (process)):
+                continue
+
+            processes.append (process)
+            pending += read_children (pid)
+
+        # processes left behind in a tracked process group by a parent that
+        # terminated are reparented (usually to init) so that they are not
+        # among the children of any tracked process. They are found among the
+        # processes not seen before in /proc, which are listed only if there
+        # might be any
+        if self._first or self._has_orphans (processes):
+            return processes + self._read_unseen_processes (boottime, processes)
+        return processes
+
+
+    def _has_orphans (self, processes):
+        """
+        returns true if any process could have been left behind by a parent
+        that terminated, i.e., if any tracked process is not among the given
+        ones or any tracked process group has no member among them but it
+        still exists
+        """
+
+        pids = set (iprocess.pid for iprocess in processes)
+        if any (pid not in pids for pid in self._tracked):
+            return True
+
+        pgrps = set (iprocess.pgrp for iprocess in processes)
+        for pgrp in self._pgrps - pgrps:
+            try:
+                os.killpg (pgrp, 0)
+                return True
+            except OSError, message:
+
+                # the process group exists if signals can not be sent to it
+                if message.errno == errno.EPERM:
+                    return True
+
+        return False
+
+
+    def _read_new_processes (self, boottime):
+        """
+        returns the list of processes currently alive which were tracked or are
+        descendants of them, examining only those processes not seen before in
+        /proc
+        """
+
+        # update the information of all tracked processes which are still
+        # alive and are the same process
+        processes = []
+        for pid in self._tracked:
+            process = Process (pid, boottime, self._cmdlines)
+            if process.pid >= 0 and self._is_tracked (process):
+                processes.append (process)
+
+        return processes + self._read_unseen_processes (boottime, processes)
+
+
+    def _read_unseen_processes (self, boottime, processes):
+        """
+        returns the list of processes currently alive, other than the given
+        ones, which belong to the process group of any of them (or the tracked
+        process group) or are descendants of them. Only those processes not
+        seen before in /proc are examined
+        """
+
+        pids = set (int (filename) for filename in os.listdir ("/proc")
+                    if filename.isdigit ())
+
+        # process ids that do not exist anymore could be reused later so that
+        # they are forgotten
+        self._untracked &= pids
+
+        # examine new processes until a fixpoint is reached, since they might
+        # be descendants of other new processes
+        candidates = [process for process in
+                      [Process (pid, boottime, self._cmdlines)
+                       for pid in pids - self._untracked - set (iprocess.pid for iprocess in processes)]
+                      if process.pid >= 0]
+        ppids = set (iprocess.pid for iprocess in processes)
+        pgrps = set (iprocess.pgrp for iprocess in processes) | set ([self._pgrp])
+        found = []
+        sentinel = True
+        while sentinel:
+
+            sentinel = False
+            for iprocess in [jprocess for jprocess in candidates
+                             if jprocess.pgrp in pgrps or jprocess.ppid in ppids]:
+                found.append (iprocess)
+                candidates.remove (iprocess)
+                ppids.add (iprocess.pid)
+                pgrps.add (iprocess.pgrp)
+                sentinel = True
+
+        # all remaining candidates do not belong to the tracked tree
+        self._untracked |= set (iprocess.pid for iprocess in candidates)
+
+        return found
+
+
+    def get_processes (self):
+        """
+        returns the list of processes currently alive which belong to the
+        tracked process group or are descendants of them
+        """
+
+        # the boot time is computed only once for all processes
+        boottime = read_boottime ()
+        if self._children:
+            processes = self._read_descendants (boottime)
+        else:
+            processes = self._read_new_processes (boottime)
+
+        # and record all processes found so far. Those that terminated are
+        # not tracked anymore
+        self._first = False
+        self._tracked = dict ((iprocess.pid, iprocess.sttime) for iprocess in processes)
+        self._pgrps = set (iprocess.pgrp for iprocess in processes) | set ([self._pgrp])
+        self._cmdlines = dict ((key, self._cmdlines [key]) for key in self._tracked.iteritems ()
+                               if key in self._cmdlines)
+
+        return processes
+
+
 # -----------------------------------------------------------------------------
 # ProcessGroup
 #
@@ -286,25 +652,28 @@ class ProcessGroup(object):
     processes.
     """
 
-    def __init__(self, pgrp):
+    def __init__(self, pgrp, tracker=None):
         """
         seeks and stores internally a list of all processes that match the given
         group id and all their children. Since it uses the :file:`/proc`
         filesystem, the systools are solely restricted to GNU/Linux OSs
 
+        If a tracker is given, the processes are retrieved from it instead of
+        examining all processes in :file:`/proc`
+
         :param pgrp: group id
         :type pgrp: int
+        :param tracker: tracker of the processes of the given group id
+        :type tracker: ProcessTracker
         """
 
-        # usually the jiffies per second should be 100. Check it, however!
-        self._jiffies_per_second = os.sysconf (os.sysconf_names['SC_CLK_TCK'])
-        if (self._jiffies_per_second != 100):
-            raise ValueError
-
         # initialize the list of processes with all the processes sharing this
         # process group id or children of them (even if they have a different
         # process group)
-        self.processes = read_processes (pgrp)
+        if tracker:
+            self.processes = tracker.get_processes ()
+        else:
+            self.processes = read_processes (pgrp)
 
 
     def __len__ (self):
@@ -428,6 +797,113 @@ class ProcessGroup(object):
         return sum ([p.numthreads for p in self.processes])
 
 
+# -----------------------------------------------------------------------------
+# ChildWatcher
+#
+# Waits for the termination of a child process in a separate thread so that
+# the caller can wait for either its termination or a timeout, whatever happens
+# first. The waiting thread notifies the termination of the child writing into
+# a pipe (the self-pipe trick) so that the caller wakes up immediately
+# -----------------------------------------------------------------------------
+class ChildWatcher(object):
+    """
+    Waits for the termination of a child process in a separate thread so that
+    the caller can wait for either its termination or a timeout, whatever
+    happens first. The waiting thread notifies the termination of the child
+    writing into a pipe (the self-pipe trick) so that the caller wakes up
+    immediately
+    """
+
+    def __init__(self, pid):
+        """
+        starts waiting for the termination of the child process identified by
+        the given pid. Note that the child is reaped by this instance so that
+        nobody else should wait for it
+
+        :param pid: process identifier (PID) of a child of this process
+        :type pid: int
+        """
+
+        self._pid = pid
+        self._status = None
+        self._rusage = None
+
+        # create the pipe used for notifying the termination of the child
+        (self._rfd, self._wfd) = os.pipe ()
+
+        # and start waiting for the child in a separate thread
+        self._thread = threading.Thread (target=self._wait_child)
+        self._thread.daemon = True
+        self._thread.start ()
+
+
+    def _wait_child (self):
+        """
+        waits for the termination of the child, records its exit status and
+        resource usage and notifies it through the pipe
+        """
+
+        while True:
+            try:
+                (pid, status, self._rusage) = os.wait4 (self._pid, 0)
+                break
+            except OSError as error:
+
+                # in case the call was interrupted just try again. Otherwise,
+                # the child does not exist anymore and its status is unknown
+                if error.errno != errno.EINTR:
+                    status = -1
+                    break
+
+        self._status = status
+        os.write (self._wfd, '\0')
+
+
+    def wait (self, timeout):
+        """
+        waits for the termination of the child for no more than the given
+        timeout (in seconds). It returns the exit status of the child if it
+        terminated and None otherwise
+
+        :param timeout: maximum number of seconds to wait
+        :type timeout: float
+        """
+
+        # in case the termination of the child was already notified, return
+        # immediately
+        if self._status is None:
+            try:
+                select.select ([self._rfd], [], [], timeout)
+            except select.error as error:
+                if error.args[0] != errno.EINTR:
+                    raise
+
+        # since the status is recorded before notifying the termination, it
+        # is safe to return it now
+        return self._status
+
+
+    def get_rusage (self):
+        """
+        returns the resource usage of the child (as returned by os.wait4)
+        once it terminated. It includes the resources used by all its
+        descendants that were waited for. If the child did not terminate yet
+        or its resource usage is unknown, it returns None
+        """
+
+        return self._rusage
+
+
+    def close (self):
+        """
+        releases the resources used by this instance. It should be invoked
+        only once the child has terminated
+        """
+
+        os.close (self._rfd)
+        os.close (self._wfd)
+
+
 # -----------------------------------------------------------------------------
 # ProcessTimeline
 #
@@ -447,8 +923,17 @@ class ProcessTimeline(object):
         initializes the list of processes to null
         """
 
-        # initialize the list of processes
-        self.processes = []
+        # initialize the processes, indexed by their key (pid, start time), in
+        # the same order they were first seen and also the keys of those whose
+        # end time is not set yet
+        self.processes = OrderedDict ()
+        self._alive = set ()
+
+        # the statistics of all processes are accumulated as processes are
+        # updated
+        self._total_jiffies = 0
+        self._total_bytes = 0
+        self._total_threads = 0
 
 
     def __iadd__ (self, other):
@@ -462,25 +947,30 @@ class ProcessTimeline(object):
         # that the services of this class are invoked
         currtime = time.time ()
 
-        # for all processes currently in the timeline that are not in the other
-        # process group and whose end time is not set, specify their end time
-        oldprocs = filter (lambda x:x not in other.get_processes () and x.get_end_time () < 0,
-                           self.processes)
-        for iproc in oldprocs:
-            iproc.set_end_time (currtime)
-
-        # second, add to this timeline all processes in the other process group:
-        # those appearing in both places are inserted in this timeline in order
-        # to record the latest instance so that they are removed first in the
-        # next for loop
+        # add to this timeline all processes in the other process group: those
+        # already appearing here are replaced with their latest instance and
+        # those not appearing in this timeline enter this for the first time
+        alive = set ()
         for iproc in other.get_processes ():
-            if iproc in self.processes:
-                self.processes.remove (iproc)
 
-        # also, those not appearing in this timeline enter this for the first
-        # time;
-        self.processes += filter (lambda x:x not in self.processes,
-                                  other.get_processes ())
+            key = iproc.get_key ()
+            oldproc = self.processes.get (key)
+            if oldproc:
+                self._total_jiffies -= oldproc.total_time ()
+                self._total_bytes -= oldproc.vsize
+                self._total_threads -= oldproc.numthreads
+
+            self.processes [key] = iproc
+            self._total_jiffies += iproc.total_time ()
+            self._total_bytes += iproc.vsize
+            self._total_threads += iproc.numthreads
+            alive.add (key)
+
+        # for all processes currently in the timeline that are not in the other
+        # process group and whose end time is not set, specify their end time
+        for key in self._alive - alive:
+            self.processes [key].set_end_time (currtime)
+        self._alive = alive
 
         return self
 
@@ -531,9 +1021,11 @@ class ProcessTimeline(object):
 
         # and now set the end time of all process with unknown end time to the
         # current time
-        for iproc in [jproc for jproc in self.processes if jproc.get_end_time () < 0]:
+        for key in self._alive:
+            iproc = self.processes [key]
             _kill_ (iproc.pid)
             iproc.set_end_time (currtime)
+        self._alive = set ()
 
 
     def pids(self):
@@ -541,7 +1033,7 @@ class ProcessTimeline(object):
         returns the process identifier of all processes in this timeline
         """
 
-        return [p.pid for p in self.processes]
+        return [p.pid for p in self.processes.itervalues ()]
 
 
     def total_time(self):
@@ -549,8 +1041,7 @@ class ProcessTimeline(object):
         cumulated CPU time for all processes in this timeline
         """
 
-        total_jiffies = sum([p.total_time() for p in self.processes])
-        return total_jiffies / float(JIFFIES_PER_SECOND)
+        return self._total_jiffies / float(JIFFIES_PER_SECOND)
 
 
     def total_vsize(self):
@@ -558,8 +1049,7 @@ class ProcessTimeline(object):
         cumulated virtual memory for all processes in this timeline, in MB
         """
 
-        total_bytes = sum([p.vsize for p in self.processes])
-        return total_bytes / float(2 ** 20)
+        return self._total_bytes / float(2 ** 20)
 
 
     def total_processes (self):
@@ -575,7 +1065,7 @@ class ProcessTimeline(object):
         return the total number of threads in this timeline
         """
 
-        return sum ([p.numthreads for p in self.processes])
+        return self._total_threads
 
 
     def get_processes (self):
@@ -589,7 +1079,7 @@ class ProcessTimeline(object):
                  str (datetime.datetime.fromtimestamp (iproc.get_start_time ())),
                  str (datetime.datetime.fromtimestamp (iproc.get_end_time ())),
                  iproc.get_end_time () - iproc.get_start_time ()]
-                for iproc in self.processes]
+                for iproc in self.processes.itervalues ()]
 
 
 
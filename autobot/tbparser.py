@@ -112,7 +112,7 @@ class TBParser :
 
         # Build the lexer and parser
         self._lexer = lex.lex(module=self)
-        self._parser = yacc.yacc(module=self)
+        self._parser = yacc.yacc(module=self,write_tables=0,debug=0)
 
 
     # lex rules
@@ -93,6 +93,80 @@ class Timer(object):
         return self.__finish - self.__start
 
 
+# -----------------------------------------------------------------------------
+# Interval
+#
+# this class computes the interval (in seconds) between successive samples. It
+# can be either fixed or adaptive. Adaptive intervals start at a given floor
+# and grow geometrically up to a ceiling, unless the memory in use approaches
+# its limit. In this case, the interval is shortened so that the memory limit
+# is not exceeded between two samples
+# -----------------------------------------------------------------------------
+class Interval(object):
+
+    """
+    this class computes the interval (in seconds) between successive samples.
+    It can be either fixed or adaptive. Adaptive intervals start at a given
+    floor and grow geometrically up to a ceiling, unless the memory in use
+    approaches its limit. In this case, the interval is shortened so that the
+    memory limit is not exceeded between two samples
+    """
+
+    # factor used to grow adaptive intervals
+    # -----------------------------------------------------------------------------
+    backoff = 2
+
+    def __init__(self, ceiling, floor=None):
+        """
+        creates a new interval which is fixed to ceiling unless a floor is
+        given. In this case, the interval is adaptive and ranges between floor
+        and ceiling
+        """
+
+        (self._ceiling, self._floor) = (ceiling, floor)
+
+        # adaptive intervals start at the floor
+        self._interval = ceiling
+        if floor is not None:
+            self._interval = min (floor, ceiling)
+
+        # the memory in use at the last sample
+        self._memory = None
+
+
+    def get (self):
+        """
+        Return the current interval
+        """
+
+        return self._interval
+
+
+    def update (self, memory=None, limit=None):
+        """
+        Computes the next interval given the memory currently in use and its
+        limit (in the same units). If the memory grows so that it would exceed
+        its limit before the next sample, the interval is shortened to half the
+        time expected to reach it (but never below the floor)
+        """
+
+        # fixed intervals never change
+        if self._floor is None:
+            return self._interval
+
+        interval = min (self._ceiling, self._interval * Interval.backoff)
+
+        # estimate the time required to reach the memory limit
+        if memory is not None and limit and self._memory is not None:
+            growth = (memory - self._memory) / float (self._interval)
+            if growth > 0:
+                interval = min (interval, (limit - memory) / growth / 2)
+        self._memory = memory
+
+        self._interval = max (self._floor, interval)
+        return self._interval
+
+
 # Local Variables:
 # mode:python
 # fill-column:79
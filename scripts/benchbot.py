@@ -0,0 +1,201 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# benchbot.py
+# Description: measures the performance of the different ways in which
+#              testbot stores data in the databases
+# -----------------------------------------------------------------------------
+#
+# Started on  <Fri Oct 16 23:48:05 2026 Carlos Linares Lopez>
+# Last update <Fri Oct 16 23:48:05 2026 Carlos Linares Lopez (clinares)>
+# -----------------------------------------------------------------------------
+#
+# $Id::                                                                      $
+# $Date::                                                                    $
+# $Revision::                                                                $
+# -----------------------------------------------------------------------------
+#
+# Made by Carlos Linares Lopez
+# Login   <clinares@atlas>
+#
+
+# -----------------------------------------------------------------------------
+#     This file is part of testbot
+#
+#     testbot is free software: you can redistribute it and/or modify it under
+#     the terms of the GNU General Public License as published by the Free
+#     Software Foundation, either version 3 of the License, or (at your option)
+#     any later version.
+#
+#     testbot is distributed in the hope that it will be useful, but WITHOUT ANY
+#     WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+#     FOR A PARTICULAR PURPOSE.  See the GNU General Public License for more
+#     details.
+#
+#     You should have received a copy of the GNU General Public License along
+#     with testbot.  If not, see <http://www.gnu.org/licenses/>.
+#
+#     Copyright Carlos Linares Lopez, 2014
+
+"""
+measures the performance of the different ways in which testbot stores data
+in the databases
+"""
+
+# globals
+# -----------------------------------------------------------------------------
+__version__  = '1.0'
+__revision__ = '$Revision$'
+__date__     = '$Date$'
+
+
+# imports
+# -----------------------------------------------------------------------------
+import os                               # path handling
+import shutil                           # removing directories
+import sys                              # object sizes
+import tempfile                         # scratch directories
+import time                             # time management
+
+from autobot import parsetools          # default argument parser
+from autobot import sqltools            # sqlite3 database access
+
+from autobot.dbparser import DBColumn, DBTable
+
+
+# -----------------------------------------------------------------------------
+# profiles
+#
+# writes the given number of runs, each with the given number of rows, into a
+# new database in directory with every storage profile and shows the rows
+# written per second
+# -----------------------------------------------------------------------------
+def profiles (directory, runs, rows):
+    """
+    writes the given number of runs, each with the given number of rows, into
+    a new database in directory with every storage profile and shows the rows
+    written per second
+    """
+
+    table = DBTable ('sys_bench',
+                     [DBColumn ('id', 'integer', 'SYSVAR', 'index', 'None'),
+                      DBColumn ('cputime', 'real', 'SYSVAR', 'cputime', 'None'),
+                      DBColumn ('vsize', 'integer', 'SYSVAR', 'vsize', 'None'),
+                      DBColumn ('name', 'text', 'SYSVAR', 'name', 'None')])
+
+    for iprofile in sorted (sqltools.profiles):
+
+        dbhandler = sqltools.dbaccess (os.path.join (directory, iprofile + '.db'),
+                                       iprofile)
+        dbhandler.create_table (table)
+
+        start = time.time ()
+        for irun in xrange (runs):
+            dbhandler.insert_data (table,
+                                   [(irun, 0.1 * irow, 1024 * irow, 'solver')
+                                    for irow in xrange (rows)])
+            dbhandler.commit ()
+        dbhandler.optimize ()
+        dbhandler.close ()
+
+        print " Throughput: %.0f rows/s (%s)" % (runs * rows / (time.time () - start),
+                                                 iprofile)
+
+
+# -----------------------------------------------------------------------------
+# memory
+#
+# stores the given number of samples in a list of tuples and in a buffer and
+# shows the memory taken by the numeric values of every sample in both cases
+# -----------------------------------------------------------------------------
+def memory (samples):
+    """
+    stores the given number of samples in a list of tuples and in a buffer and
+    shows the memory taken by the numeric values of every sample in both cases
+    """
+
+    table = DBTable ('sys_buffer',
+                     [DBColumn ('id', 'integer', 'SYSVAR', 'index', 'None'),
+                      DBColumn ('cputime', 'real', 'SYSVAR', 'cputime', 'None'),
+                      DBColumn ('vsize', 'integer', 'SYSVAR', 'vsize', 'None'),
+                      DBColumn ('name', 'text', 'SYSVAR', 'name', 'None')])
+
+    rows = [(index, index / 7.0, 1024 * index, 'solver')
+            for index in xrange (samples)]
+    values = sqltools.dbbuffer (table)
+    values += rows
+
+    # only numeric columns are compared, since strings are stored in the same
+    # way
+    legacy = sum (sys.getsizeof (irow) + sum (sys.getsizeof (ivalue) for ivalue in irow [:3])
+                  for irow in rows)
+    current = sum (sys.getsizeof (icolumn) for icolumn in values.get_columns () [:3])
+
+    print " Memory per sample: %.2f bytes (tuples) / %.2f bytes (buffer)" % (float (legacy) / samples,
+                                                                            float (current) / samples)
+
+
+# -----------------------------------------------------------------------------
+# packed
+#
+# writes the given number of runs, each with the given number of samples, into
+# a new database in directory with a regular table and with a packed table for
+# every compression and shows the size of every database
+# -----------------------------------------------------------------------------
+def packed (directory, runs, samples):
+    """
+    writes the given number of runs, each with the given number of samples,
+    into a new database in directory with a regular table and with a packed
+    table for every compression and shows the size of every database
+    """
+
+    table = DBTable ('sys_packed',
+                     [DBColumn ('id', 'text', 'SYSVAR', 'index', 'None'),
+                      DBColumn ('cputime', 'real', 'SYSVAR', 'cputime', 'None'),
+                      DBColumn ('vsize', 'integer', 'SYSVAR', 'vsize', 'None')])
+
+    for icompression in [None] + sqltools.compressions:
+
+        dbname = os.path.join (directory, '%s.db' % icompression)
+        writer = sqltools.dbwriter (dbname)
+        if icompression:
+            writer.create_packed_table (table, icompression)
+        else:
+            writer.create_table (table)
+
+        for irun in xrange (runs):
+            values = sqltools.dbbuffer (table)
+            for isample in xrange (samples):
+                values.append (('%03d' % irun, 0.1 * isample, 1024 * (isample // 10)),
+                               irun + 0.1 * isample)
+            writer.insert_data (table, values)
+        writer.close ()
+
+        print " Size of the database: %i bytes (%s)" % (os.path.getsize (dbname),
+                                                        icompression or 'rows')
+
+
+# main
+# -----------------------------------------------------------------------------
+if __name__ == '__main__':
+
+    args = parsetools.BenchArgParser ().parse_args ()
+
+    # all databases are written in a scratch directory which is removed at the
+    # end
+    directory = tempfile.mkdtemp ()
+    try:
+        if 'profiles' in args.benchmark:
+            profiles (directory, args.runs, args.rows)
+        if 'memory' in args.benchmark:
+            memory (args.runs * args.rows)
+        if 'packed' in args.benchmark:
+            packed (directory, args.runs, args.rows)
+    finally:
+        shutil.rmtree (directory)
+
+
+# Local Variables:
+# mode:python
+# fill-column:80
+# End:
@@ -61,7 +61,10 @@ class CondorDescriptionFile(object):
                  output, check, directory, compress, 
                  jobname, nonice, notify, copyfiles,
                  transfer_input_files, transfer_output_files, submit,
-                 logfile, loglevel, quiet):
+                 logfile, loglevel, quiet,
+                 jobs=1, concurrent=False, cgroup=None, rlimits=False,
+                 filesize=None, adaptive=None, dbprofile='default',
+                 dboptimize=[], pack=None):
         """
         creates an instance of a new Condor Description File which is used to
         run testbot with the given parameters considering only a single solver
@@ -80,6 +83,14 @@ class CondorDescriptionFile(object):
          transfer_input_files, transfer_output_files, submit,
          logfile, loglevel, quiet)
 
+        # and also those parameters of testbot which are just passed by
+        (self._jobs, self._concurrent, self._cgroup, self._rlimits,
+         self._filesize, self._adaptive, self._dbprofile,
+         self._dboptimize, self._pack) = \
+        (jobs, concurrent, cgroup, rlimits,
+         filesize, adaptive, dbprofile,
+         dboptimize, pack)
+
         # make sure to process the logfile correctly in case it was given a
         # value
         if logfile:
@@ -390,6 +401,25 @@ class CondorDescriptionFile(object):
             spec += " --logfile '%s'" % self._logfile
         if self._quiet:
             spec += " --quiet"
+
+        # and, finally, those parameters that control how the test cases are
+        # run and how their results are stored
+        spec += " --jobs %i" % self._jobs
+        if self._concurrent:
+            spec += " --concurrent"
+        if self._adaptive is not None:
+            spec += " --adaptive %s" % self._adaptive
+        if self._cgroup:
+            spec += " --cgroup '%s'" % self._cgroup
+        if self._rlimits:
+            spec += " --rlimits"
+        if self._filesize is not None:
+            spec += " --file-size %i" % self._filesize
+        spec += " --db-profile %s" % self._dbprofile
+        if self._dboptimize:
+            spec += " --db-optimize %s" % ' '.join (self._dboptimize)
+        if self._pack:
+            spec += " --pack %s" % self._pack
         spec += '\n'
             
         # memory
@@ -546,7 +576,12 @@ if __name__ == '__main__':
                                            args.copy_files, args.transfer_input_files,
                                            args.transfer_output_files, args.submit,
                                            args.logfile, args.level,
-                                           args.quiet)
+                                           args.quiet,
+                                           args.jobs, args.concurrent,
+                                           args.cgroup, args.rlimits,
+                                           args.file_size, args.adaptive,
+                                           args.db_profile, args.db_optimize,
+                                           args.pack)
 
         # and generate the condor submission description file
         condordesc = condorfile.generate()
@@ -107,6 +107,7 @@ class ParseBot (BotParser):
                  compress=self.args.bz2,
                  argnamespace=self.args,
                  output=self.args.output,
+                 dbprofile=self.args.db_profile,
                  logger=self.logger,
                  logfilter=logutils.ContextFilter (),
                  prologue=Prologue,
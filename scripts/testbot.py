@@ -113,6 +113,15 @@ class TestBot (BotTester):
                  check=self.args.check,
                  directory=self.args.directory,
                  compress=self.args.bz2,
+                 jobs=self.args.jobs,
+                 concurrent=self.args.concurrent,
+                 cgroup=self.args.cgroup,
+                 rlimits=self.args.rlimits,
+                 filesize=self.args.file_size,
+                 adaptive=self.args.adaptive,
+                 dbprofile=self.args.db_profile,
+                 dboptimize=self.args.db_optimize,
+                 pack=self.args.pack,
                  logger=self.logger,
                  logfilter=logutils.ContextFilter (),
                  prologue=Prologue,
@@ -0,0 +1,111 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# unpackbot.py
+# Description: expands the packed tables of the databases generated by
+#              testbot
+# -----------------------------------------------------------------------------
+#
+# Started on  <Fri Oct 16 23:12:40 2026 Carlos Linares Lopez>
+# Last update <Fri Oct 16 23:12:40 2026 Carlos Linares Lopez (clinares)>
+# -----------------------------------------------------------------------------
+#
+# $Id::                                                                      $
+# $Date::                                                                    $
+# $Revision::                                                                $
+# -----------------------------------------------------------------------------
+#
+# Made by Carlos Linares Lopez
+# Login   <clinares@atlas>
+#
+
+# -----------------------------------------------------------------------------
+#     This file is part of testbot
+#
+#     testbot is free software: you can redistribute it and/or modify it under
+#     the terms of the GNU General Public License as published by the Free
+#     Software Foundation, either version 3 of the License, or (at your option)
+#     any later version.
+#
+#     testbot is distributed in the hope that it will be useful, but WITHOUT ANY
+#     WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+#     FOR A PARTICULAR PURPOSE.  See the GNU General Public License for more
+#     details.
+#
+#     You should have received a copy of the GNU General Public License along
+#     with testbot.  If not, see <http://www.gnu.org/licenses/>.
+#
+#     Copyright Carlos Linares Lopez, 2014
+
+"""
+expands the packed tables of the databases generated by testbot
+"""
+
+# globals
+# -----------------------------------------------------------------------------
+__version__  = '1.0'
+__revision__ = '$Revision$'
+__date__     = '$Date$'
+
+
+# imports
+# -----------------------------------------------------------------------------
+import sys                              # standard output
+
+from autobot import parsetools          # default argument parser
+from autobot import sqltools            # sqlite3 database access
+
+
+# -----------------------------------------------------------------------------
+# unpack
+#
+# expands all the given packed tables of the database dbname. If an output
+# database is given, they are written there. Otherwise, they are shown on the
+# standard output
+# -----------------------------------------------------------------------------
+def unpack (dbname, tables=None, output=None):
+    """
+    expands all the given packed tables of the database dbname. If an output
+    database is given, they are written there. Otherwise, they are shown on the
+    standard output
+    """
+
+    dbhandler = sqltools.dbaccess (dbname)
+    dboutput = sqltools.dbaccess (output) if output else None
+
+    for itable in (tables or dbhandler.get_packed ()):
+
+        if itable not in dbhandler.get_packed ():
+            raise ValueError (" The table '%s' is not packed" % itable)
+
+        # the columns of a packed table are preceded by the number of samples
+        # and their timestamps
+        dbhandler.execute ("PRAGMA table_info(%s);" % itable)
+        columns = [icolumn [1] for icolumn in dbhandler.fetchall ()] [2:] + ['timestamp']
+
+        if dboutput:
+            dboutput.execute ("CREATE TABLE %s (%s);" % (itable, ', '.join (columns)))
+            dboutput.executemany ("INSERT INTO %s VALUES (%s);" % (itable, ', '.join ('?' * len (columns))),
+                                  dbhandler.unpack_table (itable))
+        else:
+            for irow in dbhandler.unpack_table (itable):
+                sys.stdout.write ('|'.join ([repr (ivalue) if isinstance (ivalue, float) else unicode (ivalue)
+                                             for ivalue in irow]) + '\n')
+
+    if dboutput:
+        dboutput.close ()
+    dbhandler.close ()
+
+
+# main
+# -----------------------------------------------------------------------------
+if __name__ == '__main__':
+
+    args = parsetools.UnpackArgParser ().parse_args ()
+    unpack (args.db, args.table, args.output)
+
+
+# Local Variables:
+# mode:python
+# fill-column:80
+# End:
@@ -82,7 +82,8 @@ setup(name='testbot',
       description='automates the tests of (hopefully) any executable under Linux OSs',
       long_description=read ('README.md'),
       packages = ['autobot'],
-      scripts = ['scripts/testbot.py', 'scripts/parsebot.py', 'scripts/condorize.py'],
+      scripts = ['scripts/testbot.py', 'scripts/parsebot.py', 'scripts/condorize.py',
+                 'scripts/unpackbot.py'],
       requires = ['ply (>=3.4)'],
       provides = ['autobot', 'testbot', 'parsebot'],
       classifiers = [
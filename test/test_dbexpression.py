@@ -0,0 +1,125 @@
+#!/usr/bin/python2.7
+# -*- coding: utf-8 -*-
+#
+# test_dbexpression.py
+# Description: unittest of dbexpression
+# -----------------------------------------------------------------------------
+#
+# Started on  <Sat Oct 17 11:02:37 2026 Carlos Linares Lopez>
+# Last update <Sat Oct 17 11:02:37 2026 Carlos Linares Lopez (clinares)>
+# -----------------------------------------------------------------------------
+#
+# $Id::                                                                      $
+# $Date::                                                                    $
+# $Revision::                                                                $
+# -----------------------------------------------------------------------------
+#
+# Made by Carlos Linares Lopez
+# Login   <clinares@psyche>
+#
+
+# -----------------------------------------------------------------------------
+#     This file is part of testbot
+#
+#     testbot is free software: you can redistribute it and/or modify it under
+#     the terms of the GNU General Public License as published by the Free
+#     Software Foundation, either version 3 of the License, or (at your option)
+#     any later version.
+#
+#     testbot is distributed in the hope that it will be useful, but WITHOUT ANY
+#     WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+#     FOR A PARTICULAR PURPOSE.  See the GNU General Public License for more
+#     details.
+#
+#     You should have received a copy of the GNU General Public License along
+#     with testbot.  If not, see <http://www.gnu.org/licenses/>.
+#
+#     Copyright Carlos Linares Lopez, 2014
+# -----------------------------------------------------------------------------
+
+"""
+.. module:: test_dbexpression
+   :platform: Linux
+   :synopsis: unittest of dbexpression
+
+.. moduleautor:: Carlos Linares Lopez <carlos.linares@uc3m.es>
+"""
+
+from __future__ import with_statement
+
+__version__  = '1.0'
+__revision__ = '$Revision$'
+
+# imports
+# -----------------------------------------------------------------------------
+import os                       # remove
+import tempfile                 # temporary files
+import unittest                 # unit test facilities
+
+import dbexpression             # evaluation of database expressions ---unit to test
+
+# -----------------------------------------------------------------------------
+# TestSnippets
+#
+# test that the code of snippets is compiled only once
+# -----------------------------------------------------------------------------
+class TestSnippets(unittest.TestCase):
+
+    """
+    test that the code of snippets is compiled only once
+    """
+
+    def test_compile (self):
+        """
+        snippets are compiled only the first time unless their file changes
+        """
+
+        (fd, filename) = tempfile.mkstemp (suffix='.py')
+        os.write (fd, "result = 2 * value\n")
+        os.close (fd)
+
+        try:
+
+            (hits, misses) = dbexpression.get_snippet_stats ()
+
+            # the first time, the snippet is compiled and then it is reused
+            (code, hit) = dbexpression.compile_snippet (filename)
+            self.assertFalse (hit)
+            for i in xrange (10):
+                (icode, hit) = dbexpression.compile_snippet (filename)
+                self.assertTrue (hit)
+                self.assertIs (icode, code)
+            self.assertEqual (dbexpression.get_snippet_stats (), (hits + 10, misses + 1))
+
+            dglobals = {'value': 21}
+            eval (code, dglobals)
+            self.assertEqual (dglobals ['result'], 42)
+
+            # once it is modified, it is compiled again
+            with open (filename, 'w') as stream:
+                stream.write ("result = 3 * value + 0\n")
+            (code, hit) = dbexpression.compile_snippet (filename)
+            self.assertFalse (hit)
+
+            dglobals = {'value': 21}
+            eval (code, dglobals)
+            self.assertEqual (dglobals ['result'], 63)
+
+        finally:
+            os.remove (filename)
+
+
+# Main body
+# -----------------------------------------------------------------------------
+if __name__ == "__main__":
+
+    unittest.main (module='test_dbexpression',
+                   verbosity=2,
+                   failfast=True)
+
+
+
+# Local Variables:
+# mode:python
+# fill-column:80
+# End:
@@ -0,0 +1,267 @@
+#!/usr/bin/python2.7
+# -*- coding: utf-8 -*-
+#
+# test_dbparser.py
+# Description: unittest of dbparser
+# -----------------------------------------------------------------------------
+#
+# Started on  <Fri Oct 16 21:02:13 2026 Carlos Linares Lopez>
+# Last update <Fri Oct 16 21:02:13 2026 Carlos Linares Lopez (clinares)>
+# -----------------------------------------------------------------------------
+#
+# $Id::                                                                      $
+# $Date::                                                                    $
+# $Revision::                                                                $
+# -----------------------------------------------------------------------------
+#
+# Made by Carlos Linares Lopez
+# Login   <clinares@psyche>
+#
+
+# -----------------------------------------------------------------------------
+#     This file is part of testbot
+#
+#     testbot is free software: you can redistribute it and/or modify it under
+#     the terms of the GNU General Public License as published by the Free
+#     Software Foundation, either version 3 of the License, or (at your option)
+#     any later version.
+#
+#     testbot is distributed in the hope that it will be useful, but WITHOUT ANY
+#     WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+#     FOR A PARTICULAR PURPOSE.  See the GNU General Public License for more
+#     details.
+#
+#     You should have received a copy of the GNU General Public License along
+#     with testbot.  If not, see <http://www.gnu.org/licenses/>.
+#
+#     Copyright Carlos Linares Lopez, 2014
+# -----------------------------------------------------------------------------
+
+"""
+.. module:: test_dbparser
+   :platform: Linux
+   :synopsis: unittest of dbparser
+
+.. moduleautor:: Carlos Linares Lopez <carlos.linares@uc3m.es>
+"""
+
+from __future__ import with_statement
+
+__version__  = '1.0'
+__revision__ = '$Revision$'
+
+# imports
+# -----------------------------------------------------------------------------
+import logging                  # loggers
+import unittest                 # unit test facilities
+
+import dbtools                  # database specification files
+import logutils                 # logging filters
+import namespace                # single and multi key attributes
+
+# database specification used in all tests
+# -----------------------------------------------------------------------------
+SPEC = """
+regexp line "line a=(?P<val>\\d+)"
+sys_time {
+      id text sys.index Error;
+      cputime real sys.cputime Error;
+      vsize real sys.vsize Error;
+      procs integer sys.numprocs Error;
+      label text sys.label "<none>";
+      missing integer sys.missing None;
+      a integer sys.stdout/line.val Error;
+}
+"""
+
+# -----------------------------------------------------------------------------
+# TestPoll
+#
+# test that tables are polled correctly and compiled only once
+# -----------------------------------------------------------------------------
+class TestPoll(unittest.TestCase):
+
+    """
+    test that tables are polled correctly and compiled only once
+    """
+
+    def setUp (self):
+        """
+        create the specification and the namespaces used in all tests
+        """
+
+        self._dbspec = dbtools.DBVerbatim (SPEC)
+        self._table = self._dbspec.get_db ('sys_time')
+        self._logger = logging.getLogger (self.id ())
+        self._logfilter = logutils.ContextFilter ()
+        self._table.compile (self._dbspec, self._logger, self._logfilter)
+
+        (self._sys, self._data, self._param, self._regexp, self._snippet, self._user) = \
+            [namespace.Namespace () for i in range (6)]
+        self._sys.index = '000'
+        self._sys.cputime = 1.5
+        self._sys.vsize = 12
+        self._sys.numprocs = '2'
+        self._sys.label = 'tick'
+        self._sys.missing = None
+        self._sys.stdout = "line a=1\nline a=2\n"
+
+
+    def _poll (self):
+        """
+        polls the table with the namespaces of this test
+        """
+
+        return self._table.poll (dbspec=self._dbspec,
+                                 namespace=self._sys,
+                                 data=self._data,
+                                 param=self._param,
+                                 regexp=self._regexp,
+                                 snippet=self._snippet,
+                                 user=self._user,
+                                 logger=self._logger,
+                                 logfilter=self._logfilter)
+
+
+    def test_poll (self):
+        """
+        values are casted to the type of their columns, actions are executed
+        when they are not found and lists are replicated
+        """
+
+        self._sys.label = None
+        self.assertEqual (self._poll (), [('000', 1.5, 12.0, 2, '"<none>"', 0, 1),
+                                          ('000', 1.5, 12.0, 2, '"<none>"', 0, 2)])
+
+        self._sys.stdout = "line a=3\n"
+        self._sys.label = 'tick'
+        self.assertEqual (self._poll (), [('000', 1.5, 12.0, 2, 'tick', 0, 3)])
+
+
+    def test_matches (self):
+        """
+        only the matches of regexps applied to streams are cached, so that
+        the cache does not grow with values computed anew every time
+        """
+
+        dbspec = dbtools.DBVerbatim ("""
+regexp line "line a=(?P<val>\\d+)"
+regexp num "n=(?P<value>\\d+)"
+sys_matches {
+      a integer sys.stdout/line.val Error;
+      n integer sys.label/num.value Error;
+}
+""")
+        table = dbspec.get_db ('sys_matches')
+        table.compile (dbspec, self._logger, self._logfilter)
+
+        matches = dict ()
+        for itick in xrange (10):
+            self._sys.label = 'n=%d' % itick
+            rows = table.poll (dbspec=dbspec,
+                               namespace=self._sys,
+                               data=self._data,
+                               param=self._param,
+                               regexp=self._regexp,
+                               snippet=self._snippet,
+                               user=self._user,
+                               logger=self._logger,
+                               logfilter=self._logfilter,
+                               matches=matches)
+            self.assertEqual (rows, [(1, itick), (2, itick)])
+
+        self.assertEqual (matches.keys (), [('line', id (self._sys.stdout))])
+
+
+    def test_compile (self):
+        """
+        the plan computed when a table is compiled is reused every time it is
+        polled and tables which were not compiled can not be polled
+        """
+
+        plan = self._table.get_plan ()
+        for itick in xrange (10):
+            self._poll ()
+        self.assertIs (self._table.get_plan (), plan)
+
+        self._table = dbtools.DBVerbatim (SPEC).get_db ('sys_time')
+        self.assertIsNone (self._table.get_plan ())
+        self.assertRaises (ValueError, self._poll)
+
+
+    def test_filters (self):
+        """
+        the filter of the logger is attached only once, no matter how many
+        times the table is polled or compiled
+        """
+
+        for itick in xrange (10):
+            self._poll ()
+            self._table.compile (self._dbspec, self._logger, self._logfilter)
+
+        self.assertEqual (len (self._logger.getChild ("DBTable.poll").filters), 1)
+        self.assertEqual (len (self._logger.getChild ("DBTable.poll.DBExpression.dbexpression").filters), 1)
+
+
+# -----------------------------------------------------------------------------
+# TestQualifiers
+#
+# test that the words used to qualify tables can still be used as names
+# -----------------------------------------------------------------------------
+class TestQualifiers(unittest.TestCase):
+
+    """
+    test that the words used to qualify tables can still be used as names
+    """
+
+    def test_names (self):
+        """
+        'window', 'on' and 'change' can be used as the names of columns,
+        regexps and snippets
+        """
+
+        dbspec = dbtools.DBVerbatim ("""
+regexp window "window=(?P<on>\\d+)"
+snippet change return on eval <change.py
+data_t {
+      change integer _x;
+      window integer sys.stdout/window.on;
+      on integer change.on;
+}
+""")
+        self.assertEqual ([icolumn.get_identifier () for icolumn in dbspec.get_db ('data_t')],
+                          ['change', 'window', 'on'])
+
+
+    def test_qualifiers (self):
+        """
+        sys tables can still aggregate their samples over windows or record
+        them on change
+        """
+
+        dbspec = dbtools.DBVerbatim ("""
+sys_window window 2 {
+      window real max(sys.vsize) Error;
+}
+sys_change on change {
+      change real sys.vsize Error;
+}
+""")
+        self.assertEqual (dbspec.get_db ('sys_window').get_window (), 2)
+        self.assertTrue (dbspec.get_db ('sys_change').onchangep ())
+
+
+# Main body
+# -----------------------------------------------------------------------------
+if __name__ == "__main__":
+
+    unittest.main (module='test_dbparser',
+                   verbosity=2,
+                   failfast=True)
+
+
+
+# Local Variables:
+# mode:python
+# fill-column:80
+# End:
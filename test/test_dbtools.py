@@ -0,0 +1,216 @@
+#!/usr/bin/python2.7
+# -*- coding: utf-8 -*-
+#
+# test_dbtools.py
+# Description: unittest of dbtools
+# -----------------------------------------------------------------------------
+#
+# Started on  <Fri Oct 16 21:24:40 2026 Carlos Linares Lopez>
+# Last update <Fri Oct 16 21:24:40 2026 Carlos Linares Lopez (clinares)>
+# -----------------------------------------------------------------------------
+#
+# $Id::                                                                      $
+# $Date::                                                                    $
+# $Revision::                                                                $
+# -----------------------------------------------------------------------------
+#
+# Made by Carlos Linares Lopez
+# Login   <clinares@psyche>
+#
+
+# -----------------------------------------------------------------------------
+#     This file is part of testbot
+#
+#     testbot is free software: you can redistribute it and/or modify it under
+#     the terms of the GNU General Public License as published by the Free
+#     Software Foundation, either version 3 of the License, or (at your option)
+#     any later version.
+#
+#     testbot is distributed in the hope that it will be useful, but WITHOUT ANY
+#     WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+#     FOR A PARTICULAR PURPOSE.  See the GNU General Public License for more
+#     details.
+#
+#     You should have received a copy of the GNU General Public License along
+#     with testbot.  If not, see <http://www.gnu.org/licenses/>.
+#
+#     Copyright Carlos Linares Lopez, 2014
+# -----------------------------------------------------------------------------
+
+"""
+.. module:: test_dbtools
+   :platform: Linux
+   :synopsis: unittest of dbtools
+
+.. moduleautor:: Carlos Linares Lopez <carlos.linares@uc3m.es>
+"""
+
+from __future__ import with_statement
+
+__version__  = '1.0'
+__revision__ = '$Revision$'
+
+# imports
+# -----------------------------------------------------------------------------
+import os                       # files
+import re                       # regular expressions
+import tempfile                 # temporary files
+import unittest                 # unit test facilities
+
+import dbparser                 # database tables
+import dbtools                  # database specification files ---unit to test
+import streamtools              # memory-mapped files
+
+# database specification used in all tests
+# -----------------------------------------------------------------------------
+SPEC = """
+regexp figures "(?P<country>[A-Za-z]+)\\s+(?P<population>\\d+)"
+data_figures {
+      country text sys.stdout/figures.country Error;
+      population integer sys.stdout/figures.population Error;
+}
+"""
+
+# -----------------------------------------------------------------------------
+# TestRegexps
+#
+# test that regexps are compiled once and their matches are shared
+# -----------------------------------------------------------------------------
+class TestRegexps(unittest.TestCase):
+
+    """
+    test that regexps are compiled once and their matches are shared
+    """
+
+    def test_findall (self):
+        """
+        the same text is scanned only once by the same regexp and the values
+        are the same with and without cache
+        """
+
+        dbspec = dbtools.DBVerbatim (SPEC)
+        self.assertTrue (dbspec.isregexp ('figures'))
+        self.assertFalse (dbspec.isregexp ('data_figures'))
+
+        text = "Spain 46\nItaly 59\n"
+        matches = dict ()
+        countries = dbspec.findall ('figures', 'country', text, matches)
+        population = dbspec.findall ('figures', 'population', text, matches)
+        self.assertEqual (countries, ['Spain', 'Italy'])
+        self.assertEqual (population, ['46', '59'])
+        self.assertEqual (len (matches), 1)
+        self.assertIs (dbspec.findall ('figures', 'country', text, matches), countries)
+
+        # texts equal to others but with a different identity are scanned again
+        other = ''.join (["Spain 46\n", "Italy 59\n"])
+        self.assertEqual (dbspec.findall ('figures', 'country', other, matches), countries)
+        self.assertEqual (len (matches), 2)
+        self.assertEqual (dbspec.findall ('figures', 'population', text), population)
+
+
+    def test_scan (self):
+        """
+        the regexps used to scan a text are matched only once and their matches
+        are cached for later use
+        """
+
+        dbspec = dbtools.DBVerbatim (SPEC)
+        text = "Spain 46\nItaly 59\n"
+        matches = dict ()
+        (figures, default) = dbspec.scan (text, ['figures'], matches, [re.compile ("a")])
+        self.assertEqual (len (default), 2)
+        self.assertEqual (dbspec.findall ('figures', 'country', text, matches), ['Spain', 'Italy'])
+        self.assertIs (matches [('figures', id (text))][1], figures)
+
+
+    def test_mapped (self):
+        """
+        the values of the groups of the regexps used to scan memory-mapped
+        files are cached so that they are available once the file is closed
+        """
+
+        dbspec = dbtools.DBVerbatim (SPEC)
+        (fd, filename) = tempfile.mkstemp ()
+        os.write (fd, "Spain 46\nItaly 59\n")
+        os.close (fd)
+
+        try:
+            text = streamtools.MappedFile (filename)
+            matches = dict ()
+            dbspec.scan (text, ['figures'], matches)
+            text.close ()
+
+            self.assertEqual (dbspec.findall ('figures', 'country', text, matches), ['Spain', 'Italy'])
+            self.assertEqual (dbspec.findall ('figures', 'population', text, matches), ['46', '59'])
+        finally:
+            os.remove (filename)
+
+
+# -----------------------------------------------------------------------------
+# TestDependencies
+#
+# test that the variables used in a database specification are found
+# -----------------------------------------------------------------------------
+class TestDependencies(unittest.TestCase):
+
+    """
+    test that the variables used in a database specification are found
+    """
+
+    def test_dependencies (self):
+        """
+        all variables used in any table are found, including the heads of
+        regexps and the current stream for regexps without context
+        """
+
+        dbspec = dbtools.DBVerbatim (SPEC)
+        self.assertEqual (dbspec.get_dependencies (), set ([('SYS', 'stdout')]))
+        self.assertTrue (dbspec.depends ('SYS', 'stdout'))
+        self.assertFalse (dbspec.depends ('SYS', 'stderr'))
+        self.assertFalse (dbspec.depends ('DATA'))
+
+        dbspec = dbtools.DBVerbatim ("""
+regexp figures "(?P<country>[A-Za-z]+)\\s+(?P<population>\\d+)"
+sys_procs {
+      procs integer main.numprocs Error;
+}
+data_figures {
+      cost integer data.Cost Error;
+      country text figures.country Error;
+      population integer sys.stderr/figures.population Error;
+}
+""")
+        self.assertEqual (dbspec.get_dependencies (),
+                          set ([('SYS', 'numprocs'), ('DATA', 'Cost'),
+                                ('SYS', 'stdout'), ('SYS', 'stderr')]))
+        self.assertTrue (dbspec.depends ('MAIN', 'numprocs'))
+        self.assertTrue (dbspec.depends ('DATA'))
+        self.assertFalse (dbspec.depends ('SYS', 'numthreads'))
+
+        # the streams are used only to apply regexps to them
+        self.assertEqual (dbspec.get_dependencies (contexts=False),
+                          set ([('SYS', 'numprocs'), ('DATA', 'Cost')]))
+        self.assertFalse (dbspec.depends ('SYS', 'stderr', contexts=False))
+
+        # tables added later are considered as well
+        dbspec += dbparser.DBTable ('sys_threads',
+                                    [dbparser.DBColumn ('threads', 'integer', dbparser.SYSNST,
+                                                        'numthreads', 'None')])
+        self.assertTrue (dbspec.depends ('SYS', 'numthreads'))
+        self.assertTrue (dbspec.depends ('SYS', 'numthreads', contexts=False))
+
+
+# Main body
+# -----------------------------------------------------------------------------
+if __name__ == "__main__":
+
+    unittest.main (module='test_dbtools',
+                   verbosity=2,
+                   failfast=True)
+
+
+
+# Local Variables:
+# mode:python
+# fill-column:80
+# End:
@@ -0,0 +1,486 @@
+#!/usr/bin/python2.7
+# -*- coding: utf-8 -*-
+#
+# test_sqltools.py
+# Description: unittest of sqltools
+# -----------------------------------------------------------------------------
+#
+# Started on  <Fri Oct 16 09:41:27 2026 Carlos Linares Lopez>
+# Last update <Fri Oct 16 09:41:27 2026 Carlos Linares Lopez (clinares)>
+# -----------------------------------------------------------------------------
+#
+# $Id::                                                                      $
+# $Date::                                                                    $
+# $Revision::                                                                $
+# -----------------------------------------------------------------------------
+#
+# Made by Carlos Linares Lopez
+# Login   <clinares@psyche>
+#
+
+# -----------------------------------------------------------------------------
+#     This file is part of testbot
+#
+#     testbot is free software: you can redistribute it and/or modify it under
+#     the terms of the GNU General Public License as published by the Free
+#     Software Foundation, either version 3 of the License, or (at your option)
+#     any later version.
+#
+#     testbot is distributed in the hope that it will be useful, but WITHOUT ANY
+#     WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+#     FOR A PARTICULAR PURPOSE.  See the GNU General Public License for more
+#     details.
+#
+#     You should have received a copy of the GNU General Public License along
+#     with testbot.  If not, see <http://www.gnu.org/licenses/>.
+#
+#     Copyright Carlos Linares Lopez, 2014
+# -----------------------------------------------------------------------------
+
+"""
+.. module:: test_sqltools
+   :platform: Linux
+   :synopsis: unittest of sqltools
+
+.. moduleautor:: Carlos Linares Lopez <carlos.linares@uc3m.es>
+"""
+
+from __future__ import with_statement
+
+__version__  = '1.0'
+__revision__ = '$Revision$'
+
+# imports
+# -----------------------------------------------------------------------------
+import array                    # efficient arrays of numeric values
+import os                       # path handling
+import shutil                   # removing directories
+import sqltools                 # sqlite3 database access ---unit to test
+import sqlite3                  # sql lite dbs
+import sys                      # object sizes
+import tempfile                 # scratch directories
+import threading                # threads
+import unittest                 # unit test facilities
+
+from dbparser import DBColumn, DBTable
+
+# -----------------------------------------------------------------------------
+# TestStorageProfiles
+#
+# test that the storage profiles are applied when connecting to a database and
+# that the data written is the same with all of them
+# -----------------------------------------------------------------------------
+class TestStorageProfiles(unittest.TestCase):
+
+    """
+    test that the storage profiles are applied when connecting to a database
+    and that the data written is the same with all of them
+    """
+
+    # number of test cases written to the database and number of rows
+    # inserted for every test case
+    runs = 20
+    rows = 50
+
+    def setUp (self):
+        """
+        creates a scratch directory for the databases and a table with a few
+        columns
+        """
+
+        self.directory = tempfile.mkdtemp ()
+        self.table = DBTable ('sys_bench',
+                              [DBColumn ('id', 'integer', 'SYSVAR', 'index', 'None'),
+                               DBColumn ('cputime', 'real', 'SYSVAR', 'cputime', 'None'),
+                               DBColumn ('vsize', 'integer', 'SYSVAR', 'vsize', 'None'),
+                               DBColumn ('name', 'text', 'SYSVAR', 'name', 'None')])
+
+
+    def tearDown (self):
+        """
+        removes the scratch directory
+        """
+
+        shutil.rmtree (self.directory)
+
+
+    def _write (self, profile):
+        """
+        writes all test cases into a new database with the given profile and
+        returns its contents
+        """
+
+        dbhandler = sqltools.dbaccess (os.path.join (self.directory, profile + '.db'),
+                                       profile)
+        dbhandler.create_table (self.table)
+
+        for irun in xrange (TestStorageProfiles.runs):
+            dbhandler.insert_data (self.table,
+                                   [(irun, 0.1 * irow, 1024 * irow, 'solver')
+                                    for irow in xrange (TestStorageProfiles.rows)])
+            dbhandler.commit ()
+        dbhandler.optimize ()
+        dbhandler.execute ("SELECT * FROM sys_bench;")
+        contents = dbhandler.fetchall ()
+        dbhandler.close ()
+
+        return contents
+
+
+    def test_pragmas (self):
+        """
+        the pragmas of the fast profile are applied and the write-ahead log is
+        removed once the database is closed
+        """
+
+        dbname = os.path.join (self.directory, 'fast.db')
+        dbhandler = sqltools.dbaccess (dbname, 'fast')
+        dbhandler.execute ("PRAGMA journal_mode;")
+        self.assertEqual (dbhandler.fetchone () [0], 'wal')
+        dbhandler.execute ("PRAGMA synchronous;")
+        self.assertEqual (dbhandler.fetchone () [0], 1)     # NORMAL
+        dbhandler.create_table (self.table)
+        dbhandler.optimize (vacuum=True, analyze=True)
+        dbhandler.close ()
+
+        self.assertFalse (os.access (dbname + '-wal', os.F_OK),
+                          "The write-ahead log was not removed")
+
+
+    def test_unknown (self):
+        """
+        unknown profiles are rejected
+        """
+
+        with self.assertRaises (ValueError):
+            sqltools.dbaccess (os.path.join (self.directory, 'unknown.db'), 'unknown')
+
+
+    def test_contents (self):
+        """
+        all profiles write the same data. Their throughput is measured with
+        scripts/benchbot.py instead
+        """
+
+        contents = dict ((profile, self._write (profile)) for profile in sqltools.profiles)
+        self.assertEqual (len (contents ['default']),
+                          TestStorageProfiles.runs * TestStorageProfiles.rows)
+        for profile in contents:
+            self.assertEqual (contents [profile], contents ['default'],
+                              "The profile '%s' does not write the same data" % profile)
+
+
+# -----------------------------------------------------------------------------
+# TestBuffer
+#
+# test that rows stored column by column are written as given and that they
+# take several times less memory than lists of tuples
+# -----------------------------------------------------------------------------
+class TestBuffer(unittest.TestCase):
+
+    """
+    test that rows stored column by column are written as given and that they
+    take several times less memory than lists of tuples
+    """
+
+    # number of samples stored in the buffers
+    samples = 10000
+
+    def setUp (self):
+        """
+        creates a table with columns of every type
+        """
+
+        self.table = DBTable ('sys_buffer',
+                              [DBColumn ('id', 'integer', 'SYSVAR', 'index', 'None'),
+                               DBColumn ('cputime', 'real', 'SYSVAR', 'cputime', 'None'),
+                               DBColumn ('vsize', 'integer', 'SYSVAR', 'vsize', 'None'),
+                               DBColumn ('name', 'text', 'SYSVAR', 'name', 'None')])
+
+
+    def test_insert (self):
+        """
+        rows are written as given, even if some values can not be stored in
+        arrays
+        """
+
+        rows = [(1, 0.5, 1024, 'solver'),
+                (2, 1, None, 'solver'),
+                (3, 1.5, 4096, None)]
+        samples = sqltools.dbbuffer (self.table)
+        samples += rows
+
+        self.assertEqual (len (samples), 3)
+        self.assertEqual (list (samples), rows)
+
+        dbhandler = sqltools.dbaccess (':memory:')
+        dbhandler.create_table (self.table)
+        dbhandler.insert_data (self.table, samples)
+        dbhandler.execute ("SELECT * FROM sys_buffer;")
+        self.assertEqual (dbhandler.fetchall (), rows)
+        dbhandler.close ()
+
+
+    def test_memory (self):
+        """
+        numeric values take several times less memory than in lists of tuples
+        """
+
+        rows = [(index, index / 7.0, 1024 * index, 'solver')
+                for index in xrange (TestBuffer.samples)]
+        samples = sqltools.dbbuffer (self.table)
+        samples += rows
+
+        # only numeric columns are compared, since strings are stored in the
+        # same way
+        legacy = sum (sys.getsizeof (irow) + sum (sys.getsizeof (ivalue) for ivalue in irow [:3])
+                      for irow in rows)
+        current = sum (sys.getsizeof (icolumn) for icolumn in samples.get_columns () [:3])
+
+        self.assertLess (5 * current, legacy,
+                         "The buffer does not save enough memory")
+
+
+# -----------------------------------------------------------------------------
+# TestPacked
+#
+# test that series of samples stored in packed tables are expanded back to the
+# same rows and that they take much less space than regular tables if they are
+# compressed
+# -----------------------------------------------------------------------------
+class TestPacked(unittest.TestCase):
+
+    """
+    test that series of samples stored in packed tables are expanded back to
+    the same rows and that they take much less space than regular tables if
+    they are compressed
+    """
+
+    # number of runs written to the database and samples per run
+    runs = 20
+    samples = 1000
+
+    def setUp (self):
+        """
+        creates a scratch directory for the databases and a table with columns
+        of every type
+        """
+
+        self.directory = tempfile.mkdtemp ()
+        self.table = DBTable ('sys_packed',
+                              [DBColumn ('id', 'text', 'SYSVAR', 'index', 'None'),
+                               DBColumn ('cputime', 'real', 'SYSVAR', 'cputime', 'None'),
+                               DBColumn ('vsize', 'integer', 'SYSVAR', 'vsize', 'None')])
+
+
+    def tearDown (self):
+        """
+        removes the scratch directory
+        """
+
+        shutil.rmtree (self.directory)
+
+
+    def test_pack (self):
+        """
+        values are unpacked as they were packed with any compression
+        """
+
+        for compression in sqltools.compressions:
+            for values in [array.array ('l', [0, -1, 2 ** 40]),
+                           array.array ('d', [0.5, float ('inf')]),
+                           ['000', None, 3]]:
+                self.assertEqual (sqltools.unpack (sqltools.pack (values, compression)),
+                                  values)
+
+
+    def _write (self, compression):
+        """
+        writes all runs into a new database, packed with the given compression
+        (or in a regular table if None) and returns its size and the rows
+        written along with their timestamps
+        """
+
+        dbname = os.path.join (self.directory, '%s.db' % compression)
+        writer = sqltools.dbwriter (dbname)
+        if compression:
+            writer.create_packed_table (self.table, compression)
+        else:
+            writer.create_table (self.table)
+
+        rows = []
+        for irun in xrange (TestPacked.runs):
+            samples = sqltools.dbbuffer (self.table)
+            for isample in xrange (TestPacked.samples):
+                row = ('%03d' % irun, 0.1 * isample, 1024 * (isample // 10))
+                samples.append (row, irun + 0.1 * isample)
+                rows.append (row + (irun + 0.1 * isample,))
+            writer.insert_data (self.table, samples)
+        writer.close ()
+
+        return (os.path.getsize (dbname), rows)
+
+
+    def test_unpack (self):
+        """
+        rows of packed tables are expanded back to the same rows and, if they
+        are compressed, their size is much smaller than the size of a regular
+        table
+        """
+
+        (size, rows) = self._write (None)
+        for compression in sqltools.compressions:
+            (packed, expected) = self._write (compression)
+
+            dbhandler = sqltools.dbaccess (os.path.join (self.directory, '%s.db' % compression))
+            self.assertEqual (dbhandler.get_packed (), ['sys_packed'])
+            self.assertEqual (list (dbhandler.unpack_table ('sys_packed')), expected)
+            dbhandler.close ()
+
+        # only compressed tables are expected to be smaller, since sqlite3
+        # stores small integers and short strings with less bytes than arrays
+        self.assertLess (10 * packed, size,
+                         "Compressed tables are not small enough")
+
+
+# -----------------------------------------------------------------------------
+# TestWriter
+#
+# test that all data submitted to a writer is written to the database, even
+# from different threads, and that errors are raised in the caller
+# -----------------------------------------------------------------------------
+class TestWriter(unittest.TestCase):
+
+    """
+    test that all data submitted to a writer is written to the database, even
+    from different threads, and that errors are raised in the caller
+    """
+
+    def setUp (self):
+        """
+        creates a scratch directory for the databases and a table with a
+        couple of columns
+        """
+
+        self.directory = tempfile.mkdtemp ()
+        self.dbname = os.path.join (self.directory, 'writer.db')
+        self.table = DBTable ('sys_writer',
+                              [DBColumn ('id', 'integer', 'SYSVAR', 'index', 'None'),
+                               DBColumn ('value', 'integer', 'SYSVAR', 'vsize', 'None')])
+
+
+    def tearDown (self):
+        """
+        removes the scratch directory
+        """
+
+        shutil.rmtree (self.directory)
+
+
+    def test_threads (self):
+        """
+        rows submitted by several threads through a small queue are all written
+        """
+
+        writer = sqltools.dbwriter (self.dbname, queue_size=2)
+        writer.create_table (self.table)
+
+        def _produce (ithread):
+            for irow in xrange (100):
+                writer.insert_data (self.table, [(ithread, irow)])
+
+        threads = [threading.Thread (target=_produce, args=(ithread,))
+                   for ithread in xrange (4)]
+        for ithread in threads:
+            ithread.start ()
+        for ithread in threads:
+            ithread.join ()
+        writer.close ()
+
+        dbhandler = sqltools.sqldb (self.dbname)
+        dbhandler.execute ("SELECT id, COUNT(*), SUM(value) FROM sys_writer GROUP BY id;")
+        self.assertEqual (dbhandler.fetchall (),
+                          [(ithread, 100, 4950) for ithread in xrange (4)])
+        dbhandler.close ()
+
+
+    def test_error (self):
+        """
+        errors are raised when closing the writer and data written before is
+        committed
+        """
+
+        writer = sqltools.dbwriter (self.dbname)
+        writer.create_table (self.table)
+        writer.insert_data (self.table, [(0, 0)])
+        writer.create_table (self.table)
+        writer.insert_data (self.table, [(1, 1)])
+        with self.assertRaises (sqlite3.OperationalError):
+            writer.close ()
+
+        dbhandler = sqltools.sqldb (self.dbname)
+        dbhandler.execute ("SELECT * FROM sys_writer;")
+        self.assertEqual (dbhandler.fetchall (), [(0, 0)])
+        dbhandler.close ()
+
+
+    def test_merge (self):
+        """
+        rows written simultaneously in different databases are appended in
+        the order the databases are merged, both in regular and packed tables,
+        and the merged databases are removed
+        """
+
+        for compression in [None] + sqltools.compressions:
+
+            dbnames = [os.path.join (self.directory, 'case-%i.db' % index)
+                       for index in xrange (2)]
+            writers = [sqltools.dbwriter (idbname) for idbname in dbnames]
+            writers.append (sqltools.dbwriter (self.dbname))
+            for iwriter in writers:
+                if compression:
+                    iwriter.create_packed_table (self.table, compression)
+                else:
+                    iwriter.create_table (self.table)
+
+            for irow in xrange (3):
+                for index in xrange (2):
+                    samples = sqltools.dbbuffer (self.table)
+                    samples.append ((index, irow), irow)
+                    writers [index].insert_data (self.table, samples)
+            for iwriter in writers [:2]:
+                iwriter.close ()
+
+            for idbname in dbnames:
+                writers [2].merge (idbname, [self.table], remove=True)
+            writers [2].close ()
+
+            self.assertFalse ([idbname for idbname in dbnames if os.access (idbname, os.F_OK)],
+                              "The merged databases were not removed")
+
+            dbhandler = sqltools.dbaccess (self.dbname)
+            if compression:
+                rows = [irow [:2] for irow in dbhandler.unpack_table ('sys_writer')]
+            else:
+                dbhandler.execute ("SELECT * FROM sys_writer;")
+                rows = dbhandler.fetchall ()
+            self.assertEqual (rows,
+                              [(index, irow) for index in xrange (2) for irow in xrange (3)])
+            dbhandler.close ()
+            os.remove (self.dbname)
+
+
+# Main body
+# -----------------------------------------------------------------------------
+if __name__ == "__main__":
+
+    unittest.main (module='test_sqltools',
+                   verbosity=2,
+                   failfast=True)
+
+
+
+# Local Variables:
+# mode:python
+# fill-column:80
+# End:
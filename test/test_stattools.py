@@ -0,0 +1,234 @@
+#!/usr/bin/python2.7
+# -*- coding: utf-8 -*-
+#
+# test_stattools.py
+# Description: unittest of stattools
+# -----------------------------------------------------------------------------
+#
+# Started on  <Fri Oct 16 23:58:02 2026 Carlos Linares Lopez>
+# Last update <Fri Oct 16 23:58:02 2026 Carlos Linares Lopez (clinares)>
+# -----------------------------------------------------------------------------
+#
+# $Id::                                                                      $
+# $Date::                                                                    $
+# $Revision::                                                                $
+# -----------------------------------------------------------------------------
+#
+# Made by Carlos Linares Lopez
+# Login   <clinares@psyche>
+#
+
+# -----------------------------------------------------------------------------
+#     This file is part of testbot
+#
+#     testbot is free software: you can redistribute it and/or modify it under
+#     the terms of the GNU General Public License as published by the Free
+#     Software Foundation, either version 3 of the License, or (at your option)
+#     any later version.
+#
+#     testbot is distributed in the hope that it will be useful, but WITHOUT ANY
+#     WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+#     FOR A PARTICULAR PURPOSE.  See the GNU General Public License for more
+#     details.
+#
+#     You should have received a copy of the GNU General Public License along
+#     with testbot.  If not, see <http://www.gnu.org/licenses/>.
+#
+#     Copyright Carlos Linares Lopez, 2014
+# -----------------------------------------------------------------------------
+
+"""
+.. module:: test_stattools
+   :platform: Linux
+   :synopsis: unittest of stattools
+
+.. moduleautor:: Carlos Linares Lopez <carlos.linares@uc3m.es>
+"""
+
+from __future__ import with_statement
+
+__version__  = '1.0'
+__revision__ = '$Revision$'
+
+# imports
+# -----------------------------------------------------------------------------
+import random                   # random numbers
+import stattools                # online statistics ---unit to test
+import unittest                 # unit test facilities
+
+# -----------------------------------------------------------------------------
+# TestAggregates
+#
+# test that aggregate functions computed online are equal to those computed
+# over the whole series of samples
+# -----------------------------------------------------------------------------
+class TestAggregates(unittest.TestCase):
+
+    """
+    test that aggregate functions computed online are equal to those computed
+    over the whole series of samples
+    """
+
+    def test_aggregates (self):
+        """
+        all aggregate functions return the expected values and they are
+        restarted after a reset
+        """
+
+        samples = [random.uniform (-100, 100) for i in xrange (1000)]
+        expected = {'min'  : min (samples),
+                    'max'  : max (samples),
+                    'sum'  : sum (samples),
+                    'mean' : sum (samples) / len (samples),
+                    'first': samples [0],
+                    'last' : samples [-1],
+                    'count': len (samples)}
+
+        for (name, (aggregate, types)) in stattools.aggregates.items ():
+            iaggregate = aggregate ()
+            for isample in samples:
+                iaggregate.update (isample)
+            self.assertAlmostEqual (iaggregate.get (), expected [name], places=6)
+
+            iaggregate.reset ()
+            iaggregate.update (1)
+            self.assertEqual (iaggregate.get (), 1)
+
+
+    def test_weighted_mean (self):
+        """
+        samples are weighted in the mean
+        """
+
+        mean = stattools.Mean ()
+        for (value, weight) in [(1, 0.5), (4, 1.5), (10, 0), (2, 2)]:
+            mean.update (value, weight)
+        self.assertAlmostEqual (mean.get (), (0.5 + 6 + 4) / 4)
+
+
+# -----------------------------------------------------------------------------
+# TestSummary
+#
+# test that summary statistics are computed online in constant memory
+# -----------------------------------------------------------------------------
+class TestSummary(unittest.TestCase):
+
+    """
+    test that summary statistics are computed online in constant memory
+    """
+
+    def test_quantile (self):
+        """
+        quantiles are computed exactly with a few samples and estimated
+        accurately with many samples
+        """
+
+        quantile = stattools.Quantile (0.5)
+        for isample in [3, 1, 2]:
+            quantile.update (isample)
+        self.assertEqual (quantile.get (), 2)
+
+        samples = [random.uniform (0, 1000) for i in xrange (20000)]
+        for ip in [0.5, 0.95, 0.99]:
+            quantile = stattools.Quantile (ip)
+            for isample in samples:
+                quantile.update (isample)
+            self.assertEqual (len (quantile._heights), 5)
+            self.assertAlmostEqual (quantile.get (), sorted (samples) [int (ip * len (samples))],
+                                    delta=10)
+
+        self.assertRaises (ValueError, stattools.Quantile, 1)
+
+
+    def test_summary (self):
+        """
+        all summary statistics are available once a sample is given
+        """
+
+        summary = stattools.Summary ()
+        self.assertEqual (summary.get (), {})
+
+        for isample in xrange (1, 101):
+            summary.update (isample)
+        result = summary.get ()
+        self.assertEqual (sorted (result.keys ()), ['mean', 'p50', 'p95', 'p99', 'peak'])
+        self.assertEqual (result ['peak'], 100)
+        self.assertAlmostEqual (result ['mean'], 50.5)
+        self.assertAlmostEqual (result ['p95'], 95, delta=1)
+
+
+# -----------------------------------------------------------------------------
+# TestWindow
+#
+# test that rows are aggregated over consecutive windows of time
+# -----------------------------------------------------------------------------
+class TestWindow(unittest.TestCase):
+
+    """
+    test that rows are aggregated over consecutive windows of time
+    """
+
+    def test_window (self):
+        """
+        a row is returned only when a window is over and the last one is
+        returned when flushing
+        """
+
+        window = stattools.Window (1, [None, 'max', 'mean', 'count'])
+
+        rows = []
+        for itick in xrange (25):
+            rows += window.update ([('000', itick, float (itick), itick)], 0.1 * itick)
+        rows += window.flush ()
+
+        self.assertEqual (rows, [('000', 9, 4.5, 10),
+                                 ('000', 19, 14.5, 10),
+                                 ('000', 24, 22.0, 5)])
+        self.assertEqual (window.flush (), [])
+
+
+# -----------------------------------------------------------------------------
+# TestChange
+#
+# test that rows are recorded only when they change
+# -----------------------------------------------------------------------------
+class TestChange(unittest.TestCase):
+
+    """
+    test that rows are recorded only when they change
+    """
+
+    def test_change (self):
+        """
+        a row is returned only when a column without aggregate function
+        changes, along with its duration, and the last one is returned when
+        flushing
+        """
+
+        change = stattools.Change ([None, None, 'max'])
+
+        rows = []
+        for itick in xrange (25):
+            rows += change.update ([('000', itick // 10, itick)], 0.5 * itick)
+        rows += change.flush (13.0)
+
+        self.assertEqual (rows, [('000', 0, 9, 5.0),
+                                 ('000', 1, 19, 5.0),
+                                 ('000', 2, 24, 3.0)])
+        self.assertEqual (change.flush (), [])
+
+
+# Main body
+# -----------------------------------------------------------------------------
+if __name__ == "__main__":
+
+    unittest.main (module='test_stattools',
+                   verbosity=2,
+                   failfast=True)
+
+
+
+# Local Variables:
+# mode:python
+# fill-column:80
+# End:
@@ -0,0 +1,133 @@
+#!/usr/bin/python2.7
+# -*- coding: utf-8 -*-
+#
+# test_streamtools.py
+# Description: unittest of streamtools
+# -----------------------------------------------------------------------------
+#
+# Started on  <Sat Oct 17 09:48:20 2026 Carlos Linares Lopez>
+# Last update <Sat Oct 17 09:48:20 2026 Carlos Linares Lopez (clinares)>
+# -----------------------------------------------------------------------------
+#
+# $Id::                                                                      $
+# $Date::                                                                    $
+# $Revision::                                                                $
+# -----------------------------------------------------------------------------
+#
+# Made by Carlos Linares Lopez
+# Login   <clinares@psyche>
+#
+
+# -----------------------------------------------------------------------------
+#     This file is part of testbot
+#
+#     testbot is free software: you can redistribute it and/or modify it under
+#     the terms of the GNU General Public License as published by the Free
+#     Software Foundation, either version 3 of the License, or (at your option)
+#     any later version.
+#
+#     testbot is distributed in the hope that it will be useful, but WITHOUT ANY
+#     WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+#     FOR A PARTICULAR PURPOSE.  See the GNU General Public License for more
+#     details.
+#
+#     You should have received a copy of the GNU General Public License along
+#     with testbot.  If not, see <http://www.gnu.org/licenses/>.
+#
+#     Copyright Carlos Linares Lopez, 2014
+# -----------------------------------------------------------------------------
+
+"""
+.. module:: test_streamtools
+   :platform: Linux
+   :synopsis: unittest of streamtools
+
+.. moduleautor:: Carlos Linares Lopez <carlos.linares@uc3m.es>
+"""
+
+from __future__ import with_statement
+
+__version__  = '1.0'
+__revision__ = '$Revision$'
+
+# imports
+# -----------------------------------------------------------------------------
+import os                       # remove
+import re                       # regular expressions
+import tempfile                 # temporary files
+import unittest                 # unit test facilities
+
+import streamtools              # memory-mapped files ---unit to test
+
+# -----------------------------------------------------------------------------
+# TestMappedFile
+#
+# test that the contents of files mapped in memory are accessed as strings
+# -----------------------------------------------------------------------------
+class TestMappedFile(unittest.TestCase):
+
+    """
+    test that the contents of files mapped in memory are accessed as strings
+    """
+
+    def _mapped_file (self, contents):
+        """
+        returns an instance of MappedFile with the given contents. The file is
+        removed right after being mapped
+        """
+
+        (fd, filename) = tempfile.mkstemp ()
+        os.write (fd, contents)
+        os.close (fd)
+
+        mapped = streamtools.MappedFile (filename)
+        os.remove (filename)
+
+        return mapped
+
+
+    def test_contents (self):
+        """
+        the contents of mapped files are the same than those of the file, even
+        if it was removed, and they can be scanned with regexps
+        """
+
+        text = "Spain 46\nItaly 59\n"
+        mapped = self._mapped_file (text)
+        self.assertEqual (len (mapped), len (text))
+        self.assertEqual ([imatch.group (0) for imatch in
+                           re.finditer (r"\d+", streamtools.view (mapped))], ['46', '59'])
+        self.assertEqual (str (mapped), text)
+        self.assertIs (str (mapped), str (mapped))
+
+        # strings are viewed as themselves
+        self.assertIs (streamtools.view (text), text)
+
+
+    def test_empty (self):
+        """
+        empty files are mapped as empty strings
+        """
+
+        mapped = self._mapped_file ("")
+        self.assertEqual (len (mapped), 0)
+        self.assertFalse (mapped)
+        self.assertEqual (str (mapped), "")
+        self.assertEqual (re.findall (r"\w+", streamtools.view (mapped)), [])
+        mapped.close ()
+
+
+# Main body
+# -----------------------------------------------------------------------------
+if __name__ == "__main__":
+
+    unittest.main (module='test_streamtools',
+                   verbosity=2,
+                   failfast=True)
+
+
+
+# Local Variables:
+# mode:python
+# fill-column:80
+# End:
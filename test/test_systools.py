@@ -0,0 +1,405 @@
+#!/usr/bin/python2.7
+# -*- coding: utf-8 -*-
+#
+# test_systools.py
+# Description: unittest of systools
+# -----------------------------------------------------------------------------
+#
+# Started on  <Fri Oct 16 20:25:12 2026 Carlos Linares Lopez>
+# Last update <Fri Oct 16 20:25:12 2026 Carlos Linares Lopez (clinares)>
+# -----------------------------------------------------------------------------
+#
+# $Id::                                                                      $
+# $Date::                                                                    $
+# $Revision::                                                                $
+# -----------------------------------------------------------------------------
+#
+# Made by Carlos Linares Lopez
+# Login   <clinares@psyche>
+#
+
+# -----------------------------------------------------------------------------
+#     This file is part of testbot
+#
+#     testbot is free software: you can redistribute it and/or modify it under
+#     the terms of the GNU General Public License as published by the Free
+#     Software Foundation, either version 3 of the License, or (at your option)
+#     any later version.
+#
+#     testbot is distributed in the hope that it will be useful, but WITHOUT ANY
+#     WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+#     FOR A PARTICULAR PURPOSE.  See the GNU General Public License for more
+#     details.
+#
+#     You should have received a copy of the GNU General Public License along
+#     with testbot.  If not, see <http://www.gnu.org/licenses/>.
+#
+#     Copyright Carlos Linares Lopez, 2014
+# -----------------------------------------------------------------------------
+
+"""
+.. module:: test_systools
+   :platform: Linux
+   :synopsis: unittest of systools
+
+.. moduleautor:: Carlos Linares Lopez <carlos.linares@uc3m.es>
+"""
+
+from __future__ import with_statement
+
+__version__  = '1.0'
+__revision__ = '$Revision$'
+
+# imports
+# -----------------------------------------------------------------------------
+import datetime                 # date/time
+import os                       # process handling
+import resource                 # resource limits
+import shutil                   # removing directories
+import signal                   # os signals
+import subprocess               # subprocess management
+import systools                 # process management ---unit to test
+import tempfile                 # scratch directories
+import time                     # time management
+import unittest                 # unit test facilities
+
+# -----------------------------------------------------------------------------
+# TestChildWatcher
+#
+# test that the termination of a child is noticed as soon as it happens and
+# that timeouts are honoured otherwise
+# -----------------------------------------------------------------------------
+class TestChildWatcher(unittest.TestCase):
+
+    """
+    test that the termination of a child is noticed as soon as it happens and
+    that timeouts are honoured otherwise
+    """
+
+    def test_exit (self):
+        """
+        a child that terminates right away is noticed long before the timeout
+        expires and its exit status is returned
+        """
+
+        child = subprocess.Popen (['sh', '-c', 'exit 3'])
+        watcher = systools.ChildWatcher (child.pid)
+
+        start = time.time ()
+        status = watcher.wait (10)
+        watcher.close ()
+
+        self.assertLess (time.time () - start, 5,
+                         "The termination of the child was not noticed immediately")
+        self.assertEqual (status >> 8, 3,
+                          "The exit status of the child is not correct")
+
+
+    def test_rusage (self):
+        """
+        the resource usage of a child is available once it terminates and it
+        includes the cpu time of its descendants
+        """
+
+        child = subprocess.Popen (['sh', '-c', r'sh -c "i=0; while [ \$i -lt 20000 ]; do i=\$((i+1)); done"'])
+        watcher = systools.ChildWatcher (child.pid)
+
+        self.assertIsNotNone (watcher.wait (10),
+                              "The termination of the child was not noticed")
+        rusage = watcher.get_rusage ()
+        watcher.close ()
+
+        self.assertGreater (rusage.ru_utime + rusage.ru_stime, 0,
+                            "The cpu time of the descendants was not accounted")
+        self.assertGreater (rusage.ru_maxrss, 0,
+                            "The peak resident set size was not accounted")
+
+
+    def test_timeout (self):
+        """
+        a child that keeps running makes the watcher return None once the
+        timeout expires
+        """
+
+        child = subprocess.Popen (['sleep', '10'])
+        watcher = systools.ChildWatcher (child.pid)
+
+        self.assertIsNone (watcher.wait (0.1),
+                           "The watcher returned before the child terminated")
+
+        child.kill ()
+        self.assertIsNotNone (watcher.wait (10),
+                              "The termination of the child was not noticed")
+        watcher.close ()
+
+
+# -----------------------------------------------------------------------------
+# TestExitCause
+#
+# test that the cause of the termination of a process is told from its exit
+# status and, if it was killed, from its cpu time
+# -----------------------------------------------------------------------------
+class TestExitCause(unittest.TestCase):
+
+    """
+    test that the cause of the termination of a process is told from its exit
+    status and, if it was killed, from its cpu time
+    """
+
+    def test_signals (self):
+        """
+        processes killed by the kernel for exceeding their limits are told
+        apart from those killed by any other signal
+        """
+
+        self.assertEqual (systools.exit_cause (3 << 8), 'exit')
+        self.assertEqual (systools.exit_cause (signal.SIGXCPU), 'cpulimit')
+        self.assertEqual (systools.exit_cause (signal.SIGXFSZ), 'fsizelimit')
+        self.assertEqual (systools.exit_cause (signal.SIGTERM), 'signal')
+
+
+    def test_hard_limit (self):
+        """
+        processes killed with SIGKILL are acknowledged to exceed their limit
+        of cpu time only if they consumed it
+        """
+
+        self.assertEqual (systools.exit_cause (signal.SIGKILL), 'signal')
+        self.assertEqual (systools.exit_cause (signal.SIGKILL, 0.5, 2), 'signal')
+        self.assertEqual (systools.exit_cause (signal.SIGKILL, 3.1, 2), 'cpulimit')
+        self.assertEqual (systools.exit_cause (signal.SIGTERM, 3.1, 2), 'signal')
+
+
+    def test_file_size (self):
+        """
+        processes that exceed their limit of file size are killed and
+        acknowledged as such, even if they are run from a shell
+        """
+
+        def _preexec ():
+            systools.restore_signals ()
+            resource.setrlimit (resource.RLIMIT_FSIZE, (2**20, 2**20))
+
+        directory = tempfile.mkdtemp ()
+        try:
+            for command in ['exec head -c 5000000 /dev/zero > file',
+                            'head -c 5000000 /dev/zero > file; exit $?']:
+                child = subprocess.Popen (['sh', '-c', command],
+                                          cwd=directory, preexec_fn=_preexec)
+                watcher = systools.ChildWatcher (child.pid)
+                status = watcher.wait (10)
+                watcher.close ()
+
+                self.assertEqual (systools.exit_cause (status), 'fsizelimit',
+                                  "The limit of file size was not acknowledged")
+                self.assertEqual (os.path.getsize (os.path.join (directory, 'file')), 2**20)
+
+        finally:
+            shutil.rmtree (directory)
+
+
+# -----------------------------------------------------------------------------
+# TestProcessTracker
+#
+# test that the processes found by a tracker are the same found when examining
+# all processes in /proc
+# -----------------------------------------------------------------------------
+class TestProcessTracker(unittest.TestCase):
+
+    """
+    test that the processes found by a tracker are the same found when
+    examining all processes in /proc
+    """
+
+    def setUp (self):
+        """
+        create a child in its own process group with a couple of children
+        """
+
+        self._child = subprocess.Popen (['sh', '-c', 'sleep 5 & sleep 5 & wait'],
+                                        preexec_fn=os.setsid)
+        time.sleep (0.5)
+
+
+    def test_descendants (self):
+        """
+        the processes tracked are the child and its descendants
+        """
+
+        tracker = systools.ProcessTracker (self._child.pid)
+
+        # examine the processes twice to make sure that those already tracked
+        # are still found
+        for i in range (2):
+            tracked = sorted (systools.ProcessGroup (self._child.pid, tracker).pids ())
+            scanned = sorted (systools.ProcessGroup (self._child.pid).pids ())
+
+            self.assertEqual (len (tracked), 3,
+                              "The child and its descendants were not found")
+            self.assertEqual (tracked, scanned,
+                              "The processes tracked are not those in the process group")
+
+
+    def test_orphans (self):
+        """
+        the processes left behind in the process group after their parent
+        terminated are tracked as well, even if they were never seen before
+        """
+
+        child = subprocess.Popen (['sh', '-c', 'sleep 1; sleep 5 & exit 0'],
+                                  preexec_fn=os.setsid)
+        try:
+            tracker = systools.ProcessTracker (child.pid)
+            systools.ProcessGroup (child.pid, tracker)
+
+            # once the child terminates, its orphan is reparented
+            child.wait ()
+            tracked = systools.ProcessGroup (child.pid, tracker).get_processes ()
+            self.assertEqual ([iprocess.cmdline for iprocess in tracked], ['sleep 5'],
+                              "The processes left behind in the process group were not found")
+
+        finally:
+            os.killpg (child.pid, signal.SIGKILL)
+
+
+    def test_unchanged (self):
+        """
+        /proc is not listed again while no tracked process terminates
+        """
+
+        tracker = systools.ProcessTracker (self._child.pid)
+        systools.ProcessGroup (self._child.pid, tracker)
+
+        scans = []
+        read_unseen_processes = tracker._read_unseen_processes
+        def _read_unseen_processes (boottime, processes):
+            scans.append (len (processes))
+            return read_unseen_processes (boottime, processes)
+        tracker._read_unseen_processes = _read_unseen_processes
+
+        tracked = systools.ProcessGroup (self._child.pid, tracker).pids ()
+        self.assertEqual (len (tracked), 3,
+                          "The child and its descendants were not found")
+        if tracker._children:
+            self.assertEqual (scans, [],
+                              "/proc was listed although no process terminated")
+
+
+    def tearDown (self):
+        """
+        kill the child and all its descendants
+        """
+
+        os.killpg (self._child.pid, signal.SIGKILL)
+        self._child.wait ()
+
+
+# -----------------------------------------------------------------------------
+# TestProcessTimeline
+#
+# test that the timeline accumulates the statistics of all processes ever seen
+# and that processes are told apart by their pid and start time
+# -----------------------------------------------------------------------------
+class TestProcessTimeline(unittest.TestCase):
+
+    """
+    test that the timeline accumulates the statistics of all processes ever
+    seen and that processes are told apart by their pid and start time
+    """
+
+    class _Group (object):
+        """
+        process group with a fixed list of processes
+        """
+
+        def __init__ (self, processes):
+            self._processes = processes
+
+        def get_processes (self):
+            return self._processes
+
+
+    def _process (self, pid, sttime, vsize):
+        """
+        returns a process of this interpreter with the given pid, start time
+        and virtual memory
+        """
+
+        process = systools.Process (os.getpid ())
+        (process.pid, process.sttime, process.vsize) = (pid, sttime, vsize)
+        return process
+
+
+    def test_timeline (self):
+        """
+        processes that terminate keep their statistics and reused pids are
+        different processes
+        """
+
+        timeline = systools.ProcessTimeline ()
+
+        timeline += self._Group ([self._process (10, 1, 2**20),
+                                  self._process (11, 1, 2**20)])
+        timeline += self._Group ([self._process (10, 1, 2**21)])
+        timeline += self._Group ([self._process (11, 5, 2**20)])
+
+        self.assertEqual (timeline.total_processes (), 3,
+                          "Reused pids were not told apart")
+        self.assertEqual (timeline.total_vsize (), 4,
+                          "The memory of all processes was not accumulated")
+        self.assertEqual (timeline.pids (), [10, 11, 11],
+                          "The processes are not given in the order they were seen")
+        self.assertEqual ([iproc [3] != str (datetime.datetime.fromtimestamp (-1))
+                           for iproc in timeline.get_processes ()],
+                          [True, True, False],
+                          "The end time of terminated processes was not set")
+
+
+# -----------------------------------------------------------------------------
+# TestProcessSampling
+#
+# test that sampling a process with the boot time computed once per tick and
+# the command line read only once gives the same information than reading
+# all the files of the process in /proc every time
+# -----------------------------------------------------------------------------
+class TestProcessSampling(unittest.TestCase):
+
+    """
+    test that sampling a process with the boot time computed once per tick and
+    the command line read only once gives the same information than reading
+    all the files of the process in /proc every time
+    """
+
+    def test_sampling (self):
+        """
+        the command line of a process is read only once and it is the same
+        found in /proc
+        """
+
+        pid = os.getpid ()
+        cmdline = open ("/proc/%d/cmdline" % pid).read ().rstrip ("\0\n").replace ("\0", " ")
+
+        boottime = systools.read_boottime ()
+        cmdlines = {}
+        for i in xrange (2):
+            process = systools.Process (pid, boottime, cmdlines)
+            self.assertEqual (process.cmdline, cmdline,
+                              "The command line of the process is not correct")
+            self.assertEqual (cmdlines.keys (), [process.get_key ()],
+                              "The command line of the process was not cached")
+
+
+# Main body
+# -----------------------------------------------------------------------------
+if __name__ == "__main__":
+
+    unittest.main (module='test_systools',
+                   verbosity=2,
+                   failfast=True)
+
+
+
+# Local Variables:
+# mode:python
+# fill-column:80
+# End:
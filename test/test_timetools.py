@@ -97,6 +97,59 @@ class TestTimeTools(unittest.TestCase):
     def tearDown (self): pass
 
 
+# -----------------------------------------------------------------------------
+# TestInterval
+#
+# test that adaptive intervals grow geometrically between their floor and
+# ceiling and that they are shortened when memory approaches its limit
+# -----------------------------------------------------------------------------
+class TestInterval(unittest.TestCase):
+
+    """
+    test that adaptive intervals grow geometrically between their floor and
+    ceiling and that they are shortened when memory approaches its limit
+    """
+
+    def test_fixed (self):
+        """
+        fixed intervals never change
+        """
+
+        interval = timetools.Interval (5)
+        self.assertEqual ([interval.update (i, 10) for i in range (5)],
+                          [5] * 5,
+                          "Fixed intervals changed")
+
+
+    def test_backoff (self):
+        """
+        adaptive intervals grow geometrically up to their ceiling
+        """
+
+        interval = timetools.Interval (1, 0.125)
+        self.assertEqual ([interval.get ()] + [interval.update () for i in range (4)],
+                          [0.125, 0.25, 0.5, 1, 1],
+                          "Adaptive intervals do not grow geometrically")
+
+
+    def test_memory (self):
+        """
+        adaptive intervals are shortened when memory approaches its limit but
+        never below their floor
+        """
+
+        interval = timetools.Interval (8, 1)
+        interval.update (0, 100)
+        interval.update (10, 100)
+        self.assertEqual (interval.get (), 4,
+                          "Adaptive intervals are shortened when memory is far from its limit")
+
+        # memory grows 20 units per second so that the limit is reached in 2
+        # seconds
+        self.assertEqual (interval.update (90, 100), 1,
+                          "Adaptive intervals are not shortened when memory approaches its limit")
+
+
 # Main body
 # -----------------------------------------------------------------------------
 if __name__ == "__main__":